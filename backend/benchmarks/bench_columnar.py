@@ -0,0 +1,74 @@
+"""
+Benchmark for the columnar export payload.
+
+Builds the same N cues as a cue-based `SubtitleExportRequest` (timecode strings
+plus diff parts per cue) and as `SubtitleColumns` (parallel frame and text
+arrays), and compares body size, validation and SRT compilation time.
+
+Usage:
+    python backend/benchmarks/bench_columnar.py [cue_count]
+"""
+import json
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from schemas import SubtitleColumns, SubtitleExportRequest
+from subtitle_columns import compile_columns, msgpack
+from subtitle_export import compile_export_request, iter_srt
+from timecode_utils import format_timecodes
+
+FRAME_RATE = 24.0
+
+
+def _time(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def _payloads(cue_count):
+    start_frames = [i * 48 for i in range(cue_count)]
+    end_frames = [i * 48 + 36 for i in range(cue_count)]
+    texts = [f"字幕第 {i} 行" for i in range(cue_count)]
+    starts = format_timecodes(start_frames, FRAME_RATE)
+    ends = format_timecodes(end_frames, FRAME_RATE)
+    request = {
+        "frameRate": FRAME_RATE,
+        "subtitles": [
+            {"id": i + 1, "startTimecode": start, "endTimecode": end, "diffs": [{"type": "normal", "value": text}]}
+            for i, (start, end, text) in enumerate(zip(starts, ends, texts))
+        ],
+    }
+    columns = {"frameRate": FRAME_RATE, "startFrames": start_frames, "endFrames": end_frames, "texts": texts}
+    return json.dumps(request).encode(), columns
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    request_body, columns = _payloads(cue_count)
+    columns_body = json.dumps(columns).encode()
+
+    print(f"{cue_count} cues, SubtitleExportRequest (JSON, {len(request_body) / 1024:.0f} KiB)")
+    request = _time("validate", lambda: SubtitleExportRequest.model_validate_json(request_body))
+    _time("compile + render SRT", lambda: "".join(iter_srt(compile_export_request(request))))
+
+    print(f"{cue_count} cues, SubtitleColumns (JSON, {len(columns_body) / 1024:.0f} KiB)")
+    parsed = _time("validate", lambda: SubtitleColumns.model_validate_json(columns_body))
+    _time("compile + render SRT", lambda: "".join(iter_srt(compile_columns(parsed))))
+
+    if msgpack is not None:
+        msgpack_body = msgpack.packb(columns, use_bin_type=True)
+        print(f"{cue_count} cues, SubtitleColumns (MessagePack, {len(msgpack_body) / 1024:.0f} KiB)")
+        _time("unpack + validate", lambda: SubtitleColumns.model_validate(msgpack.unpackb(msgpack_body, raw=False)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark for the multi-format export engine.
+
+Compiles a synthetic export request of N cues once, then renders it with every
+registered writer. The compile step is the only one that parses timecodes; each
+format afterwards is a pure render over the frame-based representation.
+
+Usage:
+    python backend/benchmarks/bench_export.py [cue_count]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from schemas import SubtitleExportRequest
+from subtitle_export import compile_export_request, get_export_format, list_export_formats
+from subtitle_streams import buffered_bytes
+
+
+def _time(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def _build_request(cue_count, frame_rate):
+    subtitles = []
+    for i in range(cue_count):
+        seconds = 3600 + i * 2
+        subtitles.append({
+            "id": i + 1,
+            "startTimecode": f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}:00",
+            "endTimecode": f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}:12",
+            "diffs": [{"type": "normal", "value": f"Subtitle line {i} & <more>"}, {"type": "removed", "value": " old"}],
+        })
+    return SubtitleExportRequest(frameRate=frame_rate, subtitles=subtitles)
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    frame_rate = 24.0
+    request = _build_request(cue_count, frame_rate)
+    print(f"{cue_count} cues @ {frame_rate} fps")
+
+    compiled = _time("compile (parse once)", lambda: compile_export_request(request, 86400))
+    _time("time parts (shared)", compiled.time_parts)
+    for name in list_export_formats():
+        writer = get_export_format(name)
+        size = _time(f"render {name}", lambda: sum(len(block) for block in buffered_bytes(writer.render(compiled))))
+        print(f"  {'':<34} {size / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
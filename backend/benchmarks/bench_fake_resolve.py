@@ -0,0 +1,63 @@
+"""
+Load test of the extraction and export paths against the in-process fake Resolve.
+
+Builds a fake timeline of N cues (see fake_resolve.py), then times the real
+`resolve_utils` functions end to end: the first extraction, a repeated one,
+and an export of the whole track back to a new subtitle track. Per-call latency
+of the fake can be set to approximate the scripting bridge of a real Resolve.
+
+Usage:
+    python backend/benchmarks/bench_fake_resolve.py [cue_count] [latency_ms]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import resolve_utils
+from fake_resolve import FakeResolveConfig, build_fake_resolve, set_fake_resolve
+from resolve_metrics import get_metrics_registry
+from subtitle_export import CompiledSubtitles
+
+
+def _time(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    resolve = build_fake_resolve(FakeResolveConfig(cue_count=cue_count, latency_ms=latency_ms))
+    set_fake_resolve(resolve)
+    resolve_utils.RESOLVE_BACKEND = "fake"
+
+    print(f"{cue_count} cues, {latency_ms} ms per scripting call")
+    status, result = _time("get_resolve_subtitles (first)", lambda: resolve_utils.get_resolve_subtitles(1))
+    assert status == "success", result
+    print(f"    phases: {result['timings']}")
+    status, result = _time("get_resolve_subtitles (repeat)", lambda: resolve_utils.get_resolve_subtitles(1))
+    print(f"    phases: {result['timings']}")
+
+    snapshot = resolve_utils.get_resolve_track_snapshot(1)[1]["snapshot"]
+    base = snapshot.start_frames[0] if len(snapshot) else 0
+    compiled = CompiledSubtitles(snapshot.frame_rate, [f - base for f in snapshot.start_frames],
+                                 [f - base for f in snapshot.end_frames], snapshot.texts)
+    status, result = _time("export_compiled_to_davinci", lambda: resolve_utils.export_compiled_to_davinci(lambda fr, b: compiled))
+    assert status == "success", result
+
+    print("  scripting calls (count, total ms):")
+    summary = get_metrics_registry().get_resolve_call_summary()
+    for method, entry in sorted(summary.items(), key=lambda item: -item[1]["total_ms"])[:8]:
+        print(f"    {method:<30} {entry['count']:>8} {entry['total_ms']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark for the server-side SRT/WebVTT parser.
+
+Generates synthetic SRT files of N cues (UTF-8 with BOM and CRLF line endings,
+plus a WebVTT variant) and parses them from 64 KiB chunks, the way the upload
+endpoint receives them.
+
+Usage:
+    python backend/benchmarks/bench_ingest.py [cue_count]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from subtitle_ingest import format_ms, parse_upload
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _time(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def _build_srt(cue_count):
+    blocks = []
+    for i in range(cue_count):
+        start = format_ms(i * 2000).replace(".", ",")
+        end = format_ms(i * 2000 + 1500).replace(".", ",")
+        blocks.append(f"{i + 1}\r\n{start} --> {end}\r\n字幕第 {i} 行\r\nSecond line {i}\r\n")
+    return b"\xef\xbb\xbf" + "\r\n".join(blocks).encode("utf-8")
+
+
+def _build_vtt(cue_count):
+    blocks = ["WEBVTT\n"]
+    for i in range(cue_count):
+        blocks.append(f"{format_ms(i * 2000)} --> {format_ms(i * 2000 + 1500)} align:start\nLine {i}\n")
+    return "\n".join(blocks).encode("utf-8")
+
+
+def _chunks(data):
+    return [data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for label, data in (("srt (BOM, CRLF)", _build_srt(cue_count)), ("vtt", _build_vtt(cue_count))):
+        print(f"{cue_count} cues, {label}, {len(data) / (1024 * 1024):.1f} MiB")
+        result = _time("parse_upload", lambda: parse_upload(_chunks(data)))
+        assert len(result.cues) == cue_count and not result.issues
+        _time("compile to frames @ 24 fps", lambda: result.compile(24.0))
+
+
+if __name__ == "__main__":
+    main()
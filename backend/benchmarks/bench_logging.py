@@ -0,0 +1,78 @@
+"""
+Benchmark for the cost of logging on the calling thread.
+
+Logs the same messages through the previous setup (a FileHandler plus a
+StreamHandler called synchronously by the caller) and through the queue
+pipeline from `log_pipeline`, where the caller only enqueues the record and a
+listener thread does the formatting and I/O. The sampled variant logs the
+hot-path message with `extra=SAMPLED`, so almost every record is discarded by
+the rate limiter before it is even queued. Console output goes to os.devnull.
+
+Usage:
+    python backend/benchmarks/bench_logging.py [messages]
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from log_pipeline import LOG_FORMAT, SAMPLED, NonBlockingQueueHandler, RingBufferHandler, SamplingFilter
+
+
+def _time(label, func, messages):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:10.1f} ms  ({elapsed / messages * 1e6:.2f} µs per message on the caller)")
+    return elapsed
+
+
+def _log_messages(logger, messages, **kwargs):
+    for n in range(messages):
+        logger.info("使用缓存的 DaVinci Resolve 连接。 %s", n, **kwargs)
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    formatter = logging.Formatter(LOG_FORMAT)
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, "w") as devnull:
+        print(f"{messages} messages")
+
+        direct = logging.getLogger("bench.direct")
+        direct.propagate = False
+        direct.setLevel(logging.INFO)
+        for handler in (logging.FileHandler(os.path.join(scratch, "direct.log"), encoding="utf-8"), logging.StreamHandler(devnull)):
+            handler.setFormatter(formatter)
+            direct.addHandler(handler)
+        _time("synchronous handlers", lambda: _log_messages(direct, messages), messages)
+
+        for label, kwargs in (("queue pipeline", {}), ("queue pipeline, sampled", {"extra": SAMPLED})):
+            logger = logging.getLogger(f"bench.{label}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            log_queue = queue.Queue(messages + 1)
+            queue_handler = NonBlockingQueueHandler(log_queue)
+            queue_handler.addFilter(SamplingFilter())
+            logger.addHandler(queue_handler)
+            sinks = [logging.handlers.RotatingFileHandler(os.path.join(scratch, "queued.log"), maxBytes=5 * 1024 * 1024, encoding="utf-8"),
+                     logging.StreamHandler(devnull), RingBufferHandler()]
+            for handler in sinks:
+                handler.setFormatter(formatter)
+            listener = logging.handlers.QueueListener(log_queue, *sinks)
+            listener.start()
+            _time(label, lambda: _log_messages(logger, messages, **kwargs), messages)
+            listener.stop()
+            for handler in sinks:
+                handler.close()
+
+
+if __name__ == "__main__":
+    main()
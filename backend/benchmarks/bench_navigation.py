@@ -0,0 +1,69 @@
+"""
+Benchmark for rapid playhead jumps, as when an editor holds an arrow key.
+
+Sends one jump every `interval_ms` to the fake Resolve (each SetCurrentTimecode
+takes `latency_ms`), once by queueing every jump on the Resolve thread as the
+timecode endpoint used to, and once through the latest-wins navigation channel.
+Reports how many jumps reached Resolve and how long after the last key press
+the playhead landed on the last row.
+
+Usage:
+    python backend/benchmarks/bench_navigation.py [jumps] [interval_ms] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import resolve_utils
+from fake_resolve import FakeResolveConfig, build_fake_resolve, set_fake_resolve
+from navigation import NavigationChannel
+from resolve_executor import ResolveExecutor
+
+
+async def _press_keys(jumps, interval, jump):
+    tasks = []
+    for cue_id in range(1, jumps + 1):
+        tasks.append(asyncio.ensure_future(jump(cue_id)))
+        await asyncio.sleep(interval)
+    last_press = time.perf_counter() - interval
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - last_press
+
+
+def _run(label, jumps, interval, make_jump, resolve):
+    executor = ResolveExecutor(max_queue_size=jumps + 1)
+    resolve.backend.reset_calls()
+    lag = asyncio.run(_press_keys(jumps, interval, make_jump(executor)))
+    executor.shutdown()
+    sent = resolve.backend.calls.get("SetCurrentTimecode", 0)
+    print(f"  {label:<22} {sent:>5} jumps sent to Resolve, playhead settled {lag * 1000:8.1f} ms after the last key press")
+
+
+def main():
+    jumps = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    interval = (float(sys.argv[2]) if len(sys.argv) > 2 else 30.0) / 1000
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 40.0
+    resolve = build_fake_resolve(FakeResolveConfig(cue_count=jumps, latency_ms=latency_ms))
+    set_fake_resolve(resolve)
+    resolve_utils.RESOLVE_BACKEND = "fake"
+    resolve_utils.get_resolve_subtitles(1)
+
+    print(f"{jumps} jumps every {interval * 1000:.0f} ms, {latency_ms} ms per scripting call")
+    _run("queued (every jump)", jumps, interval,
+         lambda executor: lambda cue_id: executor.run(resolve_utils.set_resolve_playhead, cue_id=cue_id), resolve)
+
+    def channel_jump(executor):
+        channel = NavigationChannel()
+        return lambda cue_id: channel.jump(lambda: executor.run(resolve_utils.set_resolve_playhead, cue_id=cue_id))
+
+    _run("latest-wins channel", jumps, interval, channel_jump, resolve)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for the `/api/v1/subtitles` response layer.
+
+For N cues, compares the old path (FastAPI `response_model` validation plus
+`jsonable_encoder` and the stdlib encoder), direct encoding with the stdlib
+encoder and with `encode_json` (orjson when installed), and a hit in the
+encoded response cache.
+
+Usage:
+    python backend/benchmarks/bench_response.py [cue_count ...]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from typing import Union
+
+from response_cache import EncodedResponseCache, _encode_json_stdlib, encode_json, orjson
+from schemas import ErrorResponse, SuccessResponse
+from timecode_utils import format_timecodes
+
+REPEAT = 3
+
+
+def _time(label, func):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {label:<44} {best * 1000:10.2f} ms")
+    return result
+
+
+def _build_payload(cue_count):
+    starts = format_timecodes([86400 + i * 48 for i in range(cue_count)], 24.0)
+    ends = format_timecodes([86400 + i * 48 + 36 for i in range(cue_count)], 24.0)
+    data = [
+        {"id": i + 1, "startTimecode": start, "endTimecode": end, "text": f"字幕第 {i} 行 subtitle line {i}"}
+        for i, (start, end) in enumerate(zip(starts, ends))
+    ]
+    return {"status": "success", "frameRate": 24.0, "data": data}
+
+
+def main():
+    cue_counts = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000]
+    adapter = TypeAdapter(Union[SuccessResponse, ErrorResponse])
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    for cue_count in cue_counts:
+        payload = _build_payload(cue_count)
+        print(f"{cue_count} cues")
+        _time("response_model + jsonable_encoder + json", lambda: _encode_json_stdlib(
+            jsonable_encoder(adapter.dump_python(adapter.validate_python(payload)))))
+        _time("json.dumps", lambda: _encode_json_stdlib(payload))
+        body = _time("encode_json", lambda: encode_json(payload))
+        cache = EncodedResponseCache()
+        cache.put("track", "fingerprint", body)
+        _time("encoded response cache hit", lambda: cache.get("track", "fingerprint"))
+        print(f"  {'body size':<44} {len(body) / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for backend cold start.
+
+1. Import time: imports `main` in a fresh interpreter several times and reports
+   the median, plus the slowest modules from `python -X importtime`.
+2. Time to first response: launches `uvicorn main:app` on a free port and polls
+   `/api/v1/project-info`, reporting the time until the server answers and until
+   the first successful response (which needs DaVinci Resolve to be running).
+
+Usage:
+    python backend/benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+
+FIRST_SUCCESS_TIMEOUT = 30.0
+
+
+def _import_time_ms() -> float:
+    code = "import time; start = time.perf_counter(); import main; print((time.perf_counter() - start) * 1000)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip())
+
+
+def _slowest_imports(count: int = 8):
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=backend_dir, capture_output=True, text=True, check=True)
+    rows = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        if self_us.isdigit():
+            rows.append((int(self_us), int(cumulative_us), name))
+    return sorted(rows, reverse=True)[:count]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _time_to_first_response():
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/project-info"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = None
+    first_success = None
+    last_error = None
+    try:
+        while time.perf_counter() - started < FIRST_SUCCESS_TIMEOUT:
+            try:
+                with urllib.request.urlopen(url, timeout=FIRST_SUCCESS_TIMEOUT) as response:
+                    first_response = first_response or time.perf_counter() - started
+                    first_success = time.perf_counter() - started
+                    break
+            except urllib.error.HTTPError as e:
+                first_response = first_response or time.perf_counter() - started
+                last_error = json.loads(e.read() or b"{}").get("detail", {}).get("code", e.code)
+                if last_error == "dvr_script_not_found":
+                    break
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return first_response, first_success, last_error
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    times = [_import_time_ms() for _ in range(runs)]
+    print(f"import main: median {statistics.median(times):.1f} ms over {runs} runs (min {min(times):.1f}, max {max(times):.1f})")
+    print("slowest modules (self / cumulative, ms):")
+    for self_us, cumulative_us, name in _slowest_imports():
+        print(f"  {name:<40} {self_us / 1000:8.1f} {cumulative_us / 1000:8.1f}")
+
+    first_response, first_success, last_error = _time_to_first_response()
+    print(f"first HTTP response from /api/v1/project-info: {first_response * 1000:.0f} ms" if first_response else "server did not answer")
+    if first_success is not None:
+        print(f"first successful /api/v1/project-info:        {first_success * 1000:.0f} ms")
+    else:
+        print(f"no successful response within {FIRST_SUCCESS_TIMEOUT:.0f} s (last error: {last_error}); is DaVinci Resolve running?")
+
+
+if __name__ == "__main__":
+    main()
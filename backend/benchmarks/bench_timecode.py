@@ -0,0 +1,60 @@
+"""
+Before/after benchmark for timecode conversion.
+
+Compares the previous per-call `timecode.Timecode` implementation with the
+integer engine in `timecode_utils` on a synthetic track of N cues.
+
+Usage:
+    python backend/benchmarks/bench_timecode.py [cue_count]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from timecode import Timecode
+from timecode_utils import format_timecode, format_timecodes, timecode_to_frames, timecodes_to_frames
+
+
+def legacy_format_timecode(frame, frame_rate):
+    if frame_rate == 0 or frame == 0:
+        return "00:00:00:00"
+    return str(Timecode(frame_rate, frames=int(frame) + 1))
+
+
+def legacy_timecode_to_frames(tc_str, frame_rate):
+    return Timecode(frame_rate, tc_str).frames - 1
+
+
+def _time(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    for frame_rate in (24.0, 29.97):
+        base = 86400 if frame_rate == 24.0 else 107892
+        frames = [base + i * 17 for i in range(cue_count)]
+        print(f"{cue_count} cues @ {frame_rate} fps")
+
+        legacy = _time("legacy format (Timecode)", lambda: [legacy_format_timecode(f, frame_rate) for f in frames])
+        scalar = _time("format_timecode", lambda: [format_timecode(f, frame_rate) for f in frames])
+        batch = _time("format_timecodes (batch)", lambda: format_timecodes(frames, frame_rate))
+        assert legacy == scalar == batch
+
+        legacy_parsed = _time("legacy parse (Timecode)", lambda: [legacy_timecode_to_frames(tc, frame_rate) for tc in legacy])
+        parsed = _time("timecode_to_frames (cold)", lambda: [timecode_to_frames(tc, frame_rate) for tc in legacy])
+        _time("timecodes_to_frames (memoized)", lambda: timecodes_to_frames(legacy, frame_rate))
+        assert legacy_parsed == parsed == frames
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark for change detection: polling versus the timeline watcher probe.
+
+Against the in-process fake Resolve, compares what one polling client paid per
+round (project info, the track list and the full subtitles of every track)
+with one watcher probe: the first (full) probe, an unchanged probe, and a
+probe that re-reads one invalidated track. Each row shows wall time and the
+number of scripting calls; the probe is shared by every connected client,
+while polling cost grows with the number of clients.
+
+Usage:
+    python backend/benchmarks/bench_watcher.py [cue_count] [track_count] [latency_ms]
+"""
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(current_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+import resolve_utils
+from fake_resolve import FakeResolveConfig, build_fake_resolve, set_fake_resolve
+
+
+def _time(label, func, resolve):
+    resolve.backend.reset_calls()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:10.1f} ms  {sum(resolve.backend.calls.values()):>8} scripting calls")
+    return result
+
+
+def _poll(track_count):
+    resolve_utils.get_resolve_project_info()
+    resolve_utils.get_subtitle_tracks()
+    for track_index in range(1, track_count + 1):
+        resolve_utils.get_resolve_subtitles(track_index)
+
+
+def main():
+    cue_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    track_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    resolve = build_fake_resolve(FakeResolveConfig(cue_count=cue_count, track_count=track_count, latency_ms=latency_ms))
+    set_fake_resolve(resolve)
+    resolve_utils.RESOLVE_BACKEND = "fake"
+
+    print(f"{track_count} tracks of {cue_count} cues, {latency_ms} ms per scripting call")
+    _time("polling round (per client)", lambda: _poll(track_count), resolve)
+    status, state = _time("watcher probe, full scan", lambda: resolve_utils.probe_timeline_state(full_scan=True), resolve)
+    known = {track["track_index"]: track["signature"] for track in state["tracks"]}
+    _time("watcher probe, unchanged", lambda: resolve_utils.probe_timeline_state(known), resolve)
+    _time("watcher probe, 1 track rescan", lambda: resolve_utils.probe_timeline_state(known, rescan_tracks=(1,)), resolve)
+
+
+if __name__ == "__main__":
+    main()
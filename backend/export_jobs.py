@@ -0,0 +1,249 @@
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import List, Optional
+
+from resolve_executor import ResolveExecutorBusy, get_resolve_executor
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are waiting to run."""
+
+
+class ExportJob:
+    """
+    One background export. `state` moves from `queued` through `running` to `succeeded`,
+    `failed` or `cancelled`; while running, `phase` is the current phase of `phases`.
+    Updated from the job worker and the Resolve thread, read by request handlers,
+    so every access goes through the job's lock.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, kind: str, phases, mutating_phases, fn, args, kwargs):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.phases = tuple(phases)
+        self._mutating_phases = frozenset(mutating_phases)
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        # Run in the submitter's context, so the Resolve calls are labelled with the submitting endpoint.
+        self._context = contextvars.copy_context()
+        self._lock = threading.Lock()
+        self._state = self.QUEUED
+        self._phase = None
+        self._phase_started = None
+        self._timings = {}
+        self._cancel_requested = False
+        self._committed = False
+        self._result = None
+        self._error = None
+        self._created = time.time()
+        self._created_clock = time.perf_counter()
+        self._started_clock = None
+        self._finished_clock = None
+
+    @property
+    def done(self) -> bool:
+        with self._lock:
+            return self._state in (self.SUCCEEDED, self.FAILED, self.CANCELLED)
+
+    def cancel(self) -> bool:
+        """
+        Requests cancellation. Returns True if the job is (or will be) cancelled, False if it has
+        already entered a phase that changes the project, or has finished.
+        """
+        with self._lock:
+            if self._state == self.CANCELLED:
+                return True
+            if self._committed or self._state in (self.SUCCEEDED, self.FAILED):
+                return False
+            self._cancel_requested = True
+            if self._state == self.QUEUED:
+                self._state = self.CANCELLED
+                self._finished_clock = time.perf_counter()
+                self._release()
+            return True
+
+    def enter_phase(self, phase: str) -> bool:
+        """
+        Progress callback for the export: closes the previous phase and starts `phase`.
+        Returns False if the job was cancelled; entering a mutating phase commits the job.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._close_phase(now)
+            if self._cancel_requested:
+                return False
+            if phase in self._mutating_phases:
+                self._committed = True
+            self._phase = phase
+            self._phase_started = now
+            return True
+
+    def _close_phase(self, now: float):
+        if self._phase is not None:
+            self._timings[self._phase] = round((now - self._phase_started) * 1000, 3)
+            self._phase = None
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self._state != self.QUEUED:
+                return False
+            self._state = self.RUNNING
+            self._started_clock = time.perf_counter()
+            return True
+
+    def _finish(self, status: str, data: dict):
+        now = time.perf_counter()
+        with self._lock:
+            self._close_phase(now)
+            self._finished_clock = now
+            if status == "success":
+                self._state = self.SUCCEEDED
+                self._result = data
+            elif data.get("code") == "export_cancelled":
+                self._state = self.CANCELLED
+            else:
+                self._state = self.FAILED
+                self._error = data
+            self._release()
+
+    def _release(self):
+        # Finished jobs stay in the history for polling; drop the export and its (possibly large) payload.
+        self._fn = self._args = self._kwargs = None
+
+    def run(self, executor):
+        """Runs the job on the Resolve thread, waiting for room when the Resolve queue is full."""
+        if not self._start():
+            return
+        while True:
+            try:
+                status, data = executor.call(self._fn, *self._args, progress=self.enter_phase, **self._kwargs)
+                break
+            except ResolveExecutorBusy:
+                time.sleep(0.05)
+            except Exception as e:
+                status, data = "error", {"code": "unknown_error", "message": str(e)}
+                break
+        self._finish(status, data)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            now = time.perf_counter()
+            if self._state == self.SUCCEEDED:
+                progress = 1.0
+            elif self._phase is not None:
+                progress = round(self.phases.index(self._phase) / len(self.phases), 3) if self._phase in self.phases else None
+            else:
+                progress = round(len(self._timings) / len(self.phases), 3)
+            started, finished = self._started_clock, self._finished_clock
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "state": self._state,
+                "phase": self._phase,
+                "progress": progress,
+                "cancellable": self._state in (self.QUEUED, self.RUNNING) and not self._committed and not self._cancel_requested,
+                "created_at": self._created,
+                "timings": {
+                    "queued": round(((started or finished or now) - self._created_clock) * 1000, 3),
+                    **self._timings,
+                    "total": round(((finished or now) - self._created_clock) * 1000, 3),
+                },
+                "result": self._result,
+                "error": self._error,
+            }
+
+
+class ExportJobQueue:
+    """
+    Runs export jobs one at a time, in submission order, on a worker thread that hands each
+    job to the Resolve thread. At most `max_pending` jobs wait at once; the last
+    `max_history` finished jobs are kept for status polling, older ones are forgotten.
+    """
+
+    def __init__(self, max_pending: int = 32, max_history: int = 50, executor=None):
+        self.max_pending = max_pending
+        self.max_history = max_history
+        self._executor = executor
+        self._lock = threading.Condition()
+        self._pending = deque()
+        self._jobs = OrderedDict()
+        self._thread = None
+        self._stats = {"submitted": 0, "rejected": 0}
+
+    def submit(self, kind: str, phases, mutating_phases, fn, *args, **kwargs) -> ExportJob:
+        """
+        Queues `fn(*args, progress=job.enter_phase, **kwargs)` as a job and returns it at once.
+        Raises `JobQueueFull` when `max_pending` jobs are already waiting.
+        """
+        job = ExportJob(kind, phases, mutating_phases, fn, args, kwargs)
+        with self._lock:
+            if sum(1 for queued in self._pending if not queued.done) >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise JobQueueFull(f"已有 {self.max_pending} 个任务在排队。")
+            self._stats["submitted"] += 1
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._trim_history()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name="export-jobs", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+        return job
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+
+    def _worker(self):
+        executor = self._executor or get_resolve_executor()
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+                job = self._pending.popleft()
+            try:
+                job._context.run(job.run, executor)
+            except Exception as e:
+                logging.error(f"导出任务 {job.id} 执行失败: {e}", exc_info=True)
+            with self._lock:
+                self._trim_history()
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[dict]:
+        """Returns every known job, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+            stats = dict(self._stats, pending=sum(1 for job in self._pending if not job.done))
+        states = {}
+        for job in jobs:
+            state = job.to_dict()["state"]
+            states[state] = states.get(state, 0) + 1
+        return dict(stats, states=states, max_pending=self.max_pending, max_history=self.max_history)
+
+
+_export_jobs = ExportJobQueue()
+
+
+def get_export_jobs() -> ExportJobQueue:
+    """Returns the process-wide export job queue."""
+    return _export_jobs
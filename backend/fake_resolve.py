@@ -0,0 +1,427 @@
+import os
+import random
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+from subtitle_ingest import parse_upload
+from timecode_utils import timecode_to_frames
+
+
+class FakeResolveError(RuntimeError):
+    """Raised by an injected failure, like a scripting call on a dropped connection."""
+
+
+class FakeResolveConfig(NamedTuple):
+    cue_count: int = 1000
+    track_count: int = 1
+    frame_rate: float = 24.0
+    start_timecode: str = "01:00:00:00"
+    latency_ms: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "FakeResolveConfig":
+        env = os.environ
+        return cls(
+            cue_count=int(env.get("FAKE_RESOLVE_CUES", cls._field_defaults["cue_count"])),
+            track_count=int(env.get("FAKE_RESOLVE_TRACKS", cls._field_defaults["track_count"])),
+            frame_rate=float(env.get("FAKE_RESOLVE_FRAME_RATE", cls._field_defaults["frame_rate"])),
+            start_timecode=env.get("FAKE_RESOLVE_START_TIMECODE", cls._field_defaults["start_timecode"]),
+            latency_ms=float(env.get("FAKE_RESOLVE_LATENCY_MS", cls._field_defaults["latency_ms"])),
+            failure_rate=float(env.get("FAKE_RESOLVE_FAILURE_RATE", cls._field_defaults["failure_rate"])),
+            seed=int(env.get("FAKE_RESOLVE_SEED", cls._field_defaults["seed"])),
+        )
+
+
+class FakeBackend:
+    """Latency, failure injection and call counting shared by every fake object of one `FakeResolve`."""
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.running = True
+        self.calls = {}
+        self._random = random.Random(seed)
+        self._injected = {}
+        self._lock = threading.Lock()
+
+    def inject_failure(self, method: str, count: int = 1):
+        """Makes the next `count` calls of `method` raise `FakeResolveError`."""
+        with self._lock:
+            self._injected[method] = self._injected.get(method, 0) + count
+
+    def call(self, method: str):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            injected = self._injected.get(method, 0)
+            if injected:
+                self._injected[method] = injected - 1
+            fail = not self.running or injected > 0 or (self.failure_rate and self._random.random() < self.failure_rate)
+        if self.latency_ms:
+            _wait(self.latency_ms / 1000)
+        if fail:
+            raise FakeResolveError(f"{method}: DaVinci Resolve is not responding")
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+
+
+def _wait(seconds: float):
+    # time.sleep cannot wait less than the scheduler tick, so short latencies spin.
+    if seconds >= 0.001:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _api(method):
+    name = method.__name__
+
+    def call(self, *args, **kwargs):
+        self._backend.call(name)
+        return method(self, *args, **kwargs)
+
+    call.__name__ = name
+    call.__doc__ = method.__doc__
+    return call
+
+
+class FakeTimelineItem:
+    __slots__ = ("_backend", "_start", "_end", "_name")
+
+    def __init__(self, backend: FakeBackend, start: int, end: int, name: str):
+        self._backend = backend
+        self._start = start
+        self._end = end
+        self._name = name
+
+    @_api
+    def GetStart(self):
+        return self._start
+
+    @_api
+    def GetEnd(self):
+        return self._end
+
+    @_api
+    def GetDuration(self):
+        return self._end - self._start
+
+    @_api
+    def GetName(self):
+        return self._name
+
+
+class _FakeTrack:
+    def __init__(self, name: str, items: Optional[List[FakeTimelineItem]] = None):
+        self.name = name
+        self.enabled = True
+        self.items = items or []
+
+
+class FakeTimeline:
+    def __init__(self, backend: FakeBackend, name: str, frame_rate: float, start_timecode: str, unique_id: str):
+        self._backend = backend
+        self._name = name
+        self._frame_rate = frame_rate
+        self._start_timecode = start_timecode
+        self._unique_id = unique_id
+        self._tracks = {"video": [_FakeTrack("Video 1")], "audio": [_FakeTrack("Audio 1")], "subtitle": []}
+        self.current_timecode = start_timecode
+
+    @property
+    def start_frame(self) -> int:
+        return timecode_to_frames(self._start_timecode, self._frame_rate)
+
+    def add_subtitle_track(self, cues) -> "_FakeTrack":
+        """Adds a subtitle track holding `cues`, (start, end, text) tuples in timeline frames."""
+        track = _FakeTrack(f"Subtitle {len(self._tracks['subtitle']) + 1}")
+        track.items = [FakeTimelineItem(self._backend, start, end, text) for start, end, text in cues]
+        self._tracks["subtitle"].append(track)
+        return track
+
+    def _track(self, track_type: str, index: int) -> Optional[_FakeTrack]:
+        tracks = self._tracks.get(track_type, [])
+        return tracks[index - 1] if 1 <= index <= len(tracks) else None
+
+    @_api
+    def GetName(self):
+        return self._name
+
+    @_api
+    def GetUniqueId(self):
+        return self._unique_id
+
+    @_api
+    def GetSetting(self, name: str = ""):
+        return {"timelineFrameRate": str(self._frame_rate)}.get(name, "")
+
+    @_api
+    def GetStartTimecode(self):
+        return self._start_timecode
+
+    @_api
+    def GetStartFrame(self):
+        return self.start_frame
+
+    @_api
+    def GetCurrentTimecode(self):
+        return self.current_timecode
+
+    @_api
+    def SetCurrentTimecode(self, timecode: str):
+        self.current_timecode = timecode
+        return True
+
+    @_api
+    def GetTrackCount(self, track_type: str):
+        return len(self._tracks.get(track_type, []))
+
+    @_api
+    def GetTrackName(self, track_type: str, index: int):
+        track = self._track(track_type, index)
+        return track.name if track else ""
+
+    @_api
+    def AddTrack(self, track_type: str, *args):
+        if track_type not in self._tracks:
+            return False
+        self._tracks[track_type].append(_FakeTrack(f"{track_type.capitalize()} {len(self._tracks[track_type]) + 1}"))
+        return True
+
+    @_api
+    def GetIsTrackEnabled(self, track_type: str, index: int):
+        track = self._track(track_type, index)
+        return bool(track and track.enabled)
+
+    @_api
+    def SetTrackEnable(self, track_type: str, index: int, enabled: bool):
+        track = self._track(track_type, index)
+        if track is None:
+            return False
+        track.enabled = bool(enabled)
+        return True
+
+    @_api
+    def GetItemListInTrack(self, track_type: str, index: int):
+        track = self._track(track_type, index)
+        return list(track.items) if track else None
+
+
+class FakeMediaPoolItem:
+    def __init__(self, backend: FakeBackend, path: str, cues):
+        self._backend = backend
+        self._path = path
+        self._name = os.path.basename(path)
+        self.cues = cues
+
+    @_api
+    def GetName(self):
+        return self._name
+
+    @_api
+    def GetClipProperty(self, name: Optional[str] = None):
+        properties = {"File Path": self._path, "Clip Name": self._name, "Type": "Subtitle"}
+        return properties if name is None else properties.get(name, "")
+
+
+class FakeMediaPool:
+    def __init__(self, backend: FakeBackend, project: "FakeProject"):
+        self._backend = backend
+        self._project = project
+        self.items: List[FakeMediaPoolItem] = []
+
+    @_api
+    def ImportMedia(self, paths):
+        """Imports SRT/WebVTT files; other paths are ignored, like unsupported media in Resolve."""
+        imported = []
+        for path in paths:
+            if not os.path.isfile(path):
+                continue
+            with open(path, "rb") as source:
+                result = parse_upload(iter(lambda: source.read(64 * 1024), b""))
+            if not result.cues:
+                continue
+            item = FakeMediaPoolItem(self._backend, path, result)
+            self.items.append(item)
+            imported.append(item)
+        return imported
+
+    @_api
+    def AppendToTimeline(self, clips):
+        """
+        Places subtitle clips on the highest-numbered enabled subtitle track of the current
+        timeline, with cue times measured from the timeline start.
+        """
+        timeline = self._project.current_timeline
+        if timeline is None:
+            return []
+        tracks = timeline._tracks["subtitle"]
+        target = next((track for track in reversed(tracks) if track.enabled), None)
+        if target is None:
+            return []
+        appended = []
+        base = timeline.start_frame
+        for clip in clips:
+            clip = clip.get("mediaPoolItem") if isinstance(clip, dict) else clip
+            compiled = clip.cues.compile(timeline._frame_rate)
+            for start, end, text in zip(compiled.start_frames, compiled.end_frames, compiled.texts):
+                appended.append(FakeTimelineItem(self._backend, base + start, base + end, text))
+        target.items.extend(appended)
+        target.items.sort(key=lambda item: item._start)
+        return appended
+
+    @_api
+    def DeleteClips(self, clips):
+        remaining = [item for item in self.items if item not in clips]
+        deleted = len(remaining) != len(self.items)
+        self.items = remaining
+        return deleted
+
+
+class FakeProject:
+    def __init__(self, backend: FakeBackend, name: str, unique_id: str):
+        self._backend = backend
+        self._name = name
+        self._unique_id = unique_id
+        self.timelines: List[FakeTimeline] = []
+        self.current_timeline: Optional[FakeTimeline] = None
+        self.media_pool = FakeMediaPool(backend, self)
+
+    def add_timeline(self, name: str, frame_rate: float = 24.0, start_timecode: str = "01:00:00:00") -> FakeTimeline:
+        timeline = FakeTimeline(self._backend, name, frame_rate, start_timecode, f"{self._unique_id}-tl{len(self.timelines) + 1}")
+        self.timelines.append(timeline)
+        if self.current_timeline is None:
+            self.current_timeline = timeline
+        return timeline
+
+    @_api
+    def GetName(self):
+        return self._name
+
+    @_api
+    def GetUniqueId(self):
+        return self._unique_id
+
+    @_api
+    def GetMediaPool(self):
+        return self.media_pool
+
+    @_api
+    def GetCurrentTimeline(self):
+        return self.current_timeline
+
+    @_api
+    def GetTimelineCount(self):
+        return len(self.timelines)
+
+    @_api
+    def GetTimelineByIndex(self, index: int):
+        return self.timelines[index - 1] if 1 <= index <= len(self.timelines) else None
+
+    @_api
+    def SetCurrentTimeline(self, timeline):
+        if timeline not in self.timelines:
+            return False
+        self.current_timeline = timeline
+        return True
+
+
+class FakeProjectManager:
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+        self.current_project: Optional[FakeProject] = None
+
+    @_api
+    def GetCurrentProject(self):
+        return self.current_project
+
+
+class FakeResolve:
+    """
+    In-process stand-in for the DaVinci Resolve scripting API.
+
+    Models the parts of the API the backend uses: the project manager, projects,
+    timelines with subtitle tracks (any number of items), track enable state, the
+    playhead, and a media pool that imports SRT files and appends them to the
+    timeline. Every call goes through the shared `FakeBackend`, which can add latency
+    and inject failures, so the real code paths in `resolve_utils` can be profiled and
+    load-tested without a Resolve install.
+
+    Selected with `RESOLVE_BACKEND=fake`; the generated timeline is configured with the
+    `FAKE_RESOLVE_*` environment variables read by `FakeResolveConfig.from_env`.
+    """
+
+    def __init__(self, backend: Optional[FakeBackend] = None):
+        self.backend = backend or FakeBackend()
+        self._backend = self.backend
+        self.project_manager = FakeProjectManager(self.backend)
+
+    def new_project(self, name: str) -> FakeProject:
+        """Creates a project and makes it the current one."""
+        project = FakeProject(self.backend, name, f"fake-project-{name}")
+        self.project_manager.current_project = project
+        return project
+
+    @_api
+    def GetProjectManager(self):
+        return self.project_manager
+
+    @_api
+    def GetProductName(self):
+        return "DaVinci Resolve (fake)"
+
+    @_api
+    def GetVersionString(self):
+        return "19.0.0 (fake)"
+
+
+def build_fake_resolve(config: FakeResolveConfig = FakeResolveConfig()) -> FakeResolve:
+    """
+    Builds a `FakeResolve` with one project and timeline holding `config.track_count`
+    subtitle tracks of `config.cue_count` cues each (two seconds apart, 1.5 s long).
+    """
+    resolve = FakeResolve(FakeBackend(config.latency_ms, config.failure_rate, config.seed))
+    project = resolve.new_project("Fake Project")
+    timeline = project.add_timeline("Fake Timeline", config.frame_rate, config.start_timecode)
+    base = timeline.start_frame
+    step = round(2 * config.frame_rate)
+    length = round(1.5 * config.frame_rate)
+    for track in range(1, config.track_count + 1):
+        timeline.add_subtitle_track(
+            (base + i * step, base + i * step + length, f"Track {track} line {i + 1}") for i in range(config.cue_count)
+        )
+    return resolve
+
+
+_fake_resolve = None
+_fake_resolve_lock = threading.Lock()
+
+
+def set_fake_resolve(resolve: Optional[FakeResolve]):
+    """Sets the instance `scriptapp` returns; None rebuilds it from the environment on next use."""
+    global _fake_resolve
+    with _fake_resolve_lock:
+        _fake_resolve = resolve
+
+
+def get_fake_resolve() -> FakeResolve:
+    """Returns the process-wide fake, building it from `FakeResolveConfig.from_env()` on first use."""
+    global _fake_resolve
+    with _fake_resolve_lock:
+        if _fake_resolve is None:
+            _fake_resolve = build_fake_resolve(FakeResolveConfig.from_env())
+        return _fake_resolve
+
+
+def scriptapp(app: str):
+    """Drop-in for `fusionscript.scriptapp`: returns the fake Resolve, or None while it is "not running"."""
+    if app != "Resolve":
+        return None
+    resolve = get_fake_resolve()
+    return resolve if resolve.backend.running else None
@@ -0,0 +1,173 @@
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+log_file = os.path.join(os.path.dirname(__file__), 'resolve_connection.log')
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_QUEUE_SIZE = 10000
+RING_BUFFER_SIZE = 1000
+
+# Pass as `extra=` on hot-path messages (one per request or per Resolve call) so they are rate-limited:
+#     logging.info("使用缓存的 DaVinci Resolve 连接。", extra=SAMPLED)
+SAMPLED = {"sampled": True}
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler over a bounded queue that never waits: when the listener falls behind
+    and the queue is full, the record is dropped and counted instead of blocking the
+    caller (which may be the Resolve thread).
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Rate-limits records logged with `extra=SAMPLED`: at most `burst` records per message
+    template (`record.msg`) pass in each `interval` seconds. The first record that passes
+    after a suppressed run says how many were left out. Other records always pass.
+    """
+
+    def __init__(self, burst: int = 5, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._windows = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                skipped = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                skipped = 0
+            else:
+                window[2] += 1
+                self.suppressed += 1
+                return False
+        if skipped:
+            record.msg = f"{record.getMessage()}（此前 {self.interval:g} 秒内省略了 {skipped} 条相同日志）"
+            record.args = None
+        return True
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory for the diagnostics endpoint."""
+
+    def __init__(self, capacity: int = RING_BUFFER_SIZE):
+        super().__init__()
+        self._records = deque(maxlen=capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._records.maxlen
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._records.append({
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            })
+        except Exception:
+            self.handleError(record)
+
+    def get_entries(self, limit: Optional[int] = None, min_level: int = logging.NOTSET) -> List[dict]:
+        """Returns the buffered entries at or above `min_level`, oldest first, at most the last `limit`."""
+        entries = [entry for entry in list(self._records) if logging.getLevelName(entry["level"]) >= min_level]
+        if limit is not None:
+            entries = entries[-limit:] if limit > 0 else []
+        return entries
+
+    def clear(self):
+        self._records.clear()
+
+
+_ring_buffer = RingBufferHandler()
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_sampling_filter: Optional[SamplingFilter] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def get_log_ring_buffer() -> RingBufferHandler:
+    """Returns the process-wide in-memory log buffer."""
+    return _ring_buffer
+
+
+def configure_logging(level: int = logging.INFO, file_path: str = log_file):
+    """
+    配置日志记录：根日志记录器只挂一个 QueueHandler，调用方（包括 Resolve 线程）只把记录放进有界队列；
+    QueueListener 在后台线程中把记录写入轮转的日志文件（resolve_connection.log）、控制台和内存环形缓冲区。
+    在应用启动时调用，而不是在导入模块时，这样导入 `main` 不会打开日志文件；
+    根日志记录器已有处理器（或已经配置过）时不做任何事。
+    """
+    global _queue_handler, _sampling_filter, _listener
+    root = logging.getLogger()
+    if _listener is not None or root.handlers:
+        return
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler, _ring_buffer):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    _sampling_filter = SamplingFilter()
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(_sampling_filter)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, _ring_buffer)
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    _listener.start()
+
+
+def shutdown_logging():
+    """停止后台日志线程：先写完队列中剩余的记录，再关闭文件。"""
+    global _queue_handler, _sampling_filter, _listener
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        if handler is not _ring_buffer:
+            handler.close()
+    _queue_handler = _sampling_filter = _listener = None
+
+
+def get_logging_stats() -> dict:
+    return {
+        "configured": _listener is not None,
+        "dropped": _queue_handler.dropped if _queue_handler is not None else 0,
+        "suppressed": _sampling_filter.suppressed if _sampling_filter is not None else 0,
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "buffered": len(_ring_buffer.get_entries()),
+        "capacity": _ring_buffer.capacity,
+    }
@@ -1,24 +1,137 @@
-from fastapi import FastAPI, HTTPException, Response
+import asyncio
+import io
+import json
+import logging
+import threading
+import time
+import zipfile
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Union
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from typing import List, Optional, Union
+from pydantic import ValidationError
 
-from resolve_utils import get_resolve_subtitles, set_resolve_timecode, generate_srt_content, export_to_davinci, get_resolve_project_info, get_subtitle_tracks
+from resolve_utils import get_resolve_subtitles, get_resolve_subtitle_changes, get_resolve_all_subtitles, get_resolve_subtitle_track_plan, read_resolve_track, get_resolve_track_snapshot, iter_srt_content, set_resolve_timecode, set_resolve_playhead, export_to_davinci, export_compiled_to_davinci, EXPORT_PHASES, get_resolve_project_info, get_subtitle_tracks, prewarm_resolve_connection, check_resolve_connection, probe_timeline_state
+from resolve_session import get_session_cache
+from resolve_executor import get_resolve_executor, ResolveExecutorBusy
+from resolve_health import get_connection_keeper
+from resolve_metrics import current_endpoint, get_metrics_registry
+from log_pipeline import configure_logging, get_log_ring_buffer, get_logging_stats, shutdown_logging
+from single_flight import get_single_flight
+from navigation import get_navigation_channel
+from timeline_watcher import get_timeline_watcher
+from export_jobs import JobQueueFull, get_export_jobs
+from response_cache import EncodedResponseCache, FastJSONResponse, encode_json, etag_matches, orjson
+from subtitle_streams import buffered_bytes, iter_subtitles_json, iter_subtitles_ndjson
+from subtitle_export import compile_export_request, get_export_format, iter_srt, list_export_formats
+from subtitle_columns import (
+    COLUMNS_JSON_MEDIA_TYPE,
+    COLUMNS_MSGPACK_MEDIA_TYPE,
+    ColumnsUnavailable,
+    compile_columns,
+    decode_columns,
+    encode_msgpack,
+    is_columns_media_type,
+    snapshot_columns,
+)
+from subtitle_ingest import MAX_UPLOAD_BYTES, get_ingest_store, parse_upload
+from text_diff import diff_batch, get_diff_cache
+from subtitle_search import InvalidSearchPattern, compile_search_pattern, get_search_index_store, render_search_page
 from schemas import (
     SubtitleItem,
     SuccessResponse,
     ErrorResponse,
     TimecodeRequest,
+    NavigationRequest,
     SubtitleExportRequest,
     SubtitleTrackInfo,
     SubtitleTrackListResponse,
+    SubtitleChangesResponse,
+    SubtitleResponseFormat,
+    AllSubtitlesResponse,
+    SubtitleImportResponse,
+    SearchResponse,
+    SearchReplaceRequest,
+    SearchReplaceResponse,
+    DiffRequest,
+    DiffResponse,
+    SubtitleColumns,
 )
 
+async def _prewarm_resolve():
+    status, result = await run_resolve_call(prewarm_resolve_connection)
+    if status == "success":
+        logging.info(f"DaVinci Resolve 连接已预热，耗时 {result['timings']['connect']} ms。")
+    else:
+        logging.warning(f"预热 DaVinci Resolve 连接失败，连接守护任务将在后台重试: {result.get('message')}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    启动时配置日志，并在后台预热 Resolve 连接（加载脚本模块、连接、填充会话缓存），
+    不阻塞服务器开始接受请求；首个请求会与预热任务在 Resolve 线程上排队，而不是重复连接。
+    随后启动连接守护任务：定期检查连接，断开后以指数退避在后台重连；
+    以及时间线监视任务：有 `/ws` 客户端连接时定期探测 Resolve，并向所有客户端推送变更事件。
+    关闭时停止后台日志线程，写完队列中剩余的日志。
+    """
+    configure_logging()
+    prewarm = asyncio.create_task(_prewarm_resolve())
+    keeper = asyncio.create_task(get_connection_keeper().run(lambda: run_resolve_call(check_resolve_connection)))
+    watcher = asyncio.create_task(get_timeline_watcher().run(
+        lambda known_signatures, full_scan, rescan_tracks: run_resolve_call(
+            probe_timeline_state, known_signatures, full_scan, rescan_tracks),
+        is_busy=lambda: get_resolve_executor().get_stats()["queue_depth"] > 0))
+    yield
+    prewarm.cancel()
+    keeper.cancel()
+    watcher.cancel()
+    shutdown_logging()
+
+
 app = FastAPI(
     title="DaVinci Resolve Subtitle Extractor API",
     description="一个用于从DaVinci Resolve提取字幕的API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+
+class InstrumentedRoute(APIRoute):
+    """记录每个端点的请求耗时（至响应开始发送为止），并把端点路径标记到该请求发起的 Resolve 调用上。"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        path = self.path
+
+        async def instrumented_handler(request: Request) -> Response:
+            # 不重置：流式响应体在处理函数返回后才生成，其中的 Resolve 调用仍属于该端点
+            current_endpoint.set(path)
+            started = time.perf_counter()
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                get_metrics_registry().observe_request(path, request.method, status_code, time.perf_counter() - started)
+
+        return instrumented_handler
+
+
+app.router.route_class = InstrumentedRoute
+
 # CORS (Cross-Origin Resource Sharing) 中间件配置
 origins = [
     "http://localhost:1420",  # Tauri应用的默认开发服务器地址
@@ -31,8 +144,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+# 每条字幕轨道最近一次返回的已编码响应体（按内容指纹校验）
+_subtitle_responses = EncodedResponseCache()
+
 # (Pydantic模型已移至 schemas.py)
 
 
@@ -42,27 +159,126 @@ def handle_error(error_code: str, error_message: str):
     """根据错误代码，抛出相应的HTTPException。"""
     if error_code in ["resolve_not_running", "connection_error"]:
         raise HTTPException(status_code=503, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code in ["resolve_busy", "job_queue_full"]:
+        raise HTTPException(status_code=503, detail={"status": "error", "message": error_message, "code": error_code})
     elif error_code in ["no_project_open", "no_active_timeline"]:
         raise HTTPException(status_code=404, detail={"status": "error", "message": error_message, "code": error_code})
-    elif error_code == "set_timecode_failed":
+    elif error_code in ["set_timecode_failed", "unsupported_export_format", "invalid_pattern", "invalid_log_level"]:
         raise HTTPException(status_code=400, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code in ["upload_not_found", "cue_not_found", "job_not_found"]:
+        raise HTTPException(status_code=404, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code in ["invalid_payload"]:
+        raise HTTPException(status_code=422, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code == "unsupported_media_type":
+        raise HTTPException(status_code=415, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code == "not_acceptable":
+        raise HTTPException(status_code=406, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code == "upload_too_large":
+        raise HTTPException(status_code=413, detail={"status": "error", "message": error_message, "code": error_code})
+    elif error_code == "job_not_cancellable":
+        raise HTTPException(status_code=409, detail={"status": "error", "message": error_message, "code": error_code})
     elif error_code == "dvr_script_not_found":
         raise HTTPException(status_code=500, detail={"status": "error", "message": error_message, "code": error_code})
     else:
         raise HTTPException(status_code=500, detail={"status": "error", "message": error_message, "code": error_code})
 
 
+async def run_resolve_call(fn, *args, **kwargs):
+    """
+    在专用的 Resolve 线程上执行 `fn`，并以 (status, data) 元组返回结果。
+    任务队列已满时返回 `resolve_busy` 错误，而不是继续排队。
+    """
+    try:
+        return await get_resolve_executor().run(fn, *args, **kwargs)
+    except ResolveExecutorBusy as e:
+        return "error", {"code": "resolve_busy", "message": f"DaVinci Resolve 正忙，请稍后重试。{e}"}
+
+
+async def run_coalesced_resolve_call(name: str, key_parts: tuple, fn, *args, **kwargs):
+    """
+    与 `run_resolve_call` 相同，但以 (name, 项目, 时间线, *key_parts) 为键合并并发的相同请求：
+    仍在 Resolve 队列中等待的提取会被所有相同请求共享。
+
+    键中的项目和时间线取自会话缓存（上一次查询的结果），切换时间线后可能已过期。
+    因此提取一旦在 Resolve 线程上开始执行，后到的请求不再加入，而是排队执行新的提取：
+    共享的结果总是在请求到达之后才读取的，不会把切换前时间线的数据交给切换后到达的请求。
+    """
+    key = (name, *get_session_cache().current_identity(), *key_parts)
+    started = threading.Event()
+
+    def mark_started_and_call(*call_args, **call_kwargs):
+        started.set()
+        return fn(*call_args, **call_kwargs)
+
+    return await get_single_flight().do(key, run_resolve_call, mark_started_and_call, *args, started=started, **kwargs)
+
+
+def format_server_timing(timings: dict) -> str:
+    """将各阶段耗时（毫秒）格式化为 `Server-Timing` 响应头。"""
+    return ", ".join(f"{phase};dur={duration}" for phase, duration in timings.items())
+
+
+async def read_export_payload(request: Request) -> Union[SubtitleExportRequest, SubtitleColumns]:
+    """
+    读取导出请求体：`application/json` 为逐条字幕的 `SubtitleExportRequest`，
+    列式媒体类型（JSON 或 MessagePack）为 `SubtitleColumns`，按整列一次性校验。
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type")
+    try:
+        if is_columns_media_type(content_type):
+            return decode_columns(body, content_type)
+        return SubtitleExportRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)])
+    except ColumnsUnavailable as e:
+        handle_error("unsupported_media_type", str(e))
+    except ValueError as e:
+        handle_error("invalid_payload", str(e))
+
+
+def compile_export_payload(export: Union[SubtitleExportRequest, SubtitleColumns], base_frames: int = 0):
+    if isinstance(export, SubtitleColumns):
+        return compile_columns(export, base_frames)
+    return compile_export_request(export, base_frames)
+
+
+# 导出端点手动读取请求体，在 OpenAPI 中声明其支持的媒体类型
+EXPORT_REQUEST_BODY = {"requestBody": {"required": True, "content": {
+    "application/json": {"schema": {"$ref": "#/components/schemas/SubtitleExportRequest"}},
+    COLUMNS_JSON_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/SubtitleColumns"}},
+    COLUMNS_MSGPACK_MEDIA_TYPE: {"schema": {"$ref": "#/components/schemas/SubtitleColumns"}},
+}}}
+
+
+def custom_openapi():
+    if app.openapi_schema is None:
+        schema = get_openapi(title=app.title, version=app.version, description=app.description, routes=app.routes)
+        components = schema.setdefault("components", {}).setdefault("schemas", {})
+        for model in (SubtitleExportRequest, SubtitleColumns):
+            model_schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+            for name, definition in model_schema.pop("$defs", {}).items():
+                components.setdefault(name, definition)
+            components[model.__name__] = model_schema
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
+
 # --- API 端点 ---
 
 @app.post("/api/v1/timeline/timecode",
           tags=["Timeline"],
           summary="设置DaVinci Resolve当前时间线的时间码",
           description="连接到正在运行的DaVinci Resolve实例，并设置当前活动时间线的播放头位置。")
-def set_timecode(request: TimecodeRequest):
+async def set_timecode(request: TimecodeRequest):
     """
     ## 功能:
     - 接收一个包含入点、出点和跳转选项的POST请求。
     - 根据 `jump_to` 参数的值（'start', 'end', 'middle'），调用 `set_resolve_timecode` 函数来在Resolve中设置时间码。
+    - 与 `/api/v1/timeline/navigate` 共用最新优先的跳转通道：尚未发送的跳转被更新的跳转取代时返回 `superseded`。
 
     ## 请求体:
     - **in_point (str):** 入点时间码，格式为 "HH:MM:SS:FF"。
@@ -73,14 +289,55 @@ def set_timecode(request: TimecodeRequest):
     - **成功 (200):** 返回成功信息。
     - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
     """
-    status, result = set_resolve_timecode(
+    status, result = await get_navigation_channel().jump(lambda: run_resolve_call(
+        set_resolve_timecode,
         in_point=request.in_point,
         out_point=request.out_point,
         jump_to=request.jump_to.value
-    )
+    ))
 
-    if status == "success":
-        return {"status": "success", "message": result.get("message")}
+    if status in ("success", "superseded"):
+        return {"status": status, "message": result.get("message")}
+
+    error_code = result.get("code", "unknown_error")
+    error_message = result.get("message", "An unknown error occurred.")
+    handle_error(error_code, error_message)
+
+
+@app.post("/api/v1/timeline/navigate",
+          tags=["Timeline"],
+          summary="移动DaVinci Resolve播放头（最新优先）",
+          description="按时间码、时间线绝对帧或字幕 ID 移动播放头。快速连续的跳转只发送最新的一个，被取代的跳转不会到达 Resolve。")
+async def navigate_timeline(request: NavigationRequest, response: Response):
+    """
+    ## 功能:
+    - 同一时间只有一个跳转在发送到 Resolve；期间到达的跳转互相取代，只保留最新的一个。
+    - 距上一次跳转不足防抖间隔的跳转会等到间隔结束，再发送届时最新的目标。
+    - 按 `cue_id` 跳转时使用该轨道最近一次提取的字幕，`jump_to` 选择字幕的起点、终点或中点。
+
+    ## 请求体:
+    - **timecode / frame / cue_id:** 跳转目标，必须且只能提供一个。
+    - **track_index (int):** `cue_id` 所在的字幕轨道，默认为 1。
+    - **jump_to (str):** 按 `cue_id` 跳转时的位置，可选值为 'start', 'end', 'middle'，默认为 'start'。
+
+    ## 返回:
+    - **status:** `success`，或 `superseded`（被更新的跳转取代，播放头未按此请求移动）。
+    - **timecode:** 播放头移动到的时间码（仅 `success`）。
+    - **latency_ms:** 端到端跳转耗时：`queued`（在通道中等待）、`resolve`（Resolve 执行）和 `total`；
+      同时以 `Server-Timing` 响应头返回。
+    """
+    status, result = await get_navigation_channel().jump(lambda: run_resolve_call(
+        set_resolve_playhead,
+        timecode=request.timecode,
+        frame=request.frame,
+        cue_id=request.cue_id,
+        track_index=request.track_index,
+        jump_to=request.jump_to.value,
+    ))
+
+    if status in ("success", "superseded"):
+        response.headers["Server-Timing"] = format_server_timing(result["latency_ms"])
+        return {"status": status, "timecode": result.get("timecode"), "latency_ms": result["latency_ms"]}
 
     error_code = result.get("code", "unknown_error")
     error_message = result.get("message", "An unknown error occurred.")
@@ -92,7 +349,7 @@ def set_timecode(request: TimecodeRequest):
           tags=["Timeline"],
           summary="获取DaVinci Resolve时间线上所有的字幕轨道",
           description="连接到正在运行的DaVinci Resolve实例，并返回当前活动时间线上所有字幕轨道的列表，包含轨道索引和名称。")
-def get_subtitle_tracks_endpoint():
+async def get_subtitle_tracks_endpoint():
     """
     ## 功能:
     - 连接到 DaVinci Resolve。
@@ -103,7 +360,7 @@ def get_subtitle_tracks_endpoint():
     - **成功 (200):** 返回包含字幕轨道列表的JSON对象。
     - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
     """
-    status, result = get_subtitle_tracks()
+    status, result = await run_coalesced_resolve_call("subtitle_tracks", (), get_subtitle_tracks)
 
     if status == "success":
         return {"status": "success", "data": result.get("data")}
@@ -118,7 +375,11 @@ def get_subtitle_tracks_endpoint():
          tags=["Subtitles"],
          summary="提取DaVinci Resolve当前时间线的字幕",
          description="连接到正在运行的DaVinci Resolve实例，并从当前活动时间线的指定字幕轨道中，提取所有字幕条目的起始时间码、结束时间码和文本内容。")
-def get_subtitles(track_index: int = 1):
+async def get_subtitles(
+    request: Request,
+    track_index: int = 1,
+    format: SubtitleResponseFormat = SubtitleResponseFormat.json,
+):
     """
     ## 功能:
     - 连接到 DaVinci Resolve。
@@ -127,27 +388,318 @@ def get_subtitles(track_index: int = 1):
 
     ## 查询参数:
     - **track_index (int):** 要提取字幕的轨道索引，默认为 1。
+    - **format (str):** 响应格式，默认为 `json`。
+        - `json`: 完整的 JSON 响应体（可被缓存复用）。
+        - `json-stream`: 与 `json` 内容相同，但分块流式发送，内存占用恒定。
+        - `ndjson`: 流式的换行分隔 JSON，首行为 `{"status", "frameRate", "count"}`，其后每行一条字幕。
+        - `columnar`: 列式 JSON（`SubtitleColumns`：`startFrames`、`endFrames`、`texts` 平行数组，帧为时间线绝对帧）。
+        - `columnar-msgpack`: 与 `columnar` 相同，以 MessagePack 编码（需要服务器安装 `msgpack`）。
+
+    ## 条件请求:
+    - 响应带有基于轨道内容指纹的 `ETag`。请求携带匹配的 `If-None-Match` 时返回 `304 Not Modified`，不再发送字幕数据。
+    - 轨道内容与上次返回时相同时，直接复用上次编码好的响应体，跳过 JSON 编码和响应模型校验。
+    - 安装了 `orjson` 时使用其进行 JSON 编码，否则使用标准库 `json`。
 
     ## 返回:
-    - **成功 (200):** 返回包含字幕数据的JSON对象。
+    - **成功 (200):** 返回包含字幕数据的JSON对象，并通过 `Server-Timing` 响应头报告各阶段耗时
+      （`ipc`: 读取 Resolve 条目, `fingerprint`: 计算内容指纹, `format`: 时间码转换, `serialize`: 组装结果, `encode`: JSON 编码）。
+    - **未修改 (304):** 轨道内容与 `If-None-Match` 中的版本一致。
     - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
     """
-    status, result = get_resolve_subtitles(track_index=track_index)
+    if format in (SubtitleResponseFormat.columnar, SubtitleResponseFormat.columnar_msgpack):
+        return await _columnar_subtitles(request, track_index, format)
+    if format != SubtitleResponseFormat.json:
+        return await _stream_subtitles(request, track_index, format)
+
+    status, result = await run_coalesced_resolve_call(
+        "subtitles", (track_index,), get_resolve_subtitles, track_index=track_index
+    )
 
     if status == "success":
-        return {"status": "success", "frameRate": result.get("frameRate"), "data": result.get("data")}
-    
+        payload = {"status": "success", "frameRate": result.get("frameRate"), "data": result.get("data")}
+        timings = dict(result.get("timings") or {})
+        fingerprint = result.get("fingerprint")
+        if not fingerprint:
+            headers = {"Server-Timing": format_server_timing(timings)} if timings else None
+            return FastJSONResponse(payload, headers=headers)
+
+        etag = f'"{fingerprint}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            headers["Server-Timing"] = format_server_timing(timings)
+            return Response(status_code=304, headers=headers)
+
+        cache_key = (*get_session_cache().current_identity(), track_index)
+        body = _subtitle_responses.get(cache_key, fingerprint)
+        if body is None:
+            encode_started = time.perf_counter()
+            body = encode_json(payload)
+            timings["encode"] = round((time.perf_counter() - encode_started) * 1000, 3)
+            _subtitle_responses.put(cache_key, fingerprint, body)
+        headers["Server-Timing"] = format_server_timing(timings)
+        return Response(content=body, media_type="application/json", headers=headers)
+
     # 处理来自 resolve_utils 的错误
     error_code = result.get("code", "unknown_error")
     error_message = result.get("message", "An unknown error occurred.")
     handle_error(error_code, error_message)
 
 
+async def _columnar_subtitles(request: Request, track_index: int, format: SubtitleResponseFormat):
+    """以列式格式（JSON 或 MessagePack）返回字幕轨道，编码结果按轨道指纹缓存。"""
+    status, result = await run_coalesced_resolve_call(
+        "subtitle_snapshot", (track_index,), get_resolve_track_snapshot, track_index=track_index
+    )
+    if status != "success":
+        handle_error(result.get("code", "unknown_error"), result.get("message", "An unknown error occurred."))
+
+    snapshot = result["snapshot"]
+    timings = dict(result["timings"])
+    etag = f'"{snapshot.fingerprint}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        headers["Server-Timing"] = format_server_timing(timings)
+        return Response(status_code=304, headers=headers)
+
+    msgpack_format = format == SubtitleResponseFormat.columnar_msgpack
+    cache_key = (*result["track_key"], format.value)
+    body = _subtitle_responses.get(cache_key, snapshot.fingerprint)
+    if body is None:
+        encode_started = time.perf_counter()
+        try:
+            body = encode_msgpack(snapshot_columns(snapshot)) if msgpack_format else encode_json(snapshot_columns(snapshot))
+        except ColumnsUnavailable as e:
+            handle_error("not_acceptable", str(e))
+        timings["encode"] = round((time.perf_counter() - encode_started) * 1000, 3)
+        _subtitle_responses.put(cache_key, snapshot.fingerprint, body)
+    headers["Server-Timing"] = format_server_timing(timings)
+    media_type = COLUMNS_MSGPACK_MEDIA_TYPE if msgpack_format else COLUMNS_JSON_MEDIA_TYPE
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def _stream_subtitles(request: Request, track_index: int, format: SubtitleResponseFormat):
+    """以流式响应返回字幕轨道：按块转换时间码并分块编码，内存占用与轨道长度无关。"""
+    status, result = await run_coalesced_resolve_call(
+        "subtitle_snapshot", (track_index,), get_resolve_track_snapshot, track_index=track_index
+    )
+
+    if status == "success":
+        snapshot = result["snapshot"]
+        etag = f'"{snapshot.fingerprint}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Server-Timing": format_server_timing(result["timings"])}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if format == SubtitleResponseFormat.ndjson:
+            return StreamingResponse(buffered_bytes(iter_subtitles_ndjson(snapshot)), media_type="application/x-ndjson", headers=headers)
+        return StreamingResponse(buffered_bytes(iter_subtitles_json(snapshot)), media_type="application/json", headers=headers)
+
+    error_code = result.get("code", "unknown_error")
+    error_message = result.get("message", "An unknown error occurred.")
+    handle_error(error_code, error_message)
+
+
+@app.get("/api/v1/subtitles/all",
+         response_model=Union[AllSubtitlesResponse, ErrorResponse],
+         tags=["Subtitles"],
+         summary="一次性提取所有字幕轨道",
+         description="只解析一次当前时间线，提取所有（或指定的）字幕轨道的名称和字幕条目，一次请求即可加载多语言时间线。")
+async def get_all_subtitles(
+    track: Optional[List[int]] = Query(None, description="只提取这些轨道索引，可重复，例如 `?track=1&track=3`"),
+    stream: bool = False,
+):
+    """
+    ## 功能:
+    - 连接到 DaVinci Resolve，只解析一次当前项目、时间线和帧率。
+    - 依次提取每条字幕轨道的名称和字幕条目。
+
+    ## 查询参数:
+    - **track (List[int]):** 可选的轨道过滤，默认提取所有字幕轨道。
+    - **stream (bool):** 为 true 时以换行分隔 JSON 逐轨道流式返回：首行为 `{"status", "frameRate", "trackCount"}`，
+      其后每行一条轨道 `{"track_index", "track_name", "fingerprint", "data"}`。每条轨道提取完成即发送。
+
+    ## 返回:
+    - **成功 (200):** 返回包含帧率和所有轨道字幕的JSON对象。所有轨道内容都未变化时复用上次编码好的响应体。
+    - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
+    """
+    if stream:
+        return await _stream_all_subtitles(track)
+
+    track_filter = tuple(track) if track else None
+    status, result = await run_coalesced_resolve_call(
+        "subtitles_all", (track_filter,), get_resolve_all_subtitles, track
+    )
+
+    if status == "success":
+        timings = dict(result.get("timings") or {})
+        tracks = result.get("tracks")
+        # 各轨道指纹的组合：任一轨道变化（或轨道增减）都会使缓存的响应体失效
+        fingerprint = f'{result.get("frameRate")}|' + "|".join(
+            f'{t["track_index"]}:{t.get("fingerprint")}' for t in tracks)
+        cache_key = (*get_session_cache().current_identity(), "all", track_filter)
+        body = _subtitle_responses.get(cache_key, fingerprint)
+        if body is None:
+            encode_started = time.perf_counter()
+            body = encode_json({"status": "success", "frameRate": result.get("frameRate"), "tracks": tracks})
+            timings["encode"] = round((time.perf_counter() - encode_started) * 1000, 3)
+            _subtitle_responses.put(cache_key, fingerprint, body)
+        headers = {"Server-Timing": format_server_timing(timings)} if timings else None
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    error_code = result.get("code", "unknown_error")
+    error_message = result.get("message", "An unknown error occurred.")
+    handle_error(error_code, error_message)
+
+
+async def _stream_all_subtitles(track_indices: Optional[List[int]]):
+    """逐轨道流式返回字幕：时间线只解析一次，每条轨道作为单独的 Resolve 任务提取，完成即发送。"""
+    status, plan = await run_resolve_call(get_resolve_subtitle_track_plan, track_indices)
+    if status != "success":
+        handle_error(plan.get("code", "unknown_error"), plan.get("message", "An unknown error occurred."))
+
+    timeline = plan["timeline"]
+    frame_rate = plan["frameRate"]
+
+    async def lines():
+        yield encode_json({"status": "success", "frameRate": frame_rate, "trackCount": len(plan["tracks"])}) + b"\n"
+        for track_index, track_name in plan["tracks"]:
+            try:
+                status, result = await run_resolve_call(read_resolve_track, timeline, frame_rate, track_index, track_name)
+            except Exception as e:
+                status, result = "error", {"code": "extract_failed", "message": f"提取字幕轨道 {track_index} 时出错: {e}"}
+            if status != "success":
+                yield encode_json({"status": "error", **result}) + b"\n"
+                return
+            yield encode_json(result) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/api/v1/subtitles/changes",
+         response_model=Union[SubtitleChangesResponse, ErrorResponse],
+         tags=["Subtitles"],
+         summary="获取字幕轨道自某个版本以来的变更",
+         description="提取指定字幕轨道，仅返回自客户端版本令牌以来新增、删除或重新定时的字幕条目，以及新的版本令牌。")
+async def get_subtitle_changes(track_index: int = 1, since: Optional[str] = None):
+    """
+    ## 功能:
+    - 从指定字幕轨道提取字幕，并与服务器保留的 `since` 版本比较。
+    - 字幕条目以 “起始帧 + 文本哈希” 作为键；`id` 为条目在当前轨道上的位置。
+
+    ## 查询参数:
+    - **track_index (int):** 要提取字幕的轨道索引，默认为 1。
+    - **since (str):** 上次返回的 `token`，或 `/api/v1/subtitles` 响应的 `ETag`（不含引号）。
+
+    ## 返回:
+    - **added:** 新增的条目。
+    - **removed:** 被删除条目的键。
+    - **retimed:** 起止时间发生变化的条目，`previousKey` 为其旧键。
+    - **reset:** 未提供 `since` 或该版本已过期时为 true，此时 `added` 包含整条轨道。
+    - **token:** 当前版本的令牌。
+    """
+    status, result = await run_resolve_call(get_resolve_subtitle_changes, track_index=track_index, since=since)
+
+    if status == "success":
+        timings = result.pop("timings", None)
+        headers = {"Server-Timing": format_server_timing(timings)} if timings else None
+        return FastJSONResponse({"status": "success", **result}, headers=headers)
+
+    error_code = result.get("code", "unknown_error")
+    error_message = result.get("message", "An unknown error occurred.")
+    handle_error(error_code, error_message)
+
+
+async def _get_search_index(track_index: int):
+    """提取（或复用合并中的提取）轨道快照，并在线程池中增量更新该轨道的搜索索引。"""
+    status, result = await run_coalesced_resolve_call(
+        "subtitle_snapshot", (track_index,), get_resolve_track_snapshot, track_index=track_index
+    )
+    if status != "success":
+        handle_error(result.get("code", "unknown_error"), result.get("message", "An unknown error occurred."))
+    return await run_in_threadpool(get_search_index_store().get_index, result["track_key"], result["snapshot"])
+
+
+def _compile_search_pattern(query: str, regex: bool, match_case: bool, whole_word: bool):
+    try:
+        return compile_search_pattern(query, regex, match_case, whole_word)
+    except InvalidSearchPattern as e:
+        handle_error("invalid_pattern", str(e))
+
+
+@app.get("/api/v1/search",
+         response_model=Union[SearchResponse, ErrorResponse],
+         tags=["Search"],
+         summary="在字幕轨道中查找")
+async def search_subtitles(
+    q: str = Query(..., min_length=1, description="查找内容"),
+    track_index: int = 1,
+    regex: bool = False,
+    match_case: bool = False,
+    whole_word: bool = False,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=1000),
+):
+    """
+    ## 功能:
+    - 在服务端对提取的字幕轨道执行查找，选项与前端查找/替换一致（正则、区分大小写、全字匹配）。
+    - 每条轨道维护一个 n-gram 索引：首次搜索时构建，轨道变化后只对新增/删除的字幕增量更新。
+      普通文本查询只校验包含全部 n-gram 的字幕。
+
+    ## 返回:
+    - **成功 (200):** 一页包含匹配的字幕条目及每处匹配的偏移。
+    - **失败 (400):** 正则表达式无效。
+    """
+    pattern = _compile_search_pattern(q, regex, match_case, whole_word)
+    index = await _get_search_index(track_index)
+    results = await run_in_threadpool(index.search, pattern, None if regex else q)
+    return FastJSONResponse({"status": "success", **render_search_page(index, results, page, page_size)})
+
+
+@app.post("/api/v1/search/replace",
+          response_model=Union[SearchReplaceResponse, ErrorResponse],
+          tags=["Search"],
+          summary="在字幕轨道中全部替换")
+async def replace_subtitles(request: SearchReplaceRequest):
+    """
+    ## 功能:
+    - 对轨道上所有匹配的字幕执行替换，一次返回每条受影响字幕的新文本及其相对原始文本的 `diffs`。
+    - 替换文本支持 JavaScript 风格的 `$&`、`$1`、`$<name>` 和 `$$`。
+    - 客户端已编辑过的字幕可通过 `edits` 传入当前文本，替换基于该文本进行。
+    - 不修改 Resolve 中的内容；结果由客户端应用，并可直接用于 `/api/v1/export/*`。
+    """
+    pattern = _compile_search_pattern(request.query, request.regex, request.matchCase, request.wholeWord)
+    index = await _get_search_index(request.track_index)
+    cues = await run_in_threadpool(
+        index.replace, pattern, request.replacement, None if request.regex else request.query, request.edits
+    )
+    return FastJSONResponse({"status": "success", "fingerprint": index.fingerprint, "count": len(cues), "cues": cues})
+
+
+@app.post("/api/v1/diff",
+          response_model=Union[DiffResponse, ErrorResponse],
+          tags=["Diff"],
+          summary="批量计算字幕文本差异")
+async def diff_subtitles(request: DiffRequest):
+    """
+    ## 功能:
+    - 一次计算整条轨道的原始文本与编辑后文本的差异（Myers 算法），结果格式与 `DiffPartModel` 相同。
+    - `granularity` 为 `char`（逐字符，与前端 `calculateDiff` 一致）或 `word`（逐词，中日韩文字按单字）。
+    - 结果按（原文哈希，编辑后哈希）缓存；未命中缓存的条目较多时分配到进程池并行计算。
+    """
+    pairs = [(item.original, item.edited) for item in request.items]
+    diffs = await run_in_threadpool(diff_batch, pairs, request.granularity.value)
+    return FastJSONResponse({
+        "status": "success",
+        "granularity": request.granularity.value,
+        "items": [{"id": item.id, "diffs": item_diffs} for item, item_diffs in zip(request.items, diffs)],
+    })
+
+
 @app.get("/api/v1/project-info",
          tags=["Project"],
          summary="获取DaVinci Resolve当前项目和时间线信息",
          description="连接到正在运行的DaVinci Resolve实例，并获取当前项目和时间线的名称。")
-def get_project_info():
+async def get_project_info():
     """
     ## 功能:
     - 连接到 DaVinci Resolve。
@@ -157,7 +709,7 @@ def get_project_info():
     - **成功 (200):** 返回包含项目和时间线名称的JSON对象。
     - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
     """
-    status, result = get_resolve_project_info()
+    status, result = await run_resolve_call(get_resolve_project_info)
 
     if status == "success":
         return {"status": "success", "data": result}
@@ -167,19 +719,268 @@ def get_project_info():
     handle_error(error_code, error_message)
 
 
+@app.get("/api/v1/jobs", tags=["Jobs"], summary="列出后台导出任务")
+def list_jobs():
+    """
+    ## 返回:
+    - **data:** 排队中、运行中的任务以及最近完成的任务（有上限），最新的在前。
+    """
+    return FastJSONResponse({"status": "success", "data": get_export_jobs().list()})
+
+
+@app.get("/api/v1/jobs/{job_id}", tags=["Jobs"], summary="查询后台导出任务的状态和进度")
+def get_job(job_id: str):
+    """
+    ## 返回:
+    - **state:** `queued`、`running`、`succeeded`、`failed` 或 `cancelled`。
+    - **phase / progress:** 当前阶段（`prepare`、`write`、`import`、`append`）及已完成阶段的比例。
+    - **cancellable:** 是否仍可取消（开始导入媒体、修改项目之前）。
+    - **timings:** 排队时间、各阶段耗时和总耗时（毫秒）。
+    - **result / error:** 成功时的导出结果或失败时的错误信息。
+    """
+    job = get_export_jobs().get(job_id)
+    if job is None:
+        handle_error("job_not_found", f"未找到任务 {job_id}，可能已从历史记录中移除。")
+    return FastJSONResponse({"status": "success", "data": job.to_dict()})
+
+
+@app.post("/api/v1/jobs/{job_id}/cancel", tags=["Jobs"], summary="取消后台导出任务")
+def cancel_job(job_id: str):
+    """
+    ## 功能:
+    - 排队中的任务立即取消；运行中的任务在进入下一阶段时停止。
+    - 任务已开始修改项目（导入媒体或附加到时间线）或已结束时返回 409。
+    """
+    job = get_export_jobs().get(job_id)
+    if job is None:
+        handle_error("job_not_found", f"未找到任务 {job_id}，可能已从历史记录中移除。")
+    if not job.cancel():
+        handle_error("job_not_cancellable", "任务已开始修改项目或已结束，无法取消。")
+    return FastJSONResponse({"status": "success", "data": job.to_dict()})
+
+
+@app.get("/api/v1/diagnostics/export-jobs",
+         tags=["Diagnostics"],
+         summary="获取后台导出任务队列统计",
+         description="返回已提交、被拒绝和排队中的任务数，以及历史记录中各状态的任务数。")
+def get_export_job_stats():
+    return {"status": "success", "data": get_export_jobs().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/session-cache",
+         tags=["Diagnostics"],
+         summary="获取 Resolve 会话缓存的命中统计",
+         description="返回项目/时间线缓存的命中与未命中次数，以及缓存节省的 Resolve 脚本调用次数。")
+def get_session_cache_stats():
+    """
+    ## 返回:
+    - **lookups:** 会话上下文查询次数（每个访问 Resolve 的请求一次）。
+    - **project_hits / project_misses:** 项目层缓存命中/未命中次数。
+    - **timeline_hits / timeline_misses:** 时间线层缓存命中/未命中次数。
+    - **lazy_hits / lazy_misses:** 媒体池、起始时间码等按需字段的命中/未命中次数。
+    - **resolve_calls_avoided:** 缓存省去的脚本调用次数。
+    - **revalidation_calls / revalidations_skipped:** 校验缓存所花的 `GetUniqueId`（及回退的 `GetName`）调用次数，
+      以及因 Resolve 返回了同一个句柄而省去的校验次数。
+    - **resolve_calls_saved / resolve_calls_saved_per_lookup:** 扣除校验调用后净节省的脚本调用总数及每次查询的平均值，可能为负。
+    """
+    return {"status": "success", "data": get_session_cache().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/resolve-executor",
+         tags=["Diagnostics"],
+         summary="获取 Resolve 专用线程的任务队列状态",
+         description="返回 Resolve 任务队列的深度、容量、当前任务已运行时长以及累计的提交/完成/失败/拒绝次数。")
+def get_resolve_executor_stats():
+    return {"status": "success", "data": get_resolve_executor().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/single-flight",
+         tags=["Diagnostics"],
+         summary="获取请求合并（single-flight）统计",
+         description="按端点返回实际执行的 Resolve 提取次数、被合并到进行中请求的次数，以及因相同提取已开始执行而未合并的次数（`started_misses`）。")
+def get_single_flight_stats():
+    return {"status": "success", "data": get_single_flight().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/search-index",
+         tags=["Diagnostics"],
+         summary="获取字幕搜索索引统计",
+         description="返回已索引的轨道数，以及索引的完整构建、增量更新、无需更新的次数和累计索引/移除的字幕条目数。")
+def get_search_index_stats():
+    return {"status": "success", "data": get_search_index_store().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/diff-cache",
+         tags=["Diagnostics"],
+         summary="获取文本差异缓存统计",
+         description="返回差异缓存的条目数、命中/未命中次数以及使用进程池并行计算的批次数。")
+def get_diff_cache_stats():
+    return {"status": "success", "data": get_diff_cache().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/timeline-watcher",
+         tags=["Diagnostics"],
+         summary="获取时间线监视任务统计",
+         description="返回 `/ws` 订阅者数量、探测与完整扫描次数、已推送事件数、重新同步次数，以及监视到的当前状态。")
+def get_timeline_watcher_stats():
+    return {"status": "success", "data": get_timeline_watcher().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/navigation",
+         tags=["Diagnostics"],
+         summary="获取播放头跳转通道统计",
+         description="返回提交、发送、被取代和失败的跳转次数，以及最近跳转的端到端耗时分位数。")
+def get_navigation_stats():
+    return {"status": "success", "data": get_navigation_channel().get_stats()}
+
+
+@app.get("/api/v1/diagnostics/resolve-connection",
+         tags=["Diagnostics"],
+         summary="获取 DaVinci Resolve 连接状态",
+         description="返回后台连接守护任务发布的连接状态、最近一次健康检查的往返耗时，以及检查、失败和重连次数。")
+def get_resolve_connection_stats():
+    """
+    ## 返回:
+    - **state:** `connected`、`disconnected` 或 `unknown`（尚未检查）。
+    - **rtt_ms:** 最近一次健康检查的往返耗时（毫秒）。
+    - **consecutive_failures / next_check_in_s:** 连续失败次数及距下次（退避后）检查的秒数。
+    - **checks / failures / reconnects / reported_failures:** 累计检查、失败、重连次数，以及请求上报的连接错误次数。
+    """
+    return {"status": "success", "data": get_connection_keeper().get_stats()}
+
+
+@app.get("/metrics",
+         tags=["Diagnostics"],
+         summary="Prometheus 指标",
+         response_class=PlainTextResponse,
+         description="以 Prometheus 文本格式返回各端点、各 Resolve 脚本 API 方法的调用次数和耗时直方图，以及各端点的请求耗时直方图。")
+def get_metrics():
+    """
+    ## 指标:
+    - **resolve_api_call_duration_seconds{endpoint, method}:** Resolve 脚本 API 调用耗时直方图，
+      `endpoint` 为发起调用的端点路径（后台连接检查为 `background`）。
+    - **resolve_api_call_errors_total{endpoint, method}:** 抛出异常的 Resolve 调用次数。
+    - **http_request_duration_seconds{endpoint, http_method, status}:** 请求耗时直方图（至响应开始发送为止）。
+    """
+    return PlainTextResponse(get_metrics_registry().render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/v1/diagnostics/response-cache",
+         tags=["Diagnostics"],
+         summary="获取已编码响应缓存统计",
+         description="返回字幕响应体缓存的条目数、命中/未命中次数，以及当前使用的 JSON 编码器。")
+def get_response_cache_stats():
+    return {"status": "success", "data": dict(_subtitle_responses.get_stats(), encoder="orjson" if orjson else "json")}
+
+
+@app.get("/api/v1/diagnostics/logs",
+         tags=["Diagnostics"],
+         summary="获取最近的日志",
+         description="返回内存环形缓冲区中最近的日志条目（最旧的在前），以及日志队列丢弃和采样省略的记录数。")
+def get_recent_logs(
+    limit: int = Query(200, ge=0, description="最多返回的条目数"),
+    level: str = Query("INFO", description="最低日志级别，例如 DEBUG、INFO、WARNING、ERROR"),
+):
+    """
+    ## 返回:
+    - **entries:** 日志条目列表，每项包含 `time`（Unix 时间戳）、`level`、`logger` 和 `message`。
+    - **stats.dropped:** 日志队列已满时被丢弃的记录数（写日志从不阻塞调用方）。
+    - **stats.suppressed:** 热路径日志被采样限流省略的记录数。
+    - **stats.buffered / stats.capacity:** 缓冲区中的条目数及其容量。
+    """
+    min_level = logging.getLevelName(level.upper())
+    if not isinstance(min_level, int):
+        handle_error("invalid_log_level", f"未知的日志级别: {level}")
+    entries = get_log_ring_buffer().get_entries(limit, min_level)
+    return FastJSONResponse({"status": "success", "data": {"entries": entries, "stats": get_logging_stats()}})
+
+
+@app.websocket("/ws")
+async def timeline_events(websocket: WebSocket):
+    """
+    推送时间线变更事件（JSON 文本帧），代替轮询 project-info、subtitle_tracks 和 subtitles：
+    连接后先收到 `hello`（含已知状态，可能为 null），之后收到 `project_changed`、`timeline_changed`、
+    `tracks_changed`、`subtitles_changed`（含新指纹）、`resolve_unavailable` 或 `resync`（积压过多，需重新拉取）。
+    所有客户端共享同一个服务端监视任务。客户端可以发送 `{"type": "rescan", "track_index": n}`，
+    让下一次探测完整读取它正在显示的轨道，以发现只修改了文本的字幕；其他消息会被忽略。
+    """
+    await websocket.accept()
+    watcher = get_timeline_watcher()
+    events = watcher.subscribe()
+
+    async def drain_incoming():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            try:
+                request = json.loads(message.get("text") or "null")
+            except ValueError:
+                continue
+            if isinstance(request, dict) and request.get("type") == "rescan" and isinstance(request.get("track_index"), int):
+                watcher.invalidate(request["track_index"])
+
+    async def push_events():
+        while True:
+            await websocket.send_text(encode_json(await events.get()).decode("utf-8"))
+
+    tasks = [asyncio.ensure_future(drain_incoming()), asyncio.ensure_future(push_events())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                logging.info(f"WebSocket 客户端已断开: {task.exception()!r}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        watcher.unsubscribe(events)
+
+
 @app.get("/", include_in_schema=False)
 def read_root():
     return {"message": "Welcome to the DaVinci Resolve Subtitle Extractor API!"}
 
 
-@app.post("/api/v1/export/srt", tags=["Export"], summary="导出SRT字幕文件")
-def export_subtitles_as_srt(request: SubtitleExportRequest):
-    srt_content = generate_srt_content(request)
-    return Response(content=srt_content, media_type="text/plain")
+@app.post("/api/v1/export/srt", tags=["Export"], summary="导出SRT字幕文件", openapi_extra=EXPORT_REQUEST_BODY)
+def export_subtitles_as_srt(export: Union[SubtitleExportRequest, SubtitleColumns] = Depends(read_export_payload)):
+    """
+    ## 功能:
+    - 将字幕逐块生成为 SRT 并以流式响应发送：首个字节立即发出，内存占用与字幕数量无关。
+    - 输出内容与 `generate_srt_content` 逐字节一致。
+    - 请求体可以是 `SubtitleExportRequest`（`application/json`），也可以是列式的 `SubtitleColumns`
+      （`application/vnd.subtitle-columns+json` 或 `application/vnd.subtitle-columns+msgpack`）。
+    """
+    if isinstance(export, SubtitleColumns):
+        return StreamingResponse(buffered_bytes(iter_srt(compile_columns(export))), media_type="text/plain")
+    return StreamingResponse(buffered_bytes(iter_srt_content(export)), media_type="text/plain")
+
+
+def notify_timeline_write(fn, *args, **kwargs):
+    """
+    在 Resolve 线程上执行导出 `fn`；成功写入时间线后，让时间线监视任务在下一次探测时完整读取写入的轨道，
+    这样即使写入没有改变轨道签名，`/ws` 客户端也会收到 `subtitles_changed`。
+    """
+    status, data = fn(*args, **kwargs)
+    if status == "success" and data.get("track_index") is not None:
+        get_timeline_watcher().invalidate(data["track_index"])
+    return status, data
+
+
+def submit_export_job(kind: str, fn, *args):
+    """将导出作为后台任务提交，立即返回 202 和任务信息；任务状态见 `/api/v1/jobs/{job_id}`。"""
+    try:
+        job = get_export_jobs().submit(kind, EXPORT_PHASES, EXPORT_PHASES[2:], notify_timeline_write, fn, *args)
+    except JobQueueFull as e:
+        handle_error("job_queue_full", f"导出任务队列已满，请稍后重试。{e}")
+    return FastJSONResponse({"status": "accepted", "job": job.to_dict()}, status_code=202,
+                            headers={"Location": f"/api/v1/jobs/{job.id}"})
 
 
-@app.post("/api/v1/export/davinci", tags=["Export"], summary="直接导出字幕到DaVinci Resolve时间线")
-def export_subtitles_to_davinci(request: SubtitleExportRequest):
+@app.post("/api/v1/export/davinci", tags=["Export"], summary="直接导出字幕到DaVinci Resolve时间线", openapi_extra=EXPORT_REQUEST_BODY)
+async def export_subtitles_to_davinci(
+    export: Union[SubtitleExportRequest, SubtitleColumns] = Depends(read_export_payload),
+    background: bool = Query(False, description="作为后台任务执行：立即返回任务 ID，通过 `/api/v1/jobs/{job_id}` 查询进度"),
+):
     """
     ## 功能:
     - 接收包含字幕数据的POST请求。
@@ -192,16 +993,149 @@ def export_subtitles_to_davinci(request: SubtitleExportRequest):
     ## 请求体:
     - **frameRate (float):** 时间线的帧率。
     - **subtitles (List[SubtitleItem]):** 包含字幕条目的列表。
+    - 也可以使用列式的 `SubtitleColumns`（JSON 或 MessagePack），见 `/api/v1/export/srt`。
+
+    ## 查询参数:
+    - **background (bool):** 为 `true` 时作为后台任务执行，立即返回 202 和任务信息（`Location` 头指向任务状态）。
+      任务按提交顺序逐个执行，开始导入媒体之前可以取消。
 
     ## 返回:
     - **成功 (200):** 返回成功信息。
+    - **已接受 (202):** `background=true` 时返回任务信息。
     - **失败 (多种状态码):** 返回包含错误信息的JSON对象。
     """
-    status, result = export_to_davinci(request)
+    if isinstance(export, SubtitleColumns):
+        compile_subtitles = lambda frame_rate, base_frames: compile_columns(export, base_frames)
+        if background:
+            return submit_export_job("export", export_compiled_to_davinci, compile_subtitles)
+        status, result = await run_resolve_call(notify_timeline_write, export_compiled_to_davinci, compile_subtitles)
+    else:
+        if background:
+            return submit_export_job("export", export_to_davinci, export)
+        status, result = await run_resolve_call(notify_timeline_write, export_to_davinci, export)
 
     if status == "success":
         return {"status": "success", "message": result.get("message")}
 
     error_code = result.get("code", "unknown_error")
     error_message = result.get("message", "An unknown error occurred.")
-    handle_error(error_code, error_message)
\ No newline at end of file
+    handle_error(error_code, error_message)
+
+
+@app.post("/api/v1/export/bundle", tags=["Export"], summary="一次导出多种字幕格式（ZIP）", openapi_extra=EXPORT_REQUEST_BODY)
+def export_subtitles_bundle(
+    export: Union[SubtitleExportRequest, SubtitleColumns] = Depends(read_export_payload),
+    formats: List[str] = Query(default=None),
+):
+    """
+    ## 功能:
+    - 只解析一次请求中的时间码与文本，然后渲染为多种格式，打包成一个 ZIP 文件返回。
+
+    ## 查询参数:
+    - **formats (List[str], optional):** 需要的格式，可重复（如 `?formats=srt&formats=vtt`）。不传时导出全部已注册格式。
+
+    ## 返回:
+    - **成功 (200):** `application/zip`，每种格式一个 `subtitles.<扩展名>` 文件。
+    """
+    names = formats or list_export_formats()
+    export_formats = [get_export_format(name) for name in names]
+    if None in export_formats:
+        unknown = [name for name, export_format in zip(names, export_formats) if export_format is None]
+        handle_error("unsupported_export_format", f"不支持的导出格式: {', '.join(unknown)}。可用格式: {', '.join(list_export_formats())}")
+
+    compiled = compile_export_payload(export)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for export_format in export_formats:
+            archive.writestr(f"subtitles.{export_format.extension}", "".join(export_format.render(compiled)))
+    return Response(content=buffer.getvalue(), media_type="application/zip",
+                    headers={"Content-Disposition": 'attachment; filename="subtitles.zip"'})
+
+
+@app.post("/api/v1/export/{export_format}", tags=["Export"], summary="导出指定格式的字幕文件", openapi_extra=EXPORT_REQUEST_BODY)
+def export_subtitles_as_format(export_format: str, export: Union[SubtitleExportRequest, SubtitleColumns] = Depends(read_export_payload)):
+    """
+    ## 功能:
+    - 将字幕导出为指定格式并以流式响应发送。支持的格式: `srt`, `vtt`, `ass`, `ttml`, `sbv`。
+    - 请求只被编译一次为基于帧的中间表示，各格式的写入器只负责渲染。
+
+    ## 返回:
+    - **成功 (200):** 对应格式的字幕文件内容。
+    - **失败 (400):** 不支持的格式。
+    """
+    writer = get_export_format(export_format)
+    if writer is None:
+        handle_error("unsupported_export_format", f"不支持的导出格式: {export_format}。可用格式: {', '.join(list_export_formats())}")
+    compiled = compile_export_payload(export)
+    return StreamingResponse(buffered_bytes(writer.render(compiled)), media_type=writer.media_type)
+
+
+@app.post("/api/v1/import/subtitles",
+          response_model=Union[SubtitleImportResponse, ErrorResponse],
+          tags=["Import"],
+          summary="上传并解析 SRT/WebVTT 字幕文件")
+async def import_subtitles(request: Request, page_size: int = Query(500, ge=1, le=10000)):
+    """
+    ## 功能:
+    - 以请求体上传 SRT 或 WebVTT 文件的原始字节（任意 Content-Type），在服务端流式解析。
+    - 自动处理 BOM、CRLF/CR 换行、UTF-16 以及混入 UTF-8 文件中的 GB18030 行。
+    - 格式错误的字幕块会被跳过，并在 `issues` 中给出准确的行号和列号。
+    - 解析结果按内容缓存，可通过 `uploadId` 获取其他分页或直接导出至 DaVinci Resolve。
+
+    ## 查询参数:
+    - **page_size (int, optional):** 第一页返回的字幕条目数，默认 500。
+
+    ## 返回:
+    - **成功 (200):** 第一页字幕条目及解析信息。
+    - **失败 (413):** 文件超过大小上限。
+    """
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_UPLOAD_BYTES:
+            handle_error("upload_too_large", f"上传的文件超过 {MAX_UPLOAD_BYTES // (1024 * 1024)} MiB 上限。")
+        chunks.append(chunk)
+
+    result = await run_in_threadpool(parse_upload, chunks)
+    get_ingest_store().put(result)
+    return FastJSONResponse({"status": "success", **result.page(1, page_size)})
+
+
+@app.get("/api/v1/import/subtitles/{upload_id}",
+         response_model=Union[SubtitleImportResponse, ErrorResponse],
+         tags=["Import"],
+         summary="分页获取已上传字幕文件的条目")
+def get_imported_subtitles(upload_id: str, page: int = Query(1, ge=1), page_size: int = Query(500, ge=1, le=10000)):
+    result = get_ingest_store().get(upload_id)
+    if result is None:
+        handle_error("upload_not_found", f"未找到上传内容 {upload_id}，请重新上传。")
+    return FastJSONResponse({"status": "success", **result.page(page, page_size)})
+
+
+@app.post("/api/v1/import/subtitles/{upload_id}/davinci", tags=["Import"], summary="将已上传的字幕文件导出到DaVinci Resolve时间线")
+async def export_imported_subtitles_to_davinci(
+    upload_id: str,
+    background: bool = Query(False, description="作为后台任务执行，见 `/api/v1/export/davinci`"),
+):
+    """
+    ## 功能:
+    - 将已解析的上传内容按当前时间线帧率转换为帧，并像 `/api/v1/export/davinci` 一样导入到新的字幕轨道，
+      无需客户端把全部字幕再以 JSON 发回。字幕时间相对于时间线起点。
+    - `background=true` 时作为后台任务执行，立即返回 202 和任务信息。
+    """
+    result = get_ingest_store().get(upload_id)
+    if result is None:
+        handle_error("upload_not_found", f"未找到上传内容 {upload_id}，请重新上传。")
+
+    compile_subtitles = lambda frame_rate, base_frames: result.compile(frame_rate)
+    if background:
+        return submit_export_job("import", export_compiled_to_davinci, compile_subtitles)
+    status, data = await run_resolve_call(notify_timeline_write, export_compiled_to_davinci, compile_subtitles)
+
+    if status == "success":
+        return {"status": "success", "message": data.get("message")}
+
+    error_code = data.get("code", "unknown_error")
+    error_message = data.get("message", "An unknown error occurred.")
+    handle_error(error_code, error_message)
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+
+class _Jump:
+    __slots__ = ("call", "future", "received")
+
+    def __init__(self, call, future, received):
+        self.call = call
+        self.future = future
+        self.received = received
+
+
+class NavigationChannel:
+    """
+    Latest-wins channel for playhead jumps. At most one jump is in flight to Resolve;
+    jumps that arrive meanwhile replace each other in a single pending slot, so when
+    an editor arrow-keys through hundreds of rows only the newest one is sent next
+    and the ones it superseded never reach the Resolve queue.
+
+    A jump that follows the previous one by less than `debounce` seconds waits out the
+    rest of that window first, letting a burst of key repeats settle on its latest
+    target; an isolated jump is sent immediately.
+
+    Every caller gets the outcome of its own jump, with its end-to-end latency split
+    into time spent waiting in the channel and time spent in Resolve.
+    """
+
+    def __init__(self, debounce: float = 0.015, latency_window: int = 256):
+        self.debounce = debounce
+        self._pending: Optional[_Jump] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._last_done = None
+        self._latencies = deque(maxlen=latency_window)
+        self._stats = {"submitted": 0, "sent": 0, "superseded": 0, "failed": 0}
+
+    async def jump(self, call: Callable[[], Awaitable[tuple]]) -> tuple:
+        """
+        Submits a jump; `call` performs it and returns a (status, data) tuple. Returns that
+        tuple with `latency_ms` added to data, or ("superseded", ...) if a newer jump
+        replaced this one before it was sent.
+        """
+        self._stats["submitted"] += 1
+        jump = _Jump(call, asyncio.get_running_loop().create_future(), time.perf_counter())
+        superseded, self._pending = self._pending, jump
+        if superseded is not None:
+            self._stats["superseded"] += 1
+            self._settle(superseded, "superseded", {
+                "code": "superseded", "message": "跳转已被更新的跳转取代，未发送到 DaVinci Resolve。"})
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+        # A client that disconnects does not take its jump with it.
+        return await asyncio.shield(jump.future)
+
+    async def _drain(self):
+        while self._pending is not None:
+            if self._last_done is not None:
+                wait = self._last_done + self.debounce - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+            jump, self._pending = self._pending, None
+            sent = time.perf_counter()
+            self._stats["sent"] += 1
+            try:
+                status, data = await jump.call()
+            except Exception as e:
+                status, data = "error", {"code": "unknown_error", "message": str(e)}
+            self._last_done = time.perf_counter()
+            if status != "success":
+                self._stats["failed"] += 1
+            latency = self._settle(jump, status, data, sent)
+            self._latencies.append(latency["total"])
+
+    def _settle(self, jump: _Jump, status: str, data: dict, sent: Optional[float] = None) -> dict:
+        now = time.perf_counter()
+        if sent is None:
+            latency = {"total": round((now - jump.received) * 1000, 3)}
+        else:
+            latency = {
+                "queued": round((sent - jump.received) * 1000, 3),
+                "resolve": round((now - sent) * 1000, 3),
+                "total": round((now - jump.received) * 1000, 3),
+            }
+        if not jump.future.done():
+            jump.future.set_result((status, dict(data, latency_ms=latency)))
+        return latency
+
+    def get_stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] if latencies else None
+
+        return dict(
+            self._stats,
+            pending=self._pending is not None,
+            debounce_ms=self.debounce * 1000,
+            latency_ms={"p50": percentile(0.5), "p95": percentile(0.95), "max": latencies[-1] if latencies else None},
+        )
+
+
+_navigation_channel = NavigationChannel()
+
+
+def get_navigation_channel() -> NavigationChannel:
+    """Returns the process-wide playhead navigation channel."""
+    return _navigation_channel
@@ -0,0 +1,123 @@
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class ResolveExecutorBusy(Exception):
+    """Raised when the Resolve job queue is full."""
+
+
+_STOP = object()
+
+
+class ResolveExecutor:
+    """
+    Owns the single thread that talks to the DaVinci Resolve scripting API.
+
+    The scripting proxy is not thread-safe, so every call that touches Resolve
+    (including reconnects) is queued here and executed in submission order on one
+    worker thread. The queue is bounded: when it is full, `submit` raises
+    `ResolveExecutorBusy` instead of letting requests pile up. Jobs run in a copy of
+    the submitter's context, so context variables (e.g. the current endpoint) carry over.
+    """
+
+    def __init__(self, max_queue_size: int = 64, name: str = "resolve-executor"):
+        self._name = name
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0}
+        self._busy_since = None
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name=self._name, daemon=True)
+                self._thread.start()
+
+    def in_executor_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Queues `fn(*args, **kwargs)` for the Resolve thread and returns its future."""
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put_nowait((future, contextvars.copy_context(), fn, args, kwargs))
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise ResolveExecutorBusy(f"Resolve job queue is full ({self._queue.maxsize} pending jobs).")
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        """Runs `fn` on the Resolve thread and blocks until it finishes. Safe to call from the Resolve thread itself."""
+        if self.in_executor_thread():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs `fn` on the Resolve thread without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            future, context, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                with self._stats_lock:
+                    self._stats["cancelled"] += 1
+                continue
+            self._busy_since = time.monotonic()
+            try:
+                result = context.run(fn, *args, **kwargs)
+            except BaseException as e:
+                logging.error(f"Resolve 任务执行失败: {e}", exc_info=True)
+                self._finish_job("failed")
+                future.set_exception(e)
+            else:
+                self._finish_job("completed")
+                future.set_result(result)
+
+    def _finish_job(self, outcome: str):
+        self._busy_since = None
+        with self._stats_lock:
+            self._stats[outcome] += 1
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        busy_since = self._busy_since
+        stats["queue_depth"] = self._queue.qsize()
+        stats["queue_capacity"] = self._queue.maxsize
+        stats["running_for_ms"] = round((time.monotonic() - busy_since) * 1000, 3) if busy_since is not None else None
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Stops the worker after the jobs already queued have run."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        if wait:
+            thread.join()
+        self._thread = None
+
+
+_resolve_executor = ResolveExecutor()
+
+
+def get_resolve_executor() -> ResolveExecutor:
+    """Returns the process-wide Resolve executor."""
+    return _resolve_executor
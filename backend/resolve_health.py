@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+
+class ResolveConnectionKeeper:
+    """
+    Supervises the connection to DaVinci Resolve in the background.
+
+    `run` pings Resolve every `interval` seconds while it is reachable. When a ping
+    (or a request) fails, the connection is marked down and re-established with
+    exponential backoff, so request handlers do not reconnect inline: while the
+    keeper is running and Resolve is known to be down, `known_down_error` lets them
+    fail fast with `resolve_not_running`.
+
+    The state is updated from the Resolve thread and read from request handlers,
+    so every access goes through one lock.
+    """
+
+    CONNECTED = "connected"
+    DISCONNECTED = "disconnected"
+    UNKNOWN = "unknown"
+
+    def __init__(self, interval: float = 5.0, initial_backoff: float = 0.5, max_backoff: float = 10.0):
+        self.interval = interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._state = self.UNKNOWN
+        self._last_error = None
+        self._rtt_ms = None
+        self._last_check = None
+        self._consecutive_failures = 0
+        self._next_check = None
+        self._running = False
+        self._loop = None
+        self._wake = None
+        self._stats = {"checks": 0, "failures": 0, "reconnects": 0, "reported_failures": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def _backoff(self) -> float:
+        return min(self.max_backoff, self.initial_backoff * 2 ** max(0, self._consecutive_failures - 1))
+
+    def record_check(self, status: str, data: dict) -> float:
+        """Records the outcome of one health check and returns the delay before the next one."""
+        with self._lock:
+            self._stats["checks"] += 1
+            self._last_check = time.time()
+            if status == "success":
+                if self._state != self.CONNECTED:
+                    logging.info(f"DaVinci Resolve 连接正常（往返 {data.get('rtt_ms')} ms）。")
+                if data.get("reconnected"):
+                    self._stats["reconnects"] += 1
+                self._state = self.CONNECTED
+                self._last_error = None
+                self._rtt_ms = data.get("rtt_ms")
+                self._consecutive_failures = 0
+                delay = self.interval
+            else:
+                if self._state != self.DISCONNECTED:
+                    logging.warning(f"DaVinci Resolve 连接检查失败: {data.get('message')}")
+                self._stats["failures"] += 1
+                self._state = self.DISCONNECTED
+                self._last_error = dict(data)
+                self._rtt_ms = None
+                self._consecutive_failures += 1
+                delay = self._backoff()
+            self._next_check = time.time() + delay
+            return delay
+
+    def report_failure(self, error: Exception) -> dict:
+        """
+        Called by a request whose Resolve call failed: marks the connection down, wakes
+        the keeper to reconnect right away and returns the error to send to the client.
+        """
+        with self._lock:
+            self._stats["reported_failures"] += 1
+            self._state = self.DISCONNECTED
+            self._last_error = {"code": "connection_error", "message": f"DaVinci Resolve 连接已断开: {error}"}
+            self._rtt_ms = None
+        self.wake()
+        return {"code": "resolve_not_running", "message": "DaVinci Resolve 连接已断开，正在后台重新连接，请稍后重试。"}
+
+    def known_down_error(self) -> Optional[dict]:
+        """Returns the error to fail fast with while the keeper is running and Resolve is down, else None."""
+        with self._lock:
+            if not self._running or self._state != self.DISCONNECTED:
+                return None
+            if self._last_error and self._last_error.get("code") == "dvr_script_not_found":
+                return dict(self._last_error)
+            return {"code": "resolve_not_running", "message": "DaVinci Resolve 当前不可用，正在后台重新连接，请稍后重试。"}
+
+    def wake(self):
+        """Makes the keeper check the connection now instead of waiting for the next interval."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def run(self, check):
+        """
+        Runs the health-check loop until cancelled. `check` is an async callable returning
+        a (status, data) tuple, with `rtt_ms` and `reconnected` in data on success.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._running = True
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    status, data = await check()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    status, data = "error", {"code": "connection_error", "message": str(e)}
+                if status != "success" and data.get("code") == "resolve_busy":
+                    # A full Resolve queue says nothing about the connection; try again later.
+                    delay = self.interval
+                else:
+                    delay = self.record_check(status, data)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._running = False
+            self._loop = None
+            self._wake = None
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            now = time.time()
+            return dict(
+                self._stats,
+                running=self._running,
+                state=self._state,
+                rtt_ms=self._rtt_ms,
+                consecutive_failures=self._consecutive_failures,
+                last_error=self._last_error,
+                last_check_age_s=round(now - self._last_check, 3) if self._last_check is not None else None,
+                next_check_in_s=round(max(0.0, self._next_check - now), 3) if self._next_check is not None else None,
+            )
+
+
+_connection_keeper = ResolveConnectionKeeper()
+
+
+def get_connection_keeper() -> ResolveConnectionKeeper:
+    """Returns the process-wide Resolve connection keeper."""
+    return _connection_keeper
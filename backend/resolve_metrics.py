@@ -0,0 +1,231 @@
+import contextvars
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Optional
+
+# Histogram bucket upper bounds in seconds, from 50 µs (a cached property read) to 10 s (a large ImportMedia).
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route path of the request on whose behalf Resolve is being called; "background" for the connection keeper and prewarm.
+current_endpoint: contextvars.ContextVar[str] = contextvars.ContextVar("current_endpoint", default="background")
+
+_PLAIN_TYPES = frozenset((str, int, float, bool, bytes, type(None)))
+
+# Set RESOLVE_METRICS=0 to talk to Resolve without the instrumentation wrapper.
+METRICS_ENABLED = os.environ.get("RESOLVE_METRICS", "1") != "0"
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    __slots__ = ("bucket_counts", "count", "total", "errors")
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        self.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+
+class MetricsRegistry:
+    """
+    Latency histograms for Resolve scripting API calls, keyed by (endpoint, method),
+    and for HTTP requests, keyed by (endpoint, HTTP method, status code).
+
+    Scripting calls only ever happen on the Resolve thread, which is the single
+    writer of their histograms, so they are recorded without taking the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resolve_calls = {}
+        self._requests = {}
+
+    def observe_resolve_call(self, method: str, seconds: float, error: bool = False):
+        # Called for every scripting call, so `LatencyHistogram.observe` is inlined here.
+        key = (current_endpoint.get(), method)
+        histogram = self._resolve_calls.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._resolve_calls.setdefault(key, LatencyHistogram())
+        histogram.bucket_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram.count += 1
+        histogram.total += seconds
+        if error:
+            histogram.errors += 1
+
+    def observe_request(self, endpoint: str, http_method: str, status_code: int, seconds: float):
+        key = (endpoint, http_method, str(status_code))
+        with self._lock:
+            histogram = self._requests.get(key)
+            if histogram is None:
+                histogram = self._requests[key] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def get_resolve_call_summary(self) -> dict:
+        """Returns {method: {"count", "errors", "total_ms"}} summed over endpoints."""
+        summary = {}
+        with self._lock:
+            for (_, method), histogram in list(self._resolve_calls.items()):
+                entry = summary.setdefault(method, {"count": 0, "errors": 0, "total_ms": 0.0})
+                entry["count"] += histogram.count
+                entry["errors"] += histogram.errors
+                entry["total_ms"] += histogram.total * 1000
+        return summary
+
+    def render_prometheus(self) -> str:
+        """Renders every histogram in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            resolve_calls = [(key, _snapshot(h)) for key, h in sorted(list(self._resolve_calls.items()))]
+            requests = [(key, _snapshot(h)) for key, h in sorted(self._requests.items())]
+
+        lines = []
+        _render_histogram(lines, "resolve_api_call_duration_seconds", "Latency of DaVinci Resolve scripting API calls.",
+                          ("endpoint", "method"), resolve_calls)
+        lines.append("# HELP resolve_api_call_errors_total DaVinci Resolve scripting API calls that raised.")
+        lines.append("# TYPE resolve_api_call_errors_total counter")
+        for labels, (_, _, _, errors) in resolve_calls:
+            lines.append(f"resolve_api_call_errors_total{{{_labels(('endpoint', 'method'), labels)}}} {errors}")
+        _render_histogram(lines, "http_request_duration_seconds", "Latency of HTTP requests until the response starts.",
+                          ("endpoint", "http_method", "status"), requests)
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._resolve_calls.clear()
+            self._requests.clear()
+
+
+def _snapshot(histogram: LatencyHistogram):
+    return list(histogram.bucket_counts), histogram.count, histogram.total, histogram.errors
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _render_histogram(lines, name, help_text, label_names, series):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, (bucket_counts, count, total, _) in series:
+        label_text = _labels(label_names, labels)
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {count}')
+        lines.append(f"{name}_sum{{{label_text}}} {total}")
+        lines.append(f"{name}_count{{{label_text}}} {count}")
+
+
+_metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Returns the process-wide metrics registry."""
+    return _metrics_registry
+
+
+class InstrumentedProxy:
+    """
+    Transparent wrapper around a Resolve scripting object. Every method call is timed
+    and recorded under the method name; objects returned by a call (including those in
+    returned lists and dicts) are wrapped too, and wrapped objects passed back to
+    Resolve as arguments are unwrapped first.
+    """
+
+    __slots__ = ("_target", "_registry")
+
+    def __init__(self, target, registry: MetricsRegistry):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_registry", registry)
+
+    # Every attribute is the target's: overriding __getattribute__ (rather than __getattr__)
+    # skips the failed normal lookup, which costs more than the rest of the wrapper.
+    def __getattribute__(self, name):
+        attribute = getattr(_get(self, "_target"), name)
+        if not callable(attribute):
+            return attribute
+        registry = _get(self, "_registry")
+
+        def call(*args, **kwargs):
+            if args:
+                args = [_unwrap(arg) for arg in args]
+            if kwargs:
+                kwargs = {key: _unwrap(value) for key, value in kwargs.items()}
+            started = perf_counter()
+            try:
+                result = attribute(*args, **kwargs)
+            except BaseException:
+                registry.observe_resolve_call(name, perf_counter() - started, error=True)
+                raise
+            registry.observe_resolve_call(name, perf_counter() - started)
+            return _wrap(result, registry)
+
+        return call
+
+    def __bool__(self):
+        return bool(_get(self, "_target"))
+
+    def __eq__(self, other):
+        return _get(self, "_target") == _unwrap(other)
+
+    def __hash__(self):
+        return hash(_get(self, "_target"))
+
+    def __repr__(self):
+        return f"InstrumentedProxy({_get(self, '_target')!r})"
+
+
+_get = object.__getattribute__
+
+
+def _wrap(value, registry: MetricsRegistry):
+    value_type = type(value)
+    if value_type in _PLAIN_TYPES or value_type is InstrumentedProxy:
+        return value
+    if value_type is list:
+        return [_wrap(item, registry) for item in value]
+    if value_type is tuple:
+        return tuple(_wrap(item, registry) for item in value)
+    if value_type is dict:
+        return {key: _wrap(item, registry) for key, item in value.items()}
+    return InstrumentedProxy(value, registry)
+
+
+def _unwrap(value):
+    value_type = type(value)
+    if value_type is InstrumentedProxy:
+        return _get(value, "_target")
+    if value_type is list:
+        return [_unwrap(item) for item in value]
+    if value_type is tuple:
+        return tuple(_unwrap(item) for item in value)
+    if value_type is dict:
+        return {key: _unwrap(item) for key, item in value.items()}
+    return value
+
+
+def same_target(first, second) -> bool:
+    """True when both values are the same Resolve object, wrapped or not (each call returns a new proxy)."""
+    return _unwrap(first) is _unwrap(second)
+
+
+def instrument(resolve, registry: Optional[MetricsRegistry] = None):
+    """Wraps a Resolve connection so every scripting call made through it is recorded."""
+    if resolve is None or not METRICS_ENABLED or type(resolve) is InstrumentedProxy:
+        return resolve
+    return InstrumentedProxy(resolve, registry or get_metrics_registry())
@@ -0,0 +1,246 @@
+import logging
+import threading
+from typing import Optional
+
+from resolve_metrics import same_target
+
+
+def _object_identity(obj):
+    """
+    Returns a cheap identity for a Resolve project or timeline (unique ID, falling back to its name),
+    as a tuple (identity, scripting calls made).
+    """
+    try:
+        unique_id = obj.GetUniqueId()
+    except Exception:
+        unique_id = None
+    if unique_id:
+        return unique_id, 1
+    return obj.GetName(), 2
+
+
+class _ProjectLayer:
+    """Cached handles that stay valid for as long as the same project is open."""
+
+    def __init__(self, project, identity):
+        self.project = project
+        self.identity = identity
+        self.media_pool = None
+        # SRT content hash -> MediaPoolItem imported into this project
+        self.imported_media = {}
+
+
+class _TimelineLayer:
+    """Cached handles and settings that stay valid for as long as the same timeline is current."""
+
+    def __init__(self, timeline, identity, frame_rate):
+        self.timeline = timeline
+        self.identity = identity
+        self.frame_rate = frame_rate
+        self.start_timecode = None
+
+
+class ResolveSessionContext:
+    """
+    A view over the cached project and timeline layers for one request.
+    The media pool and start timecode are fetched lazily and kept on their layer.
+    """
+
+    def __init__(self, cache: "ResolveSessionCache", project_layer: _ProjectLayer, timeline_layer: _TimelineLayer):
+        self._cache = cache
+        self._project_layer = project_layer
+        self._timeline_layer = timeline_layer
+
+    @property
+    def project(self):
+        return self._project_layer.project
+
+    @property
+    def timeline(self):
+        return self._timeline_layer.timeline
+
+    @property
+    def frame_rate(self) -> float:
+        return self._timeline_layer.frame_rate
+
+    def get_media_pool(self):
+        layer = self._project_layer
+        if layer.media_pool is None:
+            layer.media_pool = layer.project.GetMediaPool()
+            self._cache._count_lazy(hit=False)
+        else:
+            self._cache._count_lazy(hit=True)
+        return layer.media_pool
+
+    def get_imported_media(self, content_hash: str):
+        """Returns the media pool item imported into this project for `content_hash`, if any."""
+        return self._project_layer.imported_media.get(content_hash)
+
+    def remember_imported_media(self, content_hash: str, media_item):
+        self._project_layer.imported_media[content_hash] = media_item
+
+    def forget_imported_media(self, content_hash: str):
+        self._project_layer.imported_media.pop(content_hash, None)
+
+    def get_start_timecode(self) -> str:
+        layer = self._timeline_layer
+        if layer.start_timecode is None:
+            layer.start_timecode = layer.timeline.GetStartTimecode()
+            self._cache._count_lazy(hit=False)
+        else:
+            self._cache._count_lazy(hit=True)
+        return layer.start_timecode
+
+
+class ResolveSessionCache:
+    """
+    Caches the project manager, project, timeline, media pool, frame rate and start
+    timecode between requests.
+
+    Every lookup revalidates the cache by comparing the unique IDs of the current
+    project and timeline with the cached ones, and drops only the layers that went
+    stale: switching timelines keeps the project layer (and its media pool), switching
+    projects drops both. A new connection object drops everything. When Resolve hands
+    back the very handle that is cached, its unique ID is not asked for again.
+
+    `resolve_calls_saved` is net: the calls the cache avoided minus the `GetUniqueId`
+    (and fallback `GetName`) calls spent revalidating it, which the uncached code
+    never made. Both sides are reported as well.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._resolve = None
+        self._project_manager = None
+        self._project_layer: Optional[_ProjectLayer] = None
+        self._timeline_layer: Optional[_TimelineLayer] = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                "lookups": 0,
+                "project_hits": 0,
+                "project_misses": 0,
+                "timeline_hits": 0,
+                "timeline_misses": 0,
+                "lazy_hits": 0,
+                "lazy_misses": 0,
+                "resolve_calls_avoided": 0,
+                "revalidation_calls": 0,
+                "revalidations_skipped": 0,
+            }
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["lookups"]
+        stats["resolve_calls_saved"] = stats["resolve_calls_avoided"] - stats["revalidation_calls"]
+        stats["resolve_calls_saved_per_lookup"] = round(stats["resolve_calls_saved"] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def current_identity(self):
+        """
+        Returns (project_id, timeline_id) as of the last lookup, without calling Resolve.
+        Either element is None when that layer is not cached.
+        """
+        with self._lock:
+            project_layer = self._project_layer
+            timeline_layer = self._timeline_layer
+            return (
+                project_layer.identity if project_layer else None,
+                timeline_layer.identity if timeline_layer else None,
+            )
+
+    def invalidate(self):
+        """Drops every cached layer, e.g. after a reconnect."""
+        with self._lock:
+            self._resolve = None
+            self._project_manager = None
+            self._project_layer = None
+            self._timeline_layer = None
+
+    def _count_lazy(self, hit: bool):
+        with self._lock:
+            if hit:
+                self._stats["lazy_hits"] += 1
+                self._stats["resolve_calls_avoided"] += 1
+            else:
+                self._stats["lazy_misses"] += 1
+
+    def get_context(self, resolve):
+        """
+        Returns a tuple (context, error) for the current project and timeline of `resolve`.
+        Exceptions raised by the scripting API propagate so the caller can reconnect.
+        """
+        with self._lock:
+            stats = self._stats
+            stats["lookups"] += 1
+
+            if resolve is not self._resolve:
+                self.invalidate()
+                self._resolve = resolve
+            if self._project_manager is None:
+                self._project_manager = resolve.GetProjectManager()
+            else:
+                stats["resolve_calls_avoided"] += 1
+
+            project = self._project_manager.GetCurrentProject()
+            if not project:
+                self._project_layer = None
+                self._timeline_layer = None
+                return None, {"code": "no_project_open", "message": "未找到当前打开的项目。"}
+
+            project_identity = self._revalidate(self._project_layer, "project", project)
+            if self._project_layer is not None and self._project_layer.identity == project_identity:
+                stats["project_hits"] += 1
+                # Keep the fresh handle; the cached media pool still belongs to this project.
+                self._project_layer.project = project
+            else:
+                stats["project_misses"] += 1
+                if self._project_layer is not None:
+                    logging.info(f"当前项目已切换，丢弃项目及时间线缓存: {self._project_layer.identity} -> {project_identity}")
+                self._project_layer = _ProjectLayer(project, project_identity)
+                self._timeline_layer = None
+
+            timeline = project.GetCurrentTimeline()
+            if not timeline:
+                self._timeline_layer = None
+                return None, {"code": "no_active_timeline", "message": "项目中没有活动的（当前）时间线。"}
+
+            timeline_identity = self._revalidate(self._timeline_layer, "timeline", timeline)
+            if self._timeline_layer is not None and self._timeline_layer.identity == timeline_identity:
+                stats["timeline_hits"] += 1
+                stats["resolve_calls_avoided"] += 1  # timelineFrameRate
+                self._timeline_layer.timeline = timeline
+            else:
+                stats["timeline_misses"] += 1
+                self._timeline_layer = _TimelineLayer(timeline, timeline_identity, _read_frame_rate(timeline))
+
+            return ResolveSessionContext(self, self._project_layer, self._timeline_layer), None
+
+    def _revalidate(self, layer, attribute: str, handle) -> str:
+        """Returns the identity of `handle`, reusing the layer's when it wraps the cached Resolve object itself."""
+        if layer is not None and same_target(getattr(layer, attribute), handle):
+            self._stats["revalidations_skipped"] += 1
+            return layer.identity
+        identity, calls = _object_identity(handle)
+        self._stats["revalidation_calls"] += calls
+        return identity
+
+
+def _read_frame_rate(timeline) -> float:
+    try:
+        frame_rate_str = timeline.GetSetting('timelineFrameRate')
+        return float(frame_rate_str)
+    except (ValueError, TypeError, AttributeError):
+        logging.warning("无法获取时间线帧率，将使用默认值 24.0。")
+        return 24.0  # Default to a common frame rate
+
+
+_session_cache = ResolveSessionCache()
+
+
+def get_session_cache() -> ResolveSessionCache:
+    """Returns the process-wide session cache."""
+    return _session_cache
@@ -1,31 +1,58 @@
 import sys
 import os
 import logging
-import importlib.util
+import hashlib
 import tempfile
-from timecode import Timecode
-from timecode_utils import format_timecode, timecode_to_frames, frames_to_srt_timecode
+from array import array
+import importlib.util
+import time
+from typing import List, Optional
+from timecode_utils import format_timecode, format_timecodes, timecode_to_frames, frames_to_timecode
 from schemas import SubtitleTrackInfo
+from resolve_session import get_session_cache
+from resolve_health import get_connection_keeper
+from resolve_metrics import instrument
+from log_pipeline import SAMPLED
+from track_snapshots import TrackSnapshot, compute_changes, get_snapshot_store
+from subtitle_streams import iter_snapshot_cues
+from subtitle_export import compile_export_request, iter_srt
+from track_state import isolated_track
+
+# "davinci" connects to the running DaVinci Resolve; "fake" uses the in-process stand-in in fake_resolve.py.
+RESOLVE_BACKEND = os.environ.get("RESOLVE_BACKEND", "davinci").lower()
 
-# 配置日志记录
-log_file = os.path.join(os.path.dirname(__file__), 'resolve_connection.log')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, mode='a', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
 
 # 全局变量来缓存 Resolve 连接
 _resolve_connection = None
+# 已加载的 DaVinciResolveScript 模块，每个进程只加载一次
+_resolve_script_module = None
+
+
+class PhaseTimer:
+    """
+    Records the wall-clock duration (in milliseconds) of consecutive phases of an operation.
+    Each call to `mark` closes the phase that started at the previous mark.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self._last) * 1000, 3)
+        self._last = now
 
 def _get_resolve_bmd():
     """
     Dynamically loads the DaVinci Resolve script module from its specific path
     to avoid conflicts with other modules like fusionscript.
+    The module is loaded once per process; reconnects reuse it.
     """
+    global _resolve_script_module
+    if _resolve_script_module is not None:
+        return _resolve_script_module
+
     if sys.platform.startswith("darwin"):
         script_module_path = "/Library/Application Support/Blackmagic Design/DaVinci Resolve/Developer/Scripting/Modules/DaVinciResolveScript.py"
     elif sys.platform.startswith("win") or sys.platform.startswith("cygwin"):
@@ -45,6 +72,7 @@ def _get_resolve_bmd():
         bmd = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(bmd)
         logging.info(f"Successfully imported DaVinciResolveScript module from: {script_module_path}")
+        _resolve_script_module = bmd
         return bmd
     except Exception as e:
         logging.error(f"Failed to import DaVinci Resolve script module from {script_module_path}: {e}", exc_info=True)
@@ -55,6 +83,9 @@ def _connect_to_resolve(force_reconnect=False):
     Loads the DaVinci Resolve script module and connects to the Resolve application.
     It will cache the connection globally to avoid reconnecting on every call.
     
+    While the connection keeper is running and knows Resolve is down, this fails
+    fast instead of connecting; the keeper reconnects in the background.
+
     Args:
         force_reconnect (bool): If True, it will ignore the cached connection
                                 and establish a new one.
@@ -63,21 +94,28 @@ def _connect_to_resolve(force_reconnect=False):
     and error is a dictionary with 'code' and 'message' if connection fails.
     """
     global _resolve_connection
-    if _resolve_connection and not force_reconnect:
-        logging.info("使用缓存的 DaVinci Resolve 连接。")
-        return _resolve_connection, None
-
-    dvr_script = _get_resolve_bmd()
-    if not dvr_script:
-        logging.error("DaVinci Resolve Scripting API module not found.")
-        return None, {"code": "dvr_script_not_found", "message": "DaVinci Resolve Scripting API module not found."}
+    if not force_reconnect:
+        known_down = get_connection_keeper().known_down_error()
+        if known_down:
+            return None, known_down
+        if _resolve_connection:
+            logging.info("使用缓存的 DaVinci Resolve 连接。", extra=SAMPLED)
+            return _resolve_connection, None
+
+    if RESOLVE_BACKEND == "fake":
+        import fake_resolve as dvr_script
+    else:
+        dvr_script = _get_resolve_bmd()
+        if not dvr_script:
+            logging.error("DaVinci Resolve Scripting API module not found.")
+            return None, {"code": "dvr_script_not_found", "message": "DaVinci Resolve Scripting API module not found."}
 
-    try:
-        # The official documentation is wrong, the scriptapp is in the fusionscript module
-        import fusionscript as dvr_script
-    except ImportError:
-        # Keep the original as a fallback
-        pass
+        try:
+            # The official documentation is wrong, the scriptapp is in the fusionscript module
+            import fusionscript as dvr_script
+        except ImportError:
+            # Keep the original as a fallback
+            pass
 
     try:
         logging.info("尝试连接到 DaVinci Resolve...")
@@ -88,14 +126,94 @@ def _connect_to_resolve(force_reconnect=False):
             return None, {"code": "resolve_not_running", "message": "无法连接到 DaVinci Resolve。请确保 Resolve 正在运行。"}
         
         logging.info("成功连接到 DaVinci Resolve。")
-        _resolve_connection = resolve # Cache the connection
-        return resolve, None
+        # Every scripting call made through the connection is timed for /metrics.
+        _resolve_connection = instrument(resolve) # Cache the connection
+        return _resolve_connection, None
     except Exception as e:
         logging.error(f"连接 DaVinci Resolve 时发生未知错误: {e}", exc_info=True)
         _resolve_connection = None # Clear connection on exception
         return None, {"code": "connection_error", "message": f"连接 DaVinci Resolve 时发生未知错误: {e}"}
 
 
+def _call_resolve(operation):
+    """
+    Runs `operation(resolve)` on the current connection.
+
+    If the scripting API raises, the connection is considered lost and the session
+    cache is dropped. When the connection keeper is running it reconnects in the
+    background and this returns `resolve_not_running` at once; otherwise (e.g. in
+    scripts) the connection is re-established here and the operation retried once.
+
+    Returns:
+        A tuple (result, error), where result is the return value of `operation`
+        and error is a dictionary with 'code' and 'message' if no connection is available.
+    """
+    resolve, error = _connect_to_resolve()
+    if error:
+        return None, error
+    try:
+        return operation(resolve), None
+    except Exception as e:
+        logging.warning(f"DaVinci Resolve 连接可能已断开，正在尝试重新连接... 错误: {e}")
+        get_session_cache().invalidate()
+        keeper = get_connection_keeper()
+        if keeper.is_running:
+            return None, keeper.report_failure(e)
+        resolve, error = _connect_to_resolve(force_reconnect=True)
+        if error:
+            return None, error
+        return operation(resolve), None
+
+
+def check_resolve_connection():
+    """
+    Health check run by the connection keeper on the Resolve thread: pings the cached
+    connection and reconnects when there is none or the ping fails.
+
+    Returns:
+        A tuple (status, data), where data holds the round-trip time of the ping in
+        milliseconds and whether a new connection was made, or an error dictionary.
+    """
+    resolve = _resolve_connection
+    if resolve is not None:
+        started = time.perf_counter()
+        try:
+            if resolve.GetVersionString():
+                return "success", {"rtt_ms": round((time.perf_counter() - started) * 1000, 3), "reconnected": False}
+        except Exception as e:
+            logging.warning(f"DaVinci Resolve 健康检查失败: {e}")
+
+    get_session_cache().invalidate()
+    resolve, error = _connect_to_resolve(force_reconnect=True)
+    if error:
+        return "error", error
+    started = time.perf_counter()
+    try:
+        version = resolve.GetVersionString()
+    except Exception as e:
+        version = None
+        logging.warning(f"重新连接后 DaVinci Resolve 健康检查仍然失败: {e}")
+    if not version:
+        return "error", {"code": "resolve_not_running", "message": "无法连接到 DaVinci Resolve。请确保 Resolve 正在运行。"}
+    return "success", {"rtt_ms": round((time.perf_counter() - started) * 1000, 3), "reconnected": True}
+
+
+def _get_session_context():
+    """
+    Connects to Resolve and returns the cached session context (project, timeline,
+    media pool, frame rate and start timecode), revalidated against the current
+    project and timeline.
+
+    Returns:
+        A tuple (context, error), where context is a `ResolveSessionContext` and
+        error is a dictionary with 'code' and 'message' if an error occurs.
+    """
+    result, error = _call_resolve(get_session_cache().get_context)
+    if error:
+        return None, error
+    return result
+
+
 def _get_current_timeline():
     """
     Connects to Resolve and retrieves the current timeline object and its frame rate.
@@ -106,39 +224,19 @@ def _get_current_timeline():
         timeline object, frame_rate is a float, and error is a dictionary
         with 'code' and 'message' if an error occurs.
     """
-    resolve, error = _connect_to_resolve()
+    context, error = _get_session_context()
     if error:
         return None, None, error
+    return context.timeline, context.frame_rate, None
 
-    try:
-        # First, try to get the project manager to check if the connection is alive
-        projectManager = resolve.GetProjectManager()
-        project = projectManager.GetCurrentProject()
-        if not project:
-            return None, None, {"code": "no_project_open", "message": "未找到当前打开的项目。"}
-    except Exception as e:
-        logging.warning(f"DaVinci Resolve 连接可能已断开，正在尝试重新连接... 错误: {e}")
-        resolve, error = _connect_to_resolve(force_reconnect=True)
-        if error:
-            return None, None, error
-        projectManager = resolve.GetProjectManager()
-        project = projectManager.GetCurrentProject()
-        if not project:
-            return None, None, {"code": "no_project_open", "message": "重新连接后仍未找到当前打开的项目。"}
-
+def _read_project_info(resolve):
+    project = resolve.GetProjectManager().GetCurrentProject()
+    if not project:
+        return "error", {"code": "no_project_open", "message": "未找到当前打开的项目。"}
 
     timeline = project.GetCurrentTimeline()
-    if not timeline:
-        return None, None, {"code": "no_active_timeline", "message": "项目中没有活动的（当前）时间线。"}
-    
-    try:
-        frame_rate_str = timeline.GetSetting('timelineFrameRate')
-        frame_rate = float(frame_rate_str)
-    except (ValueError, TypeError, AttributeError):
-        logging.warning("无法获取时间线帧率，将使用默认值 24.0。")
-        frame_rate = 24.0 # Default to a common frame rate
+    return "success", {"projectName": project.GetName(), "timelineName": timeline.GetName() if timeline else None}
 
-    return timeline, frame_rate, None
 
 def get_resolve_project_info():
     """
@@ -148,43 +246,31 @@ def get_resolve_project_info():
         A tuple (status, data), where status is "success" or "error",
         and data is a dictionary with project and timeline names or an error message.
     """
-    resolve, error = _connect_to_resolve()
+    try:
+        result, error = _call_resolve(_read_project_info)
+    except Exception as e:
+        logging.error(f"重新连接后获取项目信息时仍然出错: {e}", exc_info=True)
+        return "error", {"code": "get_info_failed", "message": f"获取项目信息失败: {e}"}
     if error:
         return "error", error
+    return result
 
-    try:
-        projectManager = resolve.GetProjectManager()
-        project = projectManager.GetCurrentProject()
-        if not project:
-            return "error", {"code": "no_project_open", "message": "未找到当前打开的项目。"}
-        
-        timeline = project.GetCurrentTimeline()
-        if not timeline:
-            return "success", {"projectName": project.GetName(), "timelineName": None}
-
-        return "success", {"projectName": project.GetName(), "timelineName": timeline.GetName()}
 
-    except Exception as e:
-        logging.error(f"获取项目信息时出错: {e}", exc_info=True)
-        # Attempt to reconnect
-        resolve, error = _connect_to_resolve(force_reconnect=True)
-        if error:
-            return "error", error
-        
-        try:
-            projectManager = resolve.GetProjectManager()
-            project = projectManager.GetCurrentProject()
-            if not project:
-                return "error", {"code": "no_project_open", "message": "重新连接后仍未找到当前打开的项目。"}
-            
-            timeline = project.GetCurrentTimeline()
-            if not timeline:
-                 return "success", {"projectName": project.GetName(), "timelineName": None}
+def prewarm_resolve_connection():
+    """
+    Loads the scripting module, connects to Resolve and fills the session cache
+    (project, timeline, frame rate), so the first request does not pay for them.
 
-            return "success", {"projectName": project.GetName(), "timelineName": timeline.GetName()}
-        except Exception as final_e:
-            logging.error(f"重新连接后获取项目信息时仍然出错: {final_e}", exc_info=True)
-            return "error", {"code": "get_info_failed", "message": f"获取项目信息失败: {final_e}"}
+    Returns:
+        A tuple (status, data), where data holds the time taken in milliseconds
+        or an error dictionary.
+    """
+    timer = PhaseTimer()
+    _, error = _get_session_context()
+    timer.mark("connect")
+    if error:
+        return "error", error
+    return "success", {"timings": timer.timings}
 
 
 def get_subtitle_tracks():
@@ -211,56 +297,285 @@ def get_subtitle_tracks():
     return "success", {"data": tracks_data}
 
 
-def get_resolve_subtitles(track_index: int = 1):
+def probe_timeline_state(known_signatures: Optional[dict] = None, full_scan: bool = False, rescan_tracks=()):
     """
-    连接到 DaVinci Resolve 并从指定轨道提取当前时间线的字幕信息。
+    Cheaply reads what the timeline watcher needs to notice changes: the current project
+    and timeline, the subtitle tracks, and a per-track signature (item count, first start,
+    last end) that costs two scripting calls per track instead of three per cue.
 
-    Args:
-        track_index (int): 要提取字幕的轨道索引，默认为 1。
+    A track is read in full and fingerprinted only when its signature differs from
+    `known_signatures` ({track_index: signature}), when it is listed in `rescan_tracks`, or
+    when `full_scan` is set; the latter two catch text-only edits, which leave the
+    signature unchanged. Fingerprinted snapshots are stored for delta sync.
 
     Returns:
-        一个元组 (status, data), 其中 status 是 "success" 或 "error",
-        data 是字幕列表或错误信息字典。
+        A tuple (status, data), where data holds `projectId`, `projectName`, `timelineId`,
+        `timelineName`, `frameRate` and `tracks` (each with `track_index`, `track_name`,
+        `signature` and `fingerprint`, None when not read in full), or an error dictionary.
     """
-    timeline, frame_rate, error = _get_current_timeline()
+    context, error = _get_session_context()
     if error:
         return "error", error
-        
+
+    known_signatures = known_signatures or {}
+    timeline = context.timeline
+    project_id, timeline_id = get_session_cache().current_identity()
+    tracks = []
+    for track_index in range(1, timeline.GetTrackCount("subtitle") + 1):
+        subtitle_items = timeline.GetItemListInTrack("subtitle", track_index) or []
+        signature = [len(subtitle_items), subtitle_items[0].GetStart(), subtitle_items[-1].GetEnd()] if subtitle_items else [0, None, None]
+        fingerprint = None
+        if full_scan or track_index in rescan_tracks or known_signatures.get(track_index) != signature:
+            fingerprint = _snapshot_track_items(subtitle_items, context.frame_rate, track_index, PhaseTimer()).fingerprint
+        tracks.append({
+            "track_index": track_index,
+            "track_name": timeline.GetTrackName("subtitle", track_index),
+            "signature": signature,
+            "fingerprint": fingerprint,
+        })
+
+    return "success", {
+        "projectId": project_id,
+        "projectName": context.project.GetName(),
+        "timelineId": timeline_id,
+        "timelineName": timeline.GetName(),
+        "frameRate": context.frame_rate,
+        "tracks": tracks,
+    }
+
+
+def _read_subtitle_track(track_index: int):
+    """
+    Reads the raw content of a subtitle track on the current timeline.
+
+    Returns:
+        A tuple (snapshot, timer, error), where snapshot is a `TrackSnapshot`,
+        timer holds the phase timings so far, and error is a dictionary with
+        'code' and 'message' if an error occurs.
+    """
+    timeline, frame_rate, error = _get_current_timeline()
+    if error:
+        return None, None, error
+
+    timer = PhaseTimer()
+
     # 3. 访问字幕轨道
     subtitle_track_count = timeline.GetTrackCount("subtitle")
     if subtitle_track_count == 0:
-        return "success", {"frameRate": frame_rate, "data": []}
+        subtitle_items = []
+    elif not (1 <= track_index <= subtitle_track_count):
+        return None, None, {"code": "invalid_track_index", "message": f"无效的字幕轨道索引: {track_index}。有效范围是 1 到 {subtitle_track_count}。"}
+    else:
+        # 从指定的字幕轨道提取
+        subtitle_items = timeline.GetItemListInTrack("subtitle", track_index) or []
 
-    if not (1 <= track_index <= subtitle_track_count):
-        return "error", {"code": "invalid_track_index", "message": f"无效的字幕轨道索引: {track_index}。有效范围是 1 到 {subtitle_track_count}。"}
+    snapshot = _snapshot_track_items(subtitle_items, frame_rate, track_index, timer)
+    return snapshot, timer, None
 
-    # 从指定的字幕轨道提取
-    subtitle_items = timeline.GetItemListInTrack("subtitle", track_index)
-    if not subtitle_items:
-        return "success", {"frameRate": frame_rate, "data": []}
 
-    # 4. 遍历字幕条目并提取信息
-    extracted_data = []
-    for index, item in enumerate(subtitle_items):
-        start_frame = item.GetStart()
-        end_frame = item.GetEnd()
-        
-        text_content = item.GetName()
+def _snapshot_track_items(subtitle_items, frame_rate: float, track_index: int, timer: PhaseTimer) -> TrackSnapshot:
+    """Reads the items of one track into a `TrackSnapshot` and remembers it for delta sync."""
+    # 4. 一次遍历读取整条轨道的原始帧数和文本
+    start_frames, end_frames, texts = _read_track_items(subtitle_items)
+    timer.mark("ipc")
+
+    fingerprint = _fingerprint_track(frame_rate, start_frames, end_frames, texts)
+    snapshot = TrackSnapshot(frame_rate, fingerprint, start_frames, end_frames, texts)
+    get_snapshot_store().put(_track_key(track_index), snapshot)
+    timer.mark("fingerprint")
+    return snapshot
 
-        start_timecode = format_timecode(start_frame, frame_rate)
-        end_timecode = format_timecode(end_frame, frame_rate)
 
-        subtitle_entry = {
-            "id": index + 1,
+def _track_key(track_index: int):
+    """Identifies a subtitle track across requests: (project id, timeline id, track index)."""
+    return (*get_session_cache().current_identity(), track_index)
+
+
+def get_resolve_subtitles(track_index: int = 1):
+    """
+    连接到 DaVinci Resolve 并从指定轨道提取当前时间线的字幕信息。
+
+    Args:
+        track_index (int): 要提取字幕的轨道索引，默认为 1。
+
+    Returns:
+        一个元组 (status, data), 其中 status 是 "success" 或 "error",
+        data 是字幕列表或错误信息字典。
+    """
+    snapshot, timer, error = _read_subtitle_track(track_index)
+    if error:
+        return "error", error
+
+    # 5. 批量转换时间码
+    frame_rate = snapshot.frame_rate
+    start_timecodes = format_timecodes(snapshot.start_frames, frame_rate)
+    end_timecodes = format_timecodes(snapshot.end_frames, frame_rate)
+    timer.mark("format")
+
+    extracted_data = [
+        {
+            "id": index,
             "startTimecode": start_timecode,
             "endTimecode": end_timecode,
             "text": text_content,
         }
-        extracted_data.append(subtitle_entry)
-        
-    return "success", {"frameRate": frame_rate, "data": extracted_data}
+        for index, (start_timecode, end_timecode, text_content)
+        in enumerate(zip(start_timecodes, end_timecodes, snapshot.texts), start=1)
+    ]
+    timer.mark("serialize")
+
+    logging.info("字幕轨道 %s 提取完成: %s 条, 耗时 %s", track_index, len(extracted_data), timer.timings, extra=SAMPLED)
+    return "success", {"frameRate": frame_rate, "data": extracted_data, "timings": timer.timings, "fingerprint": snapshot.fingerprint}
+
+
+def get_resolve_track_snapshot(track_index: int = 1):
+    """
+    连接到 DaVinci Resolve 并读取指定轨道的原始内容（起止帧和文本），不转换时间码。
+    供流式响应按块渲染使用。
+
+    Returns:
+        一个元组 (status, data), 其中 data 包含 `snapshot` (TrackSnapshot)、`timings`
+        和 `track_key`（项目、时间线与轨道索引），或错误信息字典。
+    """
+    snapshot, timer, error = _read_subtitle_track(track_index)
+    if error:
+        return "error", error
+    return "success", {"snapshot": snapshot, "timings": timer.timings, "track_key": _track_key(track_index)}
+
+
+def get_resolve_subtitle_changes(track_index: int = 1, since: str = None):
+    """
+    提取指定轨道的字幕，并返回自版本 `since` 以来新增、删除和重新定时的字幕条目。
+
+    Args:
+        track_index (int): 要提取字幕的轨道索引，默认为 1。
+        since (str): 客户端持有的版本令牌（即上次返回的 `token` 或 `ETag` 指纹）。
+                     未提供或服务器已不再保留该版本时，返回完整轨道并设置 `reset`。
+
+    Returns:
+        一个元组 (status, data), 其中 status 是 "success" 或 "error",
+        data 是变更集或错误信息字典。
+    """
+    snapshot, timer, error = _read_subtitle_track(track_index)
+    if error:
+        return "error", error
+
+    if since == snapshot.fingerprint:
+        changes = {"reset": False, "added": [], "removed": [], "retimed": []}
+    else:
+        previous = get_snapshot_store().get(_track_key(track_index), since) if since else None
+        changes = compute_changes(previous, snapshot)
+    timer.mark("diff")
+
+    return "success", {
+        "frameRate": snapshot.frame_rate,
+        "token": snapshot.fingerprint,
+        "since": since,
+        "count": len(snapshot),
+        **changes,
+        "timings": timer.timings,
+    }
+
+
+def get_resolve_subtitle_track_plan(track_indices: Optional[List[int]] = None):
+    """
+    解析一次当前时间线，并确定要提取的字幕轨道及其名称。
+
+    Args:
+        track_indices (List[int]): 要提取的轨道索引；为 None 时选择所有字幕轨道。
+
+    Returns:
+        一个元组 (status, data), 其中 data 包含 `timeline`、`frameRate` 和
+        `tracks` (由 (track_index, track_name) 组成的列表)，或错误信息字典。
+    """
+    timeline, frame_rate, error = _get_current_timeline()
+    if error:
+        return "error", error
+
+    track_count = timeline.GetTrackCount("subtitle")
+    if track_indices is None:
+        selected = list(range(1, track_count + 1))
+    else:
+        selected = list(dict.fromkeys(track_indices))
+        for track_index in selected:
+            if not (1 <= track_index <= track_count):
+                return "error", {"code": "invalid_track_index", "message": f"无效的字幕轨道索引: {track_index}。有效范围是 1 到 {track_count}。"}
+
+    tracks = [(track_index, timeline.GetTrackName("subtitle", track_index)) for track_index in selected]
+    return "success", {"timeline": timeline, "frameRate": frame_rate, "tracks": tracks}
+
+
+def read_resolve_track(timeline, frame_rate: float, track_index: int, track_name: str):
+    """
+    在已解析的时间线上读取一条字幕轨道，返回 ("success", 轨道数据)。
+    轨道数据包含 `track_index`、`track_name`、`fingerprint` 和字幕列表 `data`。
+    """
+    timer = PhaseTimer()
+    subtitle_items = timeline.GetItemListInTrack("subtitle", track_index) or []
+    snapshot = _snapshot_track_items(subtitle_items, frame_rate, track_index, timer)
+    return "success", {
+        "track_index": track_index,
+        "track_name": track_name,
+        "fingerprint": snapshot.fingerprint,
+        "data": list(iter_snapshot_cues(snapshot)),
+    }
+
+
+def get_resolve_all_subtitles(track_indices: Optional[List[int]] = None):
+    """
+    连接到 DaVinci Resolve，只解析一次当前时间线，并提取所有（或指定的）字幕轨道。
+
+    Args:
+        track_indices (List[int]): 要提取的轨道索引；为 None 时提取所有字幕轨道。
+
+    Returns:
+        一个元组 (status, data), 其中 data 包含 `frameRate` 和每条轨道的
+        名称与字幕列表 `tracks`，或错误信息字典。
+    """
+    status, plan = get_resolve_subtitle_track_plan(track_indices)
+    if status == "error":
+        return status, plan
+
+    timer = PhaseTimer()
+    tracks = [
+        read_resolve_track(plan["timeline"], plan["frameRate"], track_index, track_name)[1]
+        for track_index, track_name in plan["tracks"]
+    ]
+    timer.mark("extract")
+
+    logging.info("已提取 %s 条字幕轨道, 共 %s 条字幕, 耗时 %s", len(tracks), sum(len(track['data']) for track in tracks), timer.timings, extra=SAMPLED)
+    return "success", {"frameRate": plan["frameRate"], "tracks": tracks, "timings": timer.timings}
+
+
+def _fingerprint_track(frame_rate, start_frames, end_frames, texts) -> str:
+    """
+    Computes a stable content fingerprint of an extracted track from its raw frames
+    and texts, without encoding the cue list.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(float(frame_rate)).encode("ascii"))
+    digest.update(array("q", start_frames).tobytes())
+    digest.update(array("q", end_frames).tobytes())
+    digest.update("\x00".join(texts).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _read_track_items(subtitle_items):
+    """
+    Reads the raw start/end frames and names of every item on a track in a single pass.
+
+    Returns:
+        A tuple (start_frames, end_frames, texts) of parallel lists.
+    """
+    start_frames = []
+    end_frames = []
+    texts = []
+    for item in subtitle_items:
+        start_frames.append(item.GetStart())
+        end_frames.append(item.GetEnd())
+        texts.append(item.GetName())
+    return start_frames, end_frames, texts
 
-from timecode_utils import timecode_to_frames, frames_to_timecode, frames_to_srt_timecode
 
 def set_resolve_timecode(in_point: str, out_point: str, jump_to: str):
     """
@@ -292,89 +607,158 @@ def set_resolve_timecode(in_point: str, out_point: str, jump_to: str):
 
     try:
         timeline.SetCurrentTimecode(target_timecode)
-        logging.info(f"成功将时间码设置为: {target_timecode}")
+        logging.info("成功将时间码设置为: %s", target_timecode, extra=SAMPLED)
         return "success", {"message": f"成功将时间码设置为: {target_timecode}"}
     except Exception as e:
         logging.error(f"设置时间码时出错: {e}", exc_info=True)
         return "error", {"code": "set_timecode_failed", "message": f"设置时间码时出错: {e}"}
+
+
+def set_resolve_playhead(timecode: Optional[str] = None, frame: Optional[int] = None, cue_id: Optional[int] = None,
+                         track_index: int = 1, jump_to: str = "start"):
+    """
+    将当前时间线的播放头移动到时间码、时间线绝对帧或字幕条目处。
+
+    按 `cue_id` 跳转时，字幕的起止帧取自该轨道最近一次提取的快照（与客户端看到的字幕 ID 一致），
+    只有尚未提取过该轨道时才读取一次；`jump_to` 选择字幕的起点、终点或中点。
+
+    Returns:
+        一个元组 (status, data)，data 包含目标 `timecode` 和各阶段耗时 `timings`，或错误信息字典。
+    """
+    timeline, frame_rate, error = _get_current_timeline()
+    if error:
+        return "error", error
+
+    timer = PhaseTimer()
+    if cue_id is not None:
+        snapshot = get_snapshot_store().latest(_track_key(track_index))
+        if snapshot is None:
+            snapshot, _, error = _read_subtitle_track(track_index)
+            if error:
+                return "error", error
+        if not 1 <= cue_id <= len(snapshot):
+            return "error", {"code": "cue_not_found", "message": f"字幕轨道 {track_index} 上没有 ID 为 {cue_id} 的字幕。"}
+        start_frame, end_frame = snapshot.start_frames[cue_id - 1], snapshot.end_frames[cue_id - 1]
+        if jump_to == "end":
+            frame = end_frame
+        elif jump_to == "middle":
+            frame = (start_frame + end_frame) // 2
+        else:
+            frame = start_frame
+        timer.mark("lookup")
+    if frame is not None:
+        timecode = format_timecode(frame, frame_rate)
+
+    try:
+        timeline.SetCurrentTimecode(timecode)
+    except Exception as e:
+        logging.error(f"设置时间码时出错: {e}", exc_info=True)
+        return "error", {"code": "set_timecode_failed", "message": f"设置时间码时出错: {e}"}
+    timer.mark("resolve")
+    logging.info("播放头已移动到: %s", timecode, extra=SAMPLED)
+    return "success", {"timecode": timecode, "timings": timer.timings}
 from schemas import SubtitleExportRequest
 
 
+def iter_srt_content(request: SubtitleExportRequest, base_frames: int = 0):
+    """
+    Yields the SRT document for a list of subtitle objects block by block, so large
+    exports can be streamed without building the whole document in memory.
+    """
+    return iter_srt(compile_export_request(request, base_frames))
+
+
 def generate_srt_content(request: SubtitleExportRequest, base_frames: int = 0) -> str:
     """
     Generates a string in SRT format from a list of subtitle objects.
     """
-    srt_blocks = []
-    frame_rate = request.frameRate
+    return "".join(iter_srt_content(request, base_frames))
 
-    for index, subtitle in enumerate(request.subtitles, start=1):
-        # 1. Reconstruct clean text from diffs
-        clean_text = "".join([part.value for part in subtitle.diffs if part.type != 'removed'])
 
-        # 2. Convert timecodes to relative frames
-        start_frames = timecode_to_frames(subtitle.startTimecode, frame_rate) - base_frames
-        end_frames = timecode_to_frames(subtitle.endTimecode, frame_rate) - base_frames
+def export_to_davinci(request: SubtitleExportRequest, progress=None):
+    """
+    Exports subtitles to DaVinci Resolve by writing an SRT file to the scratch
+    directory, importing it, and adding it to the timeline. Content that was
+    already imported into the current project reuses its media pool item.
+    """
+    first_timecode = request.subtitles[0].startTimecode if request.subtitles else None
+    return export_compiled_to_davinci(
+        lambda frame_rate, base_frames: compile_export_request(request, base_frames), first_timecode, progress)
+
 
-        # 3. Format frames back to SRT timecode
-        start_srt_time = frames_to_srt_timecode(max(0, start_frames), frame_rate)
-        end_srt_time = frames_to_srt_timecode(max(0, end_frames), frame_rate)
+# Phases of an export, in order; from "import" on, the export changes the project.
+EXPORT_PHASES = ("prepare", "write", "import", "append")
 
-        # 4. Assemble the SRT block
-        srt_block = f"{index}\n{start_srt_time} --> {end_srt_time}\n{clean_text}"
-        srt_blocks.append(srt_block)
 
-    # 5. Join all blocks with double newlines
-    return "\n\n".join(srt_blocks)
+def _enter_export_phase(progress, phase: str):
+    """Reports the start of `phase`; returns the error to stop with if `progress` cancelled the export."""
+    if progress is None or progress(phase):
+        return None
+    logging.info("导出已在 %s 阶段之前取消。", phase)
+    return {"code": "export_cancelled", "message": f"导出已在 {phase} 阶段之前取消。"}
 
 
-def export_to_davinci(request: SubtitleExportRequest):
+def export_compiled_to_davinci(compile_subtitles, first_timecode: Optional[str] = None, progress=None):
     """
-    Exports subtitles to DaVinci Resolve by creating a temporary SRT file,
-    importing it, and adding it to the timeline.
+    Exports compiled subtitles to DaVinci Resolve, see `export_to_davinci`.
+
+    Args:
+        compile_subtitles: Called with the timeline frame rate and start frame; returns the
+            `CompiledSubtitles` to write, with frames relative to the timeline start.
+        first_timecode: Where to put the playhead before appending. Defaults to the
+            timeline timecode of the first cue.
+        progress: Optional callable, called with each phase of `EXPORT_PHASES` as it
+            starts; returning False stops the export with `export_cancelled`.
     """
-    resolve, error = _connect_to_resolve()
+    cancelled = _enter_export_phase(progress, "prepare")
+    if cancelled:
+        return "error", cancelled
+    context, error = _get_session_context()
     if error:
         return "error", error
 
-    projectManager = resolve.GetProjectManager()
-    project = projectManager.GetCurrentProject()
-    if not project:
-        return "error", {"code": "no_project_open", "message": "未找到当前打开的项目。"}
-
-    media_pool = project.GetMediaPool()
+    media_pool = context.get_media_pool()
     if not media_pool:
         return "error", {"code": "no_media_pool", "message": "无法获取媒体池。"}
 
-    timeline, frame_rate, error = _get_current_timeline()
-    if error:
-        return "error", error
-
-    start_tc_str = timeline.GetStartTimecode()
+    frame_rate = context.frame_rate
+    start_tc_str = context.get_start_timecode()
     base_frames = timecode_to_frames(start_tc_str, frame_rate)
     
-    srt_content = generate_srt_content(request, base_frames)
-    temp_file_path = ""
     try:
-        # Create a temporary file to store the SRT content
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.srt', delete=False, encoding='utf-8') as temp_file:
-            temp_file_path = temp_file.name
-            temp_file.write(srt_content)
-            temp_file.flush() # Ensure content is written to disk
-        
-        logging.info(f"临时 SRT 文件已创建: {temp_file_path}")
-
-        # Import the temporary SRT file into the media pool
-        media_items = media_pool.ImportMedia([temp_file_path])
-        if not media_items:
-            logging.error("导入媒体文件失败。")
-            return "error", {"code": "import_failed", "message": "导入媒体文件失败。"}
-        
-        # The API returns a list, we need the first item
-        media_item = media_items[0]
-        
-        timeline = project.GetCurrentTimeline()
-        if not timeline:
-            return "error", {"code": "no_active_timeline", "message": "项目中没有活动的（当前）时间线。"}
+        cancelled = _enter_export_phase(progress, "write")
+        if cancelled:
+            return "error", cancelled
+        compiled = compile_subtitles(frame_rate, base_frames)
+        if first_timecode is None and len(compiled):
+            first_timecode = format_timecode(base_frames + compiled.start_frames[0], frame_rate)
+
+        # Write the SRT content to the scratch directory under its content hash
+        content_hash, srt_path = _write_scratch_srt(iter_srt(compiled))
+        logging.info("SRT 文件已写入: %s", srt_path, extra=SAMPLED)
+
+        cancelled = _enter_export_phase(progress, "import")
+        if cancelled:
+            return "error", cancelled
+        # Reuse the media pool item imported earlier for identical content
+        media_item = _find_imported_media(context, content_hash)
+        if media_item is not None:
+            logging.info("复用已导入的字幕媒体 (sha256=%s)，跳过导入。", content_hash[:12], extra=SAMPLED)
+        else:
+            # Import the SRT file into the media pool
+            media_items = media_pool.ImportMedia([srt_path])
+            if not media_items:
+                logging.error("导入媒体文件失败。")
+                return "error", {"code": "import_failed", "message": "导入媒体文件失败。"}
+
+            # The API returns a list, we need the first item
+            media_item = media_items[0]
+            context.remember_imported_media(content_hash, media_item)
+
+        cancelled = _enter_export_phase(progress, "append")
+        if cancelled:
+            return "error", cancelled
+        timeline = context.timeline
 
         # 1. 显式轨道创建
         if not timeline.AddTrack("subtitle"):
@@ -382,50 +766,108 @@ def export_to_davinci(request: SubtitleExportRequest):
             return "error", {"message": "Failed to create a new subtitle track.", "code": "create_track_failed"}
         
         target_track_index = timeline.GetTrackCount("subtitle")
-        logging.info(f"成功创建新的字幕轨道，索引为: {target_track_index}")
-
-        # 2. 轨道隔离与状态保存
-        original_track_states = {}
-        total_subtitle_tracks = timeline.GetTrackCount("subtitle")
-        
-        # 先保存所有轨道的原始状态
-        for i in range(1, total_subtitle_tracks + 1):
-            original_track_states[i] = timeline.GetIsTrackEnabled("subtitle", i)
+        logging.info("成功创建新的字幕轨道，索引为: %s", target_track_index, extra=SAMPLED)
 
-        try:
-            # 禁用所有其他轨道，并显式启用目标轨道
-            for i in range(1, total_subtitle_tracks + 1):
-                if i != target_track_index:
-                    timeline.SetTrackEnable("subtitle", i, False)
-            timeline.SetTrackEnable("subtitle", target_track_index, True)
-            logging.info(f"轨道隔离完成：仅启用目标轨道 {target_track_index}")
+        # 2. 轨道隔离：一次读取所有轨道状态，只切换需要改变的轨道
+        # 新轨道是最后一条轨道，所以轨道总数就是它的索引
+        with isolated_track(timeline, target_track_index, track_count=target_track_index) as track_states:
+            logging.info("轨道隔离完成：仅启用目标轨道 %s（切换了 %s 条轨道）", target_track_index, track_states.writes, extra=SAMPLED)
 
             # 3. 精确定位插入点
-            if request.subtitles:
-                first_subtitle_tc = request.subtitles[0].startTimecode
-                timeline.SetCurrentTimecode(first_subtitle_tc)
-                logging.info(f"播放头已移动到: {first_subtitle_tc}")
+            if first_timecode:
+                timeline.SetCurrentTimecode(first_timecode)
+                logging.info("播放头已移动到: %s", first_timecode, extra=SAMPLED)
 
             # 4. 执行“粘贴”操作
             # 此时，因为只有一个字幕轨道是启用的，所以字幕会精确地添加到该轨道
             if not media_pool.AppendToTimeline([media_item]):
                 logging.warning("AppendToTimeline 返回了 false 或 None，但这可能是预期的行为。")
-
-        finally:
-            # 根据用户要求，不再恢复轨道的原始状态，以保持新轨道为激活状态。
-            pass
+        # 退出时其他轨道恢复原来的启用状态，新轨道保持启用。
+        # 隔离失败（Resolve 拒绝禁用某条轨道）时抛出 TrackStateError，作为 export_error 返回，不会附加字幕。
 
         logging.info("成功将字幕导入并附加到时间线。")
-        return "success", {"message": "成功将字幕导出至 DaVinci Resolve。"}
+        result = {"message": "成功将字幕导出至 DaVinci Resolve。", "track_index": target_track_index, "cue_count": len(compiled)}
+        if track_states.restore_failed:
+            result["restore_failed_tracks"] = track_states.restore_failed
+        return "success", result
 
     except Exception as e:
         logging.error(f"导出至 DaVinci Resolve 时出错: {e}", exc_info=True)
         return "error", {"code": "export_error", "message": f"导出至 DaVinci Resolve 时出错: {e}"}
-    finally:
-        # Clean up the temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                logging.info(f"临时文件已删除: {temp_file_path}")
-            except OSError as e:
-                logging.error(f"删除临时文件时出错: {e}", exc_info=True)
\ No newline at end of file
+
+
+# SRT files handed to ImportMedia are kept in a scratch directory, named by content hash.
+_SCRATCH_DIR_NAME = "synapse-srt"
+_MAX_SCRATCH_FILES = 64
+_scratch_dir = None
+
+
+def _get_scratch_dir() -> str:
+    """
+    Returns the reusable scratch directory for SRT files, preferring tmpfs
+    (/dev/shm) when available so the files never hit the disk.
+    """
+    global _scratch_dir
+    if _scratch_dir is None:
+        base_dir = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else tempfile.gettempdir()
+        scratch_dir = os.path.join(base_dir, _SCRATCH_DIR_NAME)
+        os.makedirs(scratch_dir, exist_ok=True)
+        _scratch_dir = scratch_dir
+    return _scratch_dir
+
+
+def _write_scratch_srt(chunks):
+    """
+    Writes SRT chunks to the scratch directory while hashing them, and stores the
+    file as `<sha256>.srt`. An existing file with the same content is kept as is.
+
+    Returns:
+        A tuple (content_hash, path).
+    """
+    scratch_dir = _get_scratch_dir()
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.part', dir=scratch_dir, delete=False, encoding='utf-8') as temp_file:
+        try:
+            for chunk in chunks:
+                temp_file.write(chunk)
+                digest.update(chunk.encode('utf-8'))
+        except Exception:
+            temp_file.close()
+            os.remove(temp_file.name)
+            raise
+    content_hash = digest.hexdigest()
+    path = os.path.join(scratch_dir, f"{content_hash}.srt")
+    if os.path.exists(path):
+        os.remove(temp_file.name)
+    else:
+        os.replace(temp_file.name, path)
+        _prune_scratch_dir(scratch_dir)
+    return content_hash, path
+
+
+def _prune_scratch_dir(scratch_dir: str):
+    """Removes the oldest scratch SRT files beyond `_MAX_SCRATCH_FILES`."""
+    try:
+        entries = [entry for entry in os.scandir(scratch_dir) if entry.name.endswith('.srt')]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in entries[_MAX_SCRATCH_FILES:]:
+            os.remove(entry.path)
+    except OSError as e:
+        logging.warning(f"清理 SRT 暂存目录时出错: {e}")
+
+
+def _find_imported_media(context, content_hash: str):
+    """
+    Looks up the media pool item imported earlier in this project for `content_hash`,
+    dropping it from the index if the user has since removed it from the media pool.
+    """
+    media_item = context.get_imported_media(content_hash)
+    if media_item is None:
+        return None
+    try:
+        if media_item.GetName():
+            return media_item
+    except Exception:
+        pass
+    context.forget_imported_media(content_hash)
+    return None
\ No newline at end of file
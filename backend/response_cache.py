@@ -0,0 +1,102 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder is used when orjson is not installed
+    orjson = None
+
+
+def _encode_json_stdlib(content) -> bytes:
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_json(content) -> bytes:
+    """
+    Encodes `content` to the same compact UTF-8 bytes as Starlette's `JSONResponse`, using
+    orjson when it is installed. Anything orjson rejects (integers beyond 64 bits, non-JSON
+    types, lone surrogates) is retried with the stdlib encoder. Unlike the stdlib encoder,
+    orjson writes NaN and infinities as `null` instead of raising, and spells exponents
+    without a sign or padding (`1e21`, `1.5e-7`).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return _encode_json_stdlib(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    `JSONResponse` encoded with `encode_json`. Returning it from an endpoint also skips
+    FastAPI's `response_model` validation and `jsonable_encoder` pass, so it is meant for
+    payloads the server built itself from plain dicts, lists, strings and numbers.
+    """
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Checks an `If-None-Match` header against `etag`, using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class EncodedResponseCache:
+    """
+    Keeps the last encoded response body served for each key (e.g. a subtitle track),
+    tagged with the content fingerprint it was encoded from. A body is only reused
+    while the fingerprint still matches.
+    """
+
+    def __init__(self, max_entries: int = 16):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, key, fingerprint: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != fingerprint:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, fingerprint: str, body: bytes):
+        with self._lock:
+            self._entries[key] = (fingerprint, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import List, Union
+import operator
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Optional, Union
 from enum import Enum
 
 # --- Models for SRT Export ---
@@ -12,12 +13,60 @@ class SubtitleModel(BaseModel):
     id: int
     startTimecode: str
     endTimecode: str
-    diffs: List[DiffPartModel]
+    diffs: List[DiffPartModel] = Field(default_factory=list)
+    text: Optional[str] = Field(None, description="字幕的最终文本；提供时优先于 `diffs`，客户端无需再计算差异")
 
 class SubtitleExportRequest(BaseModel):
     frameRate: float
     subtitles: List[SubtitleModel]
 
+# Diff part types in the columnar format's `diffTypes` array.
+COLUMNAR_DIFF_TYPES = ("normal", "added", "removed")
+
+class SubtitleColumns(BaseModel):
+    """
+    Columnar form of a subtitle track or export request: parallel arrays instead of one
+    object per cue, so validation runs over whole arrays at once.
+
+    Like `SubtitleModel.text` and `diffs`, the final text comes from `texts` when it is
+    given, otherwise it is rebuilt from the non-removed diff parts.
+    """
+    frameRate: float = Field(..., gt=0)
+    startFrames: List[int] = Field(..., description="每条字幕的起始帧（时间线绝对帧，与起始时间码对应）")
+    endFrames: List[int] = Field(..., description="每条字幕的结束帧")
+    texts: Optional[List[str]] = Field(None, description="每条字幕的最终文本；提供时优先于差异列，未提供时必须提供差异列")
+    diffOffsets: Optional[List[int]] = Field(None, description="可选：第 i 条字幕的差异片段为 diffTypes/diffValues[diffOffsets[i]:diffOffsets[i+1]]")
+    diffTypes: Optional[List[int]] = Field(None, description="可选：差异片段类型，0 = normal, 1 = added, 2 = removed")
+    diffValues: Optional[List[str]] = Field(None, description="可选：差异片段文本")
+
+    @model_validator(mode="after")
+    def _check_columns(self):
+        count = len(self.startFrames)
+        if len(self.endFrames) != count or (self.texts is not None and len(self.texts) != count):
+            texts_count = "-" if self.texts is None else len(self.texts)
+            raise ValueError(f"startFrames/endFrames/texts 长度不一致: {count}/{len(self.endFrames)}/{texts_count}")
+        if count and min(self.startFrames) < 0:
+            raise ValueError("startFrames 不能为负数")
+        if any(map(operator.lt, self.endFrames, self.startFrames)):
+            index = next(i for i, (start, end) in enumerate(zip(self.startFrames, self.endFrames)) if end < start)
+            raise ValueError(f"endFrames[{index}] 早于 startFrames[{index}]")
+        diff_columns = (self.diffOffsets, self.diffTypes, self.diffValues)
+        if any(column is not None for column in diff_columns):
+            if any(column is None for column in diff_columns):
+                raise ValueError("diffOffsets、diffTypes 和 diffValues 必须同时提供")
+            offsets = self.diffOffsets
+            if len(offsets) != count + 1 or (offsets and offsets[0] != 0) or offsets[-1] != len(self.diffTypes):
+                raise ValueError("diffOffsets 必须有 len(startFrames) + 1 项，从 0 开始并以差异片段总数结束")
+            if len(self.diffValues) != len(self.diffTypes):
+                raise ValueError("diffTypes 与 diffValues 长度不一致")
+            if any(map(operator.lt, offsets[1:], offsets)):
+                raise ValueError("diffOffsets 必须单调不减")
+            if self.diffTypes and not set(self.diffTypes) <= {0, 1, 2}:
+                raise ValueError("diffTypes 只能为 0、1 或 2")
+        elif self.texts is None:
+            raise ValueError("必须提供 texts，或同时提供 diffOffsets、diffTypes 和 diffValues")
+        return self
+
 # --- Models for Timeline ---
 
 class SubtitleTrackInfo(BaseModel):
@@ -42,11 +91,122 @@ class SuccessResponse(BaseModel):
     frameRate: float
     data: List[SubtitleItem]
 
+class TrackSubtitles(BaseModel):
+    track_index: int = Field(..., example=1, description="字幕轨道的索引（从1开始）")
+    track_name: str = Field(..., example="Subtitle 1", description="字幕轨道的名称")
+    fingerprint: str = Field(..., description="轨道内容指纹，可作为 `/api/v1/subtitles/changes` 的 `since`")
+    data: List[SubtitleItem]
+
+class AllSubtitlesResponse(BaseModel):
+    status: str = "success"
+    frameRate: float
+    tracks: List[TrackSubtitles]
+
+class SubtitleChangeItem(SubtitleItem):
+    key: str = Field(..., example="86400:9f86d081884c7d65", description="字幕条目的键：起始帧 + 文本哈希")
+    previousKey: Optional[str] = Field(None, description="重新定时的条目在旧版本中的键")
+
+class SubtitleChangesResponse(BaseModel):
+    status: str = "success"
+    frameRate: float
+    token: str = Field(..., description="当前轨道版本的令牌，下次请求时作为 `since` 传回")
+    since: Optional[str] = None
+    reset: bool = Field(..., description="为 true 时 `added` 包含完整轨道，客户端应丢弃本地副本")
+    count: int = Field(..., description="当前轨道上的字幕条目总数")
+    added: List[SubtitleChangeItem]
+    removed: List[str]
+    retimed: List[SubtitleChangeItem]
+
+class SubtitleParseIssue(BaseModel):
+    line: int = Field(..., example=12, description="问题所在的行号（从1开始）")
+    column: int = Field(..., example=14, description="问题所在的列号（从1开始）")
+    message: str = Field(..., example="时间轴格式无效")
+    excerpt: str = Field(..., description="问题行的内容（最多80个字符）")
+
+class ImportedCue(BaseModel):
+    id: int
+    startTimecode: str = Field(..., example="00:00:01.000")
+    endTimecode: str = Field(..., example="00:00:03.500")
+    text: str
+
+class SubtitleImportResponse(BaseModel):
+    status: str = "success"
+    uploadId: str = Field(..., description="上传内容的标识，用于获取其他分页或导出至 DaVinci Resolve")
+    format: str = Field(..., example="srt", description="识别出的文件格式：srt 或 vtt")
+    encoding: str = Field(..., example="utf-8", description="识别出的编码；含回退编码的行时为 `utf-8+gb18030`")
+    total: int = Field(..., description="解析出的字幕条目总数")
+    page: int
+    pageSize: int
+    issues: List[SubtitleParseIssue]
+    cues: List[ImportedCue]
+
+class SearchResultItem(SubtitleItem):
+    matches: List[List[int]] = Field(..., example=[[0, 5]], description="每处匹配的 [起始, 结束) 偏移（JavaScript 字符串下标，即 UTF-16 码元）")
+
+class SearchResponse(BaseModel):
+    status: str = "success"
+    fingerprint: str = Field(..., description="被搜索的轨道版本指纹")
+    totalCues: int = Field(..., description="包含匹配的字幕条目总数")
+    totalMatches: int = Field(..., description="匹配总数")
+    page: int
+    pageSize: int
+    results: List[SearchResultItem]
+
+class SearchReplaceRequest(BaseModel):
+    track_index: int = Field(1, description="字幕轨道的索引（从1开始）")
+    query: str = Field(..., min_length=1, example="colour")
+    replacement: str = Field("", example="color", description="替换文本，支持 `$&`、`$1`、`$<name>` 和 `$$`")
+    regex: bool = False
+    matchCase: bool = False
+    wholeWord: bool = False
+    edits: Dict[int, str] = Field(default_factory=dict, description="客户端已编辑字幕的当前文本（字幕 ID -> 文本），替换时代替原始文本")
+
+class ReplacedCue(BaseModel):
+    id: int
+    key: Optional[str] = None
+    text: str
+    diffs: List[DiffPartModel]
+
+class SearchReplaceResponse(BaseModel):
+    status: str = "success"
+    fingerprint: str
+    count: int = Field(..., description="发生替换的字幕条目数")
+    cues: List[ReplacedCue]
+
+class DiffGranularity(str, Enum):
+    char = "char"
+    word = "word"
+
+class DiffItem(BaseModel):
+    id: int
+    original: str
+    edited: str
+
+class DiffRequest(BaseModel):
+    granularity: DiffGranularity = DiffGranularity.char
+    items: List[DiffItem]
+
+class DiffResultItem(BaseModel):
+    id: int
+    diffs: List[DiffPartModel]
+
+class DiffResponse(BaseModel):
+    status: str = "success"
+    granularity: DiffGranularity
+    items: List[DiffResultItem]
+
 class ErrorResponse(BaseModel):
     status: str = "error"
     message: str
     code: str
 
+class SubtitleResponseFormat(str, Enum):
+    json = "json"
+    json_stream = "json-stream"
+    ndjson = "ndjson"
+    columnar = "columnar"
+    columnar_msgpack = "columnar-msgpack"
+
 class JumpToOptions(str, Enum):
     start = "start"
     end = "end"
@@ -55,4 +215,19 @@ class JumpToOptions(str, Enum):
 class TimecodeRequest(BaseModel):
     in_point: str = Field(..., example="01:00:00:00", description="入点时间码，格式为 HH:MM:SS:FF")
     out_point: str = Field(..., example="01:00:10:00", description="出点时间码，格式为 HH:MM:SS:FF")
-    jump_to: JumpToOptions = Field(..., description="跳转位置，可选值为 'start', 'end', 'middle'")
\ No newline at end of file
+    jump_to: JumpToOptions = Field(..., description="跳转位置，可选值为 'start', 'end', 'middle'")
+
+class NavigationRequest(BaseModel):
+    """A playhead jump: exactly one of `timecode`, `frame` or `cue_id` gives the target."""
+    timecode: Optional[str] = Field(None, example="01:00:05:00", description="目标时间码，格式为 HH:MM:SS:FF")
+    frame: Optional[int] = Field(None, ge=0, description="目标帧（时间线绝对帧）")
+    cue_id: Optional[int] = Field(None, ge=1, description="目标字幕 ID（与字幕列表中的 `id` 相同）")
+    track_index: int = Field(1, description="`cue_id` 所在字幕轨道的索引（从1开始）")
+    jump_to: JumpToOptions = Field(JumpToOptions.start, description="按 `cue_id` 跳转时的位置，可选值为 'start', 'end', 'middle'")
+
+    @model_validator(mode="after")
+    def _check_target(self):
+        targets = [name for name in ("timecode", "frame", "cue_id") if getattr(self, name) is not None]
+        if len(targets) != 1:
+            raise ValueError("timecode、frame 和 cue_id 必须且只能提供一个")
+        return self
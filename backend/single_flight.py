@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Optional
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in flight,
+    later callers with the same key await the same result instead of starting
+    another one. The shared call is shielded, so a caller that disconnects does
+    not cancel the work for everyone else.
+
+    A call can pass a `started` event that it sets once it begins reading its source.
+    From then on the call is closed to newcomers: a caller arriving after the read
+    began starts a new call, so it never gets a result read before it arrived (e.g.
+    from a timeline that was switched away from in between).
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._stats = defaultdict(lambda: {"executed": 0, "coalesced": 0, "started_misses": 0})
+
+    async def do(self, key, fn, *args, started: Optional[threading.Event] = None, **kwargs):
+        """
+        Awaits `fn(*args, **kwargs)` once per in-flight `key`. The first element
+        of `key` is used as the metrics label. `started`, if given, is set by `fn`
+        (from any thread) when it starts the work that later callers may not share.
+        """
+        label = key[0]
+        flight = self._in_flight.get(key)
+        if flight is not None and not flight[0].done():
+            if flight[1] is None or not flight[1].is_set():
+                self._stats[label]["coalesced"] += 1
+                return await asyncio.shield(flight[0])
+            self._stats[label]["started_misses"] += 1
+
+        future = asyncio.ensure_future(fn(*args, **kwargs))
+        flight = (future, started)
+        self._in_flight[key] = flight
+        self._stats[label]["executed"] += 1
+        future.add_done_callback(lambda done: self._forget(key, flight))
+        return await asyncio.shield(future)
+
+    def _forget(self, key, flight):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    def get_stats(self) -> dict:
+        stats = {label: dict(counts) for label, counts in self._stats.items()}
+        for counts in stats.values():
+            total = counts["executed"] + counts["coalesced"]
+            counts["coalesced_ratio"] = round(counts["coalesced"] / total, 3) if total else 0.0
+        return {"in_flight": len(self._in_flight), "keys": stats}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Returns the process-wide single-flight group."""
+    return _single_flight
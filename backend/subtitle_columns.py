@@ -0,0 +1,84 @@
+from typing import Optional
+
+from schemas import COLUMNAR_DIFF_TYPES, SubtitleColumns
+from subtitle_export import CompiledSubtitles
+from track_snapshots import TrackSnapshot
+
+try:
+    import msgpack
+except ImportError:  # MessagePack support is optional
+    msgpack = None
+
+COLUMNS_JSON_MEDIA_TYPE = "application/vnd.subtitle-columns+json"
+COLUMNS_MSGPACK_MEDIA_TYPE = "application/vnd.subtitle-columns+msgpack"
+_MSGPACK_MEDIA_TYPES = (COLUMNS_MSGPACK_MEDIA_TYPE, "application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+_REMOVED = COLUMNAR_DIFF_TYPES.index("removed")
+
+
+class ColumnsUnavailable(Exception):
+    """Raised when MessagePack is requested but the `msgpack` package is not installed."""
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def is_columns_media_type(content_type: Optional[str]) -> bool:
+    media_type = _media_type(content_type)
+    return media_type == COLUMNS_JSON_MEDIA_TYPE or media_type in _MSGPACK_MEDIA_TYPES
+
+
+def decode_columns(body: bytes, content_type: Optional[str]) -> SubtitleColumns:
+    """
+    Parses and validates a columnar payload sent as JSON or MessagePack.
+    Raises `pydantic.ValidationError` for invalid payloads and `ValueError` for undecodable MessagePack.
+    """
+    if _media_type(content_type) in _MSGPACK_MEDIA_TYPES:
+        if msgpack is None:
+            raise ColumnsUnavailable("服务器未安装 msgpack，无法解析 MessagePack 请求体。")
+        try:
+            payload = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise ValueError(f"无效的 MessagePack 请求体: {e}") from e
+        return SubtitleColumns.model_validate(payload)
+    return SubtitleColumns.model_validate_json(body)
+
+
+def column_texts(columns: SubtitleColumns) -> list:
+    """Returns the final text of every cue: `texts` when given, else the non-removed diff parts joined."""
+    if columns.texts is not None:
+        return columns.texts
+    offsets, types, values = columns.diffOffsets, columns.diffTypes, columns.diffValues
+    return [
+        "".join([values[part] for part in range(start, end) if types[part] != _REMOVED])
+        for start, end in zip(offsets, offsets[1:])
+    ]
+
+
+def compile_columns(columns: SubtitleColumns, base_frames: int = 0) -> CompiledSubtitles:
+    """Builds the export representation of a columnar payload; no per-cue parsing is needed."""
+    if base_frames:
+        start_frames = [frames - base_frames if frames > base_frames else 0 for frames in columns.startFrames]
+        end_frames = [frames - base_frames if frames > base_frames else 0 for frames in columns.endFrames]
+    else:
+        start_frames = columns.startFrames
+        end_frames = columns.endFrames
+    return CompiledSubtitles(columns.frameRate, start_frames, end_frames, column_texts(columns))
+
+
+def snapshot_columns(snapshot: TrackSnapshot) -> dict:
+    """Returns a track snapshot in the columnar format."""
+    return {
+        "status": "success",
+        "frameRate": snapshot.frame_rate,
+        "fingerprint": snapshot.fingerprint,
+        "startFrames": snapshot.start_frames,
+        "endFrames": snapshot.end_frames,
+        "texts": snapshot.texts,
+    }
+
+
+def encode_msgpack(content) -> bytes:
+    if msgpack is None:
+        raise ColumnsUnavailable("服务器未安装 msgpack，无法生成 MessagePack 响应。")
+    return msgpack.packb(content, use_bin_type=True)
@@ -0,0 +1,184 @@
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+from xml.sax.saxutils import escape as xml_escape
+
+from schemas import SubtitleExportRequest
+from timecode_utils import timecodes_to_frames
+
+
+class CompiledSubtitles:
+    """
+    Frame-based intermediate form of an export request: clean texts and start/end
+    frames relative to the timeline start, parsed once and shared by every writer.
+    """
+
+    def __init__(self, frame_rate: float, start_frames: List[int], end_frames: List[int], texts: List[str]):
+        self.frame_rate = frame_rate
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.texts = texts
+        self._time_parts = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def time_parts(self):
+        """
+        Returns (start, end) lists of (hours, minutes, seconds, milliseconds) tuples,
+        computed once with the same arithmetic as `frames_to_srt_timecode`.
+        """
+        if self._time_parts is None:
+            frame_rate = self.frame_rate
+            cache = {}
+
+            def split(frames):
+                parts = cache.get(frames)
+                if parts is None:
+                    if frame_rate == 0:
+                        parts = (0, 0, 0, 0)
+                    else:
+                        total_seconds = frames / frame_rate
+                        parts = (
+                            int(total_seconds / 3600),
+                            int((total_seconds % 3600) / 60),
+                            int(total_seconds % 60),
+                            int((total_seconds - int(total_seconds)) * 1000),
+                        )
+                    cache[frames] = parts
+                return parts
+
+            self._time_parts = ([split(f) for f in self.start_frames], [split(f) for f in self.end_frames])
+        return self._time_parts
+
+
+def compile_export_request(request: SubtitleExportRequest, base_frames: int = 0) -> CompiledSubtitles:
+    """Parses every timecode and reconstructs every clean text of an export request exactly once."""
+    frame_rate = request.frameRate
+    subtitles = request.subtitles
+    start_frames = timecodes_to_frames([subtitle.startTimecode for subtitle in subtitles], frame_rate)
+    end_frames = timecodes_to_frames([subtitle.endTimecode for subtitle in subtitles], frame_rate)
+    texts = [
+        subtitle.text if subtitle.text is not None
+        else "".join([part.value for part in subtitle.diffs if part.type != 'removed'])
+        for subtitle in subtitles
+    ]
+    return CompiledSubtitles(
+        frame_rate,
+        [max(0, frames - base_frames) for frames in start_frames],
+        [max(0, frames - base_frames) for frames in end_frames],
+        texts,
+    )
+
+
+# --- Writers ---
+
+class ExportFormat(NamedTuple):
+    name: str
+    extension: str
+    media_type: str
+    render: Callable[[CompiledSubtitles], Iterator[str]]
+
+
+_FORMATS: Dict[str, ExportFormat] = {}
+
+
+def register_format(name: str, extension: str, media_type: str):
+    """Registers a streaming writer: a generator function that renders `CompiledSubtitles` to text chunks."""
+    def decorator(render):
+        _FORMATS[name] = ExportFormat(name, extension, media_type, render)
+        return render
+    return decorator
+
+
+def get_export_format(name: str) -> Optional[ExportFormat]:
+    return _FORMATS.get(name)
+
+
+def list_export_formats() -> List[str]:
+    return list(_FORMATS)
+
+
+@register_format("srt", "srt", "text/plain")
+def iter_srt(compiled: CompiledSubtitles) -> Iterator[str]:
+    starts, ends = compiled.time_parts()
+    for index, (start, end, text) in enumerate(zip(starts, ends, compiled.texts), start=1):
+        separator = "\n\n" if index > 1 else ""
+        yield (
+            f"{separator}{index}\n"
+            f"{start[0]:02d}:{start[1]:02d}:{start[2]:02d},{start[3]:03d} --> "
+            f"{end[0]:02d}:{end[1]:02d}:{end[2]:02d},{end[3]:03d}\n{text}"
+        )
+
+
+def _escape_vtt(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+@register_format("vtt", "vtt", "text/vtt")
+def iter_vtt(compiled: CompiledSubtitles) -> Iterator[str]:
+    yield "WEBVTT\n"
+    starts, ends = compiled.time_parts()
+    for start, end, text in zip(starts, ends, compiled.texts):
+        yield (
+            f"\n{start[0]:02d}:{start[1]:02d}:{start[2]:02d}.{start[3]:03d} --> "
+            f"{end[0]:02d}:{end[1]:02d}:{end[2]:02d}.{end[3]:03d}\n{_escape_vtt(text)}\n"
+        )
+
+
+_ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,60,&H00FFFFFF,&H000000FF,&H00000000,&H64000000,0,0,0,0,100,100,0,0,1,2,1,2,60,60,50,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+def _escape_ass(text: str) -> str:
+    return text.replace("\r\n", "\n").replace("\n", "\\N").replace("{", "\\{").replace("}", "\\}")
+
+
+@register_format("ass", "ass", "text/x-ssa")
+def iter_ass(compiled: CompiledSubtitles) -> Iterator[str]:
+    yield _ASS_HEADER
+    starts, ends = compiled.time_parts()
+    for start, end, text in zip(starts, ends, compiled.texts):
+        yield (
+            f"Dialogue: 0,{start[0]}:{start[1]:02d}:{start[2]:02d}.{start[3] // 10:02d},"
+            f"{end[0]}:{end[1]:02d}:{end[2]:02d}.{end[3] // 10:02d},Default,,0,0,0,,{_escape_ass(text)}\n"
+        )
+
+
+@register_format("ttml", "ttml", "application/ttml+xml")
+def iter_ttml(compiled: CompiledSubtitles) -> Iterator[str]:
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<tt xmlns="http://www.w3.org/ns/ttml" xml:lang="">\n'
+        '  <body>\n'
+        '    <div>\n'
+    )
+    starts, ends = compiled.time_parts()
+    for start, end, text in zip(starts, ends, compiled.texts):
+        lines = "<br/>".join(xml_escape(line) for line in text.splitlines()) if text else ""
+        yield (
+            f'      <p begin="{start[0]:02d}:{start[1]:02d}:{start[2]:02d}.{start[3]:03d}" '
+            f'end="{end[0]:02d}:{end[1]:02d}:{end[2]:02d}.{end[3]:03d}">{lines}</p>\n'
+        )
+    yield '    </div>\n  </body>\n</tt>\n'
+
+
+@register_format("sbv", "sbv", "text/plain")
+def iter_sbv(compiled: CompiledSubtitles) -> Iterator[str]:
+    starts, ends = compiled.time_parts()
+    for index, (start, end, text) in enumerate(zip(starts, ends, compiled.texts)):
+        separator = "\n\n" if index else ""
+        yield (
+            f"{separator}{start[0]}:{start[1]:02d}:{start[2]:02d}.{start[3]:03d},"
+            f"{end[0]}:{end[1]:02d}:{end[2]:02d}.{end[3]:03d}\n{text}"
+        )
@@ -0,0 +1,334 @@
+import codecs
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from subtitle_export import CompiledSubtitles
+
+# Uploads larger than this are rejected before parsing.
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+# Bytes that could not be decoded as UTF-8 are decoded line by line with this encoding.
+FALLBACK_ENCODING = "gb18030"
+
+_TIME = r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})"
+_TIMING_RE = re.compile(r"\s*" + _TIME + r"\s*-->\s*" + _TIME + r"(?:\s.*)?$")
+_TIME_RE = re.compile(r"\s*" + _TIME)
+_VTT_SKIPPED_BLOCKS = ("NOTE", "STYLE", "REGION")
+
+
+class ParsedCue(NamedTuple):
+    line: int
+    start_ms: int
+    end_ms: int
+    text: str
+
+
+class ParseIssue(NamedTuple):
+    line: int
+    column: int
+    message: str
+    excerpt: str
+
+
+def format_ms(ms: int) -> str:
+    """Formats milliseconds as HH:MM:SS.mmm, the timecode format of imported cues."""
+    seconds, millis = divmod(ms, 1000)
+    minutes, secs = divmod(seconds, 60)
+    hours, mins = divmod(minutes, 60)
+    return f"{hours:02d}:{mins:02d}:{secs:02d}.{millis:03d}"
+
+
+def _time_to_ms(hours, minutes, seconds, millis) -> int:
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(millis.ljust(3, "0"))
+
+
+# Lookup tables for the fast timing-line path; dict lookups are cheaper than int().
+_TWO_DIGITS = {f"{i:02d}": i for i in range(100)}
+_MILLIS = {f"{i:03d}": i for i in range(1000)}
+
+
+def _end_time_column(line: str) -> int:
+    """Returns the 1-based column of the end time of a timing line."""
+    rest = line[line.find("-->") + 3:]
+    return len(line) - len(rest.lstrip()) + 1
+
+
+def _timing_error_column(line: str) -> int:
+    """Returns the 1-based column where a malformed timing line stops making sense."""
+    match = _TIME_RE.match(line)
+    if match is None:
+        return len(line) - len(line.lstrip()) + 1
+    arrow = line.find("-->", match.end())
+    if arrow < 0 or line[match.end():arrow].strip():
+        return match.end() + 1
+    rest = line[arrow + 3:]
+    return arrow + 3 + len(rest) - len(rest.lstrip()) + 1
+
+
+class SubtitleStreamParser:
+    """
+    Incremental SRT/WebVTT parser over raw byte chunks.
+
+    Handles UTF-8/UTF-16 byte order marks, CRLF/CR/LF line endings, lines in a legacy
+    encoding mixed into a UTF-8 file, missing blank lines between cues and WebVTT
+    headers, NOTE/STYLE/REGION blocks and cue settings. Malformed blocks are skipped
+    and recorded in `issues` with their line and column.
+    """
+
+    def __init__(self, fallback_encoding: str = FALLBACK_ENCODING):
+        self.fallback_encoding = fallback_encoding
+        self.format = "srt"
+        self.encoding = None
+        self.issues: List[ParseIssue] = []
+        self.line_count = 0
+        self.fallback_lines = 0
+
+    def _issue(self, line_no: int, column: int, message: str, text: str):
+        self.issues.append(ParseIssue(line_no, column, message, text[:80]))
+
+    # --- Decoding ---
+
+    def _iter_line_blocks(self, chunks: Iterable[bytes]) -> Iterator[List[str]]:
+        """Decodes the byte stream and yields its lines, one list of complete lines per chunk."""
+        chunks = iter(chunks)
+        head = b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= 4:
+                break
+
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+            self.encoding = "utf-16"
+            yield from self._iter_decoded_blocks(head, chunks, codecs.getincrementaldecoder("utf-16")())
+            return
+        if head.startswith(codecs.BOM_UTF8):
+            self.encoding = "utf-8-sig"
+            head = head[len(codecs.BOM_UTF8):]
+        else:
+            self.encoding = "utf-8"
+        yield from self._iter_byte_blocks(head, chunks)
+
+    def _iter_decoded_blocks(self, head: bytes, chunks, decoder) -> Iterator[List[str]]:
+        pending = ""
+        for chunk in _prepend(head, chunks):
+            pending += decoder.decode(chunk)
+            # Keep a trailing "\r" pending too: its "\n" may start the next chunk.
+            cut = max(pending.rfind("\n"), pending.rfind("\r", 0, len(pending) - 1))
+            if cut >= 0:
+                yield _split_lines(pending[:cut + 1])[:-1]
+                pending = pending[cut + 1:]
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield _split_lines(pending)
+
+    def _iter_byte_blocks(self, head: bytes, chunks) -> Iterator[List[str]]:
+        buffer = b""
+        for chunk in _prepend(head, chunks):
+            buffer += chunk
+            cut = max(buffer.rfind(b"\n"), buffer.rfind(b"\r", 0, len(buffer) - 1))
+            if cut < 0:
+                continue
+            block, buffer = buffer[:cut + 1], buffer[cut + 1:]
+            yield self._decode_block(block)[:-1]
+        if buffer:
+            yield self._decode_block(buffer)
+
+    def _decode_block(self, block: bytes) -> List[str]:
+        try:
+            return _split_lines(block.decode("utf-8"))
+        except UnicodeDecodeError:
+            pass
+        lines = []
+        for raw in block.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n"):
+            try:
+                lines.append(raw.decode("utf-8"))
+            except UnicodeDecodeError:
+                self.fallback_lines += 1
+                lines.append(raw.decode(self.fallback_encoding, errors="replace"))
+        return lines
+
+    # --- Parsing ---
+
+    def parse(self, chunks: Iterable[bytes]) -> Iterator[ParsedCue]:
+        """Yields the cues of an SRT or WebVTT byte stream in file order."""
+        timing_match = _TIMING_RE.match
+        two = _TWO_DIGITS
+        millis = _MILLIS
+        cue = None          # [line_no, start_ms, end_ms, text_lines]
+        pending = None      # (line_no, text) of a cue number/identifier line
+        skipping = False    # inside a malformed or ignored block
+        line_no = 0
+
+        for lines in self._iter_line_blocks(chunks):
+            for line in lines:
+                line_no += 1
+                if not line or line.isspace():
+                    if cue is not None:
+                        yield ParsedCue(cue[0], cue[1], cue[2], "\n".join(cue[3]))
+                        cue = None
+                    elif pending is not None:
+                        self._issue(pending[0], 1, "字幕块缺少时间轴行", pending[1])
+                        pending = None
+                    skipping = False
+                    continue
+
+                if "-->" in line:
+                    if cue is not None:
+                        # A new timing line inside a cue: the blank line between cues is missing.
+                        text_lines = cue[3]
+                        if text_lines and text_lines[-1].strip().isdigit():
+                            text_lines.pop()
+                        yield ParsedCue(cue[0], cue[1], cue[2], "\n".join(text_lines))
+                        cue = None
+                    pending = None
+                    match = None
+                    if (line[12:17] == " --> " and (len(line) == 29 or line[29:30].isspace()) and line[2] == line[5] == line[19] == line[22] == ":"
+                            and line[8] in ",." and line[25] in ",."):
+                        # Fast path for the canonical "HH:MM:SS,mmm --> HH:MM:SS,mmm" line (WebVTT settings may follow).
+                        try:
+                            start_ms = ((two[line[0:2]] * 60 + two[line[3:5]]) * 60 + two[line[6:8]]) * 1000 + millis[line[9:12]]
+                            end_ms = ((two[line[17:19]] * 60 + two[line[20:22]]) * 60 + two[line[23:25]]) * 1000 + millis[line[26:29]]
+                            match = True
+                        except KeyError:
+                            pass
+                    if match is None:
+                        match = timing_match(line)
+                        if match is None:
+                            self._issue(line_no, _timing_error_column(line), "时间轴格式无效", line)
+                            skipping = True
+                            continue
+                        groups = match.groups()
+                        start_ms = _time_to_ms(*groups[0:4])
+                        end_ms = _time_to_ms(*groups[4:8])
+                    if end_ms < start_ms:
+                        self._issue(line_no, _end_time_column(line), "结束时间早于开始时间", line)
+                        skipping = True
+                        continue
+                    skipping = False
+                    cue = [line_no, start_ms, end_ms, []]
+                    continue
+
+                if cue is not None:
+                    cue[3].append(line)
+                elif skipping:
+                    continue
+                elif line_no == 1 and line.startswith("WEBVTT"):
+                    self.format = "vtt"
+                    skipping = True
+                elif self.format == "vtt" and line.startswith(_VTT_SKIPPED_BLOCKS):
+                    skipping = True
+                elif pending is not None:
+                    self._issue(line_no, 1, "此处应为时间轴行", line)
+                    pending = None
+                    skipping = True
+                else:
+                    pending = (line_no, line)
+
+        if cue is not None:
+            yield ParsedCue(cue[0], cue[1], cue[2], "\n".join(cue[3]))
+        elif pending is not None:
+            self._issue(pending[0], 1, "字幕块缺少时间轴行", pending[1])
+        self.line_count = line_no
+
+
+def _split_lines(text: str) -> List[str]:
+    """Splits on CRLF, CR and LF only (unlike `str.splitlines`)."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text.split("\n")
+
+
+def _prepend(head: bytes, chunks) -> Iterator[bytes]:
+    if head:
+        yield head
+    yield from chunks
+
+
+class IngestResult:
+    """A parsed upload: its cues, the problems found and how the file was decoded."""
+
+    def __init__(self, upload_id: str, parser: SubtitleStreamParser, cues: List[ParsedCue]):
+        self.upload_id = upload_id
+        self.format = parser.format
+        self.encoding = parser.encoding if not parser.fallback_lines else f"{parser.encoding}+{parser.fallback_encoding}"
+        self.line_count = parser.line_count
+        self.issues = parser.issues
+        self.cues = cues
+
+    def page(self, page: int, page_size: int) -> dict:
+        """Returns one page (1-based) of cues in the format the frontend importer uses."""
+        start = (page - 1) * page_size
+        return {
+            "uploadId": self.upload_id,
+            "format": self.format,
+            "encoding": self.encoding,
+            "total": len(self.cues),
+            "page": page,
+            "pageSize": page_size,
+            "issues": [issue._asdict() for issue in self.issues],
+            "cues": [
+                {"id": start + offset + 1, "startTimecode": format_ms(cue.start_ms), "endTimecode": format_ms(cue.end_ms), "text": cue.text}
+                for offset, cue in enumerate(self.cues[start:start + page_size])
+            ],
+        }
+
+    def compile(self, frame_rate: float) -> CompiledSubtitles:
+        """Converts the cues to frames at `frame_rate`, relative to the timeline start."""
+        return CompiledSubtitles(
+            frame_rate,
+            [round(cue.start_ms * frame_rate / 1000) for cue in self.cues],
+            [round(cue.end_ms * frame_rate / 1000) for cue in self.cues],
+            [cue.text for cue in self.cues],
+        )
+
+
+def parse_upload(chunks: Iterable[bytes]) -> IngestResult:
+    """Parses an uploaded SRT/WebVTT file; the upload ID is derived from its content."""
+    digest = hashlib.sha256()
+
+    def hashed(source):
+        for chunk in source:
+            digest.update(chunk)
+            yield chunk
+
+    parser = SubtitleStreamParser()
+    cues = list(parser.parse(hashed(chunks)))
+    return IngestResult(digest.hexdigest()[:32], parser, cues)
+
+
+class IngestStore:
+    """Keeps the most recent parsed uploads so their pages can be fetched, or exported, without re-uploading."""
+
+    def __init__(self, max_uploads: int = 8):
+        self._max_uploads = max_uploads
+        self._uploads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, result: IngestResult):
+        with self._lock:
+            self._uploads[result.upload_id] = result
+            self._uploads.move_to_end(result.upload_id)
+            while len(self._uploads) > self._max_uploads:
+                self._uploads.popitem(last=False)
+
+    def get(self, upload_id: str) -> Optional[IngestResult]:
+        with self._lock:
+            result = self._uploads.get(upload_id)
+            if result is not None:
+                self._uploads.move_to_end(upload_id)
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._uploads.clear()
+
+
+_ingest_store = IngestStore()
+
+
+def get_ingest_store() -> IngestStore:
+    """Returns the process-wide store of parsed uploads."""
+    return _ingest_store
@@ -0,0 +1,235 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from text_diff import diff_batch
+from timecode_utils import format_timecodes
+from track_snapshots import TrackSnapshot
+
+NGRAM_SIZE = 3
+
+
+class InvalidSearchPattern(ValueError):
+    """Raised when a regular-expression query does not compile."""
+
+
+@lru_cache(maxsize=256)
+def compile_search_pattern(query: str, use_regex: bool = False, match_case: bool = False, whole_word: bool = False):
+    """Compiles a find/replace query with the same options as the frontend's `buildRegex`."""
+    pattern = query if use_regex else re.escape(query)
+    if whole_word:
+        pattern = rf"\b(?:{pattern})\b"
+    try:
+        return re.compile(pattern, 0 if match_case else re.IGNORECASE)
+    except re.error as e:
+        raise InvalidSearchPattern(f"无效的正则表达式: {e}") from e
+
+
+_REPLACEMENT_TOKEN = re.compile(r"\$(\$|&|\d{1,2}|<[^>]*>)")
+
+
+def _expand_replacement(match: re.Match, replacement: str) -> str:
+    """Expands JavaScript `String.replace` patterns ($$, $&, $1, $<name>) like the frontend does."""
+    def token(m):
+        value = m.group(1)
+        if value == "$":
+            return "$"
+        if value == "&":
+            return match.group(0)
+        if value.startswith("<"):
+            name = value[1:-1]
+            return (match.groupdict().get(name) or "") if name in match.re.groupindex else m.group(0)
+        group = int(value)
+        if 0 < group <= match.re.groups:
+            return match.group(group) or ""
+        return m.group(0)
+
+    return _REPLACEMENT_TOKEN.sub(token, replacement)
+
+
+def _ngrams(text: str):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _utf16_offsets(text: str, spans: List[Tuple[int, int]]) -> List[List[int]]:
+    """Converts code-point spans to UTF-16 offsets, i.e. JavaScript string indices."""
+    if not text or max(text) <= "\uffff":
+        return [list(span) for span in spans]
+    prefix = [0]
+    for char in text:
+        prefix.append(prefix[-1] + (2 if char > "\uffff" else 1))
+    return [[prefix[start], prefix[end]] for start, end in spans]
+
+
+class TrackSearchIndex:
+    """
+    Lower-cased n-gram index over the cues of one track.
+
+    Cues are identified by their snapshot key (start frame plus text hash), so when the
+    track changes only the cues that were added or removed are re-indexed. Literal
+    queries of at least `NGRAM_SIZE` characters only verify the cues that contain all of
+    their n-grams; other queries scan every cue with the precompiled pattern.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[TrackSnapshot] = None
+        self._postings = defaultdict(set)
+        self._grams_by_key = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self.snapshot.fingerprint if self.snapshot is not None else None
+
+    def update(self, snapshot: TrackSnapshot) -> dict:
+        """Brings the index up to date with `snapshot`; returns how many cues were indexed and dropped."""
+        with self._lock:
+            if self.snapshot is not None and self.snapshot.fingerprint == snapshot.fingerprint:
+                return {"added": 0, "removed": 0}
+            new_positions = snapshot.index()
+            postings = self._postings
+            removed = [key for key in self._positions if key not in new_positions]
+            for key in removed:
+                for gram in self._grams_by_key.pop(key, ()):
+                    keys = postings[gram]
+                    keys.discard(key)
+                    if not keys:
+                        del postings[gram]
+            added = 0
+            texts = snapshot.texts
+            for key, position in new_positions.items():
+                if key not in self._grams_by_key:
+                    grams = _ngrams(texts[position].lower())
+                    self._grams_by_key[key] = grams
+                    for gram in grams:
+                        postings[gram].add(key)
+                    added += 1
+            self._positions = new_positions
+            self.snapshot = snapshot
+            return {"added": added, "removed": len(removed)}
+
+    def _candidate_positions(self, literal: Optional[str]) -> List[int]:
+        if literal is None or len(literal) < NGRAM_SIZE:
+            return list(range(len(self.snapshot)))
+        grams = sorted((self._postings.get(gram, set()) for gram in _ngrams(literal.lower())), key=len)
+        keys = set(grams[0]).intersection(*grams[1:]) if grams else set()
+        positions = self._positions
+        return sorted(positions[key] for key in keys)
+
+    def search(self, pattern, literal: Optional[str] = None) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """
+        Returns (position, spans) for every cue that matches `pattern`, in track order.
+        `literal` is the query text when the pattern is a plain literal, enabling the n-gram filter.
+        """
+        with self._lock:
+            texts = self.snapshot.texts
+            results = []
+            for position in self._candidate_positions(literal):
+                spans = [match.span() for match in pattern.finditer(texts[position]) if match.end() > match.start()]
+                if spans:
+                    results.append((position, spans))
+            return results
+
+    def replace(self, pattern, replacement: str, literal: Optional[str] = None, edits: Optional[Dict[int, str]] = None) -> List[dict]:
+        """
+        Applies `pattern` -> `replacement` to every cue and returns the affected cues with
+        their new text and diffs against the original (extracted) text. `edits` maps cue
+        ids to the text currently shown by the client, which is used instead of the original.
+        """
+        edits = edits or {}
+        with self._lock:
+            snapshot = self.snapshot
+            positions = set(self._candidate_positions(literal))
+            positions.update(cue_id - 1 for cue_id in edits if 0 < cue_id <= len(snapshot))
+            keys = {position: key for key, position in self._positions.items()}
+            changed = []
+            for position in sorted(positions):
+                original = snapshot.texts[position]
+                current = edits.get(position + 1, original)
+                new_text = pattern.sub(lambda match: _expand_replacement(match, replacement), current)
+                if new_text != current:
+                    changed.append({"id": position + 1, "key": keys.get(position), "text": new_text})
+            originals = [snapshot.texts[cue["id"] - 1] for cue in changed]
+        for cue, diffs in zip(changed, diff_batch(list(zip(originals, (cue["text"] for cue in changed))))):
+            cue["diffs"] = diffs
+        return changed
+
+
+class SearchIndexStore:
+    """Keeps one `TrackSearchIndex` per track (keyed by project, timeline and track index)."""
+
+    def __init__(self, max_tracks: int = 8):
+        self._max_tracks = max_tracks
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"builds": 0, "incremental_updates": 0, "up_to_date": 0, "cues_indexed": 0, "cues_dropped": 0}
+
+    def get_index(self, track_key, snapshot: TrackSnapshot) -> TrackSearchIndex:
+        """Returns the index for `track_key`, updated to `snapshot`."""
+        with self._lock:
+            index = self._indexes.get(track_key)
+            built = index is None
+            if built:
+                index = self._indexes[track_key] = TrackSearchIndex()
+            self._indexes.move_to_end(track_key)
+            while len(self._indexes) > self._max_tracks:
+                self._indexes.popitem(last=False)
+        up_to_date = not built and index.fingerprint == snapshot.fingerprint
+        result = index.update(snapshot)
+        with self._lock:
+            if built:
+                self._stats["builds"] += 1
+            elif up_to_date:
+                self._stats["up_to_date"] += 1
+            else:
+                self._stats["incremental_updates"] += 1
+            self._stats["cues_indexed"] += result["added"]
+            self._stats["cues_dropped"] += result["removed"]
+        return index
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tracks"] = len(self._indexes)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+def render_search_page(index: TrackSearchIndex, results, page: int, page_size: int) -> dict:
+    """Renders one page (1-based) of search results with match offsets in JavaScript string indices."""
+    snapshot = index.snapshot
+    selected = results[(page - 1) * page_size:page * page_size]
+    positions = [position for position, _ in selected]
+    starts = format_timecodes([snapshot.start_frames[p] for p in positions], snapshot.frame_rate)
+    ends = format_timecodes([snapshot.end_frames[p] for p in positions], snapshot.frame_rate)
+    return {
+        "fingerprint": snapshot.fingerprint,
+        "totalCues": len(results),
+        "totalMatches": sum(len(spans) for _, spans in results),
+        "page": page,
+        "pageSize": page_size,
+        "results": [
+            {
+                "id": position + 1,
+                "startTimecode": start,
+                "endTimecode": end,
+                "text": snapshot.texts[position],
+                "matches": _utf16_offsets(snapshot.texts[position], spans),
+            }
+            for (position, spans), start, end in zip(selected, starts, ends)
+        ],
+    }
+
+
+_search_index_store = SearchIndexStore()
+
+
+def get_search_index_store() -> SearchIndexStore:
+    """Returns the process-wide search index store."""
+    return _search_index_store
@@ -0,0 +1,62 @@
+import json
+from typing import Iterable, Iterator
+
+from timecode_utils import format_timecodes
+from track_snapshots import TrackSnapshot
+
+# Streamed responses are flushed in blocks of roughly this many bytes.
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Cues are formatted in batches of this size, so memory stays bounded for any track length.
+CUE_BATCH_SIZE = 1000
+
+
+def buffered_bytes(chunks: Iterable[str], buffer_size: int = STREAM_BUFFER_SIZE) -> Iterator[bytes]:
+    """Groups text chunks into UTF-8 blocks of about `buffer_size` bytes."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _dumps(value) -> str:
+    # Same settings as Starlette's JSONResponse, so streamed and buffered bodies are identical.
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+
+
+def iter_snapshot_cues(snapshot: TrackSnapshot, batch_size: int = CUE_BATCH_SIZE) -> Iterator[dict]:
+    """Yields the cues of a snapshot as `SubtitleItem` dicts, formatting timecodes batch by batch."""
+    frame_rate = snapshot.frame_rate
+    for offset in range(0, len(snapshot), batch_size):
+        stop = offset + batch_size
+        start_timecodes = format_timecodes(snapshot.start_frames[offset:stop], frame_rate)
+        end_timecodes = format_timecodes(snapshot.end_frames[offset:stop], frame_rate)
+        for index, (start_timecode, end_timecode, text) in enumerate(
+            zip(start_timecodes, end_timecodes, snapshot.texts[offset:stop]), start=offset + 1
+        ):
+            yield {"id": index, "startTimecode": start_timecode, "endTimecode": end_timecode, "text": text}
+
+
+def iter_subtitles_json(snapshot: TrackSnapshot) -> Iterator[str]:
+    """Yields the `SuccessResponse` JSON document of a snapshot piece by piece."""
+    yield f'{{"status":"success","frameRate":{_dumps(snapshot.frame_rate)},"data":['
+    for position, cue in enumerate(iter_snapshot_cues(snapshot)):
+        yield _dumps(cue) if position == 0 else "," + _dumps(cue)
+    yield "]}"
+
+
+def iter_subtitles_ndjson(snapshot: TrackSnapshot) -> Iterator[str]:
+    """
+    Yields newline-delimited JSON: a header line with the status, frame rate and cue
+    count, followed by one line per cue.
+    """
+    yield _dumps({"status": "success", "frameRate": snapshot.frame_rate, "count": len(snapshot)}) + "\n"
+    for cue in iter_snapshot_cues(snapshot):
+        yield _dumps(cue) + "\n"
@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from export_jobs import ExportJobQueue, JobQueueFull
+
+PHASES = ("prepare", "write", "import", "append")
+
+
+class InlineExecutor:
+    """Stands in for the Resolve executor by running jobs on the calling thread."""
+
+    def call(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+
+def _export(order, gate=None):
+    def run(name, progress):
+        for phase in PHASES:
+            if not progress(phase):
+                return "error", {"code": "export_cancelled", "message": "cancelled"}
+            if gate is not None and phase == "write":
+                gate.wait(5)
+        order.append(name)
+        return "success", {"message": name}
+    return run
+
+
+def _wait_done(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return job.to_dict()
+
+
+def test_jobs_run_in_order_and_report_phase_timings():
+    """Tests that jobs run one at a time in submission order and finish with per-phase timings."""
+    jobs = ExportJobQueue(executor=InlineExecutor())
+    order = []
+    submitted = [jobs.submit("export", PHASES, PHASES[2:], _export(order), f"job {n}") for n in range(3)]
+
+    results = [_wait_done(job) for job in submitted]
+
+    assert order == ["job 0", "job 1", "job 2"]
+    assert [result["state"] for result in results] == ["succeeded"] * 3
+    assert results[0]["progress"] == 1.0
+    assert results[0]["result"] == {"message": "job 0"}
+    assert set(results[0]["timings"]) == {"queued", *PHASES, "total"}
+    assert all(job._fn is job._args is job._kwargs is None for job in submitted)
+    assert [job["id"] for job in jobs.list()] == [job.id for job in reversed(submitted)]
+
+
+def test_cancel_before_and_after_the_mutating_phase():
+    """Tests that queued and running jobs can be cancelled until they start changing the project."""
+    jobs = ExportJobQueue(executor=InlineExecutor())
+    order = []
+    gate = threading.Event()
+    running = jobs.submit("export", PHASES, PHASES[2:], _export(order, gate), "running")
+    queued = jobs.submit("export", PHASES, PHASES[2:], _export(order), "queued")
+    while running.to_dict()["phase"] != "write":
+        time.sleep(0.005)
+
+    assert queued.cancel() and queued.to_dict()["state"] == "cancelled"
+    assert queued._args is None
+    assert running.to_dict()["cancellable"] is True
+    assert running.cancel()
+    gate.set()
+
+    assert _wait_done(running)["state"] == "cancelled"
+    assert order == []
+
+    committed = jobs.submit("export", PHASES, PHASES[2:], _export(order), "committed")
+    assert _wait_done(committed)["state"] == "succeeded"
+    assert committed.cancel() is False
+
+
+def test_pending_jobs_and_history_are_bounded():
+    """Tests that submissions beyond max_pending are rejected and old finished jobs are forgotten."""
+    gate = threading.Event()
+    jobs = ExportJobQueue(max_pending=2, max_history=2, executor=InlineExecutor())
+    order = []
+    first = jobs.submit("export", PHASES, PHASES[2:], _export(order, gate), "first")
+    while first.to_dict()["state"] != "running":
+        time.sleep(0.005)
+    waiting = [jobs.submit("export", PHASES, PHASES[2:], _export(order), f"waiting {n}") for n in range(2)]
+    with pytest.raises(JobQueueFull):
+        jobs.submit("export", PHASES, PHASES[2:], _export(order), "rejected")
+
+    gate.set()
+    for job in waiting:
+        _wait_done(job)
+    last = jobs.submit("export", PHASES, PHASES[2:], _export(order), "last")
+    _wait_done(last)
+
+    assert jobs.get(first.id) is None
+    assert len(jobs.list()) == 2
+    assert jobs.get_stats()["rejected"] == 1
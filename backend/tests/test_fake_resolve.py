@@ -0,0 +1,156 @@
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+
+import resolve_utils
+from fake_resolve import FakeResolveConfig, build_fake_resolve, set_fake_resolve
+from resolve_session import get_session_cache
+from schemas import SubtitleExportRequest
+
+
+@pytest.fixture
+def fake_resolve():
+    """Points resolve_utils at a fresh fake Resolve with two subtitle tracks."""
+    resolve = build_fake_resolve(FakeResolveConfig(cue_count=20000, track_count=2))
+    set_fake_resolve(resolve)
+    get_session_cache().invalidate()
+    with patch.object(resolve_utils, 'RESOLVE_BACKEND', 'fake'), patch.object(resolve_utils, '_resolve_connection', None):
+        yield resolve
+    set_fake_resolve(None)
+    get_session_cache().invalidate()
+
+
+def test_extracts_large_track(fake_resolve):
+    """Tests the real extraction path over a 20k-item track."""
+    status, result = resolve_utils.get_resolve_subtitles(track_index=2)
+
+    assert status == "success"
+    assert result["frameRate"] == 24.0
+    assert len(result["data"]) == 20000
+    assert result["data"][0] == {"id": 1, "startTimecode": "01:00:00:00", "endTimecode": "01:00:01:12", "text": "Track 2 line 1"}
+    assert fake_resolve.backend.calls["GetItemListInTrack"] == 1
+
+
+def test_lists_tracks_and_project_info(fake_resolve):
+    status, tracks = resolve_utils.get_subtitle_tracks()
+    assert status == "success"
+    assert [(track.track_index, track.track_name) for track in tracks["data"]] == [(1, "Subtitle 1"), (2, "Subtitle 2")]
+    assert resolve_utils.get_resolve_project_info() == ("success", {"projectName": "Fake Project", "timelineName": "Fake Timeline"})
+
+
+def test_export_appends_new_track_and_reuses_imported_media(fake_resolve):
+    """Tests that an export lands on a new, isolated track and identical content is imported only once."""
+    request = SubtitleExportRequest(frameRate=24.0, subtitles=[
+        {"id": 1, "startTimecode": "01:00:10:00", "endTimecode": "01:00:12:00", "diffs": [{"type": "normal", "value": "Hello"}]},
+        {"id": 2, "startTimecode": "01:00:13:00", "endTimecode": "01:00:14:12", "diffs": [{"type": "normal", "value": "World"}]},
+    ])
+
+    assert resolve_utils.export_to_davinci(request)[0] == "success"
+    assert resolve_utils.export_to_davinci(request)[0] == "success"
+
+    timeline = fake_resolve.project_manager.current_project.current_timeline
+    assert timeline.GetTrackCount("subtitle") == 4
+    items = timeline.GetItemListInTrack("subtitle", 3)
+    assert [(item.GetStart(), item.GetEnd(), item.GetName()) for item in items] == [(86640, 86688, "Hello"), (86712, 86748, "World")]
+    assert timeline.GetCurrentTimecode() == "01:00:10:00"
+    # The other tracks get their original state back; the new tracks stay enabled.
+    assert [timeline.GetIsTrackEnabled("subtitle", index) for index in range(1, 5)] == [True, True, True, True]
+    assert fake_resolve.backend.calls["ImportMedia"] == 1
+
+
+def test_injected_failure_reconnects(fake_resolve):
+    """Tests that a failing call on a cached connection is retried over a new connection."""
+    assert resolve_utils.get_resolve_project_info()[0] == "success"
+    fake_resolve.backend.inject_failure("GetCurrentProject")
+
+    status, result = resolve_utils.get_resolve_project_info()
+
+    assert status == "success"
+    assert result["projectName"] == "Fake Project"
+
+
+def test_resolve_quitting_is_reported(fake_resolve):
+    assert resolve_utils.get_resolve_project_info()[0] == "success"
+    fake_resolve.backend.running = False
+
+    status, result = resolve_utils.get_resolve_project_info()
+
+    assert (status, result["code"]) == ("error", "resolve_not_running")
+
+
+def test_health_check_measures_latency():
+    resolve = build_fake_resolve(FakeResolveConfig(cue_count=0, latency_ms=2.0))
+    set_fake_resolve(resolve)
+    try:
+        with patch.object(resolve_utils, 'RESOLVE_BACKEND', 'fake'), patch.object(resolve_utils, '_resolve_connection', None):
+            status, first = resolve_utils.check_resolve_connection()
+            status, second = resolve_utils.check_resolve_connection()
+    finally:
+        set_fake_resolve(None)
+    assert status == "success"
+    assert first["reconnected"] is True and second["reconnected"] is False
+    assert second["rtt_ms"] >= 2.0
+
+
+def test_subtitles_endpoint_end_to_end(fake_resolve):
+    """Tests the HTTP API against the fake, through the Resolve executor and response cache."""
+    from main import app
+    client = TestClient(app)
+
+    first = client.get("/api/v1/subtitles?track_index=1")
+    second = client.get("/api/v1/subtitles?track_index=1", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert len(first.json()["data"]) == 20000
+    assert second.status_code == 304
+
+
+def test_probe_reads_tracks_in_full_only_when_needed(fake_resolve):
+    """Tests that the watcher probe fingerprints changed, rescanned and fully scanned tracks, and costs a few calls otherwise."""
+    status, first = resolve_utils.probe_timeline_state(full_scan=True)
+    assert status == "success"
+    assert (first["projectName"], first["timelineName"]) == ("Fake Project", "Fake Timeline")
+    assert [track["signature"][0] for track in first["tracks"]] == [20000, 20000]
+    known = {track["track_index"]: track["signature"] for track in first["tracks"]}
+
+    timeline = fake_resolve.project_manager.current_project.current_timeline
+    timeline.GetItemListInTrack("subtitle", 1)[5]._name = "Edited"
+    fake_resolve.backend.reset_calls()
+    status, cheap = resolve_utils.probe_timeline_state(known)
+    assert [track["fingerprint"] for track in cheap["tracks"]] == [None, None]
+    assert sum(fake_resolve.backend.calls.values()) < 20
+
+    status, rescanned = resolve_utils.probe_timeline_state(known, rescan_tracks=(1,))
+    assert rescanned["tracks"][0]["fingerprint"] != first["tracks"][0]["fingerprint"]
+    assert rescanned["tracks"][1]["fingerprint"] is None
+
+    status, full = resolve_utils.probe_timeline_state(known, full_scan=True)
+    assert full["tracks"][0]["fingerprint"] == rescanned["tracks"][0]["fingerprint"]
+    assert full["tracks"][1]["fingerprint"] == first["tracks"][1]["fingerprint"]
+
+
+def test_background_export_job_end_to_end(fake_resolve):
+    """Tests that a background export returns a job at once and reports its phases until it succeeds."""
+    import time
+    from main import app
+    client = TestClient(app)
+    payload = {"frameRate": 24.0, "subtitles": [
+        {"id": 1, "startTimecode": "01:00:10:00", "endTimecode": "01:00:12:00", "diffs": [{"type": "normal", "value": "Hello"}]}]}
+
+    accepted = client.post("/api/v1/export/davinci?background=true", json=payload)
+    assert accepted.status_code == 202
+    job_url = accepted.headers["location"]
+    deadline = time.monotonic() + 5
+    while (job := client.get(job_url).json()["data"])["state"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert job["state"] == "succeeded"
+    assert job["result"]["track_index"] == 3 and job["result"]["cue_count"] == 1
+    assert set(job["timings"]) == {"queued", "prepare", "write", "import", "append", "total"}
+    assert client.post(f"{job_url}/cancel").status_code == 409
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
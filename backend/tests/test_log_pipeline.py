@@ -0,0 +1,87 @@
+import logging
+import queue
+import threading
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import log_pipeline
+from log_pipeline import SAMPLED, NonBlockingQueueHandler, RingBufferHandler, SamplingFilter
+
+
+def _record(msg, *args, sampled=True, level=logging.INFO):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    if sampled:
+        record.sampled = True
+    return record
+
+
+def test_sampling_filter_limits_each_template_and_reports_skipped():
+    """Tests that sampled records pass `burst` times per window and the next window notes how many were skipped."""
+    sampling = SamplingFilter(burst=2, interval=60.0)
+    with patch("log_pipeline.time.monotonic", return_value=100.0):
+        passed = [sampling.filter(_record("提取完成: %s 条", n)) for n in range(5)]
+        assert sampling.filter(_record("其他消息"))
+        assert sampling.filter(_record("提取完成: %s 条", 9, sampled=False))
+    assert passed == [True, True, False, False, False]
+    assert sampling.suppressed == 3
+
+    record = _record("提取完成: %s 条", 7)
+    with patch("log_pipeline.time.monotonic", return_value=161.0):
+        assert sampling.filter(record)
+    assert record.getMessage() == "提取完成: 7 条（此前 60 秒内省略了 3 条相同日志）"
+
+
+def test_non_blocking_queue_handler_drops_when_full():
+    """Tests that a full log queue drops records instead of blocking the caller."""
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    for n in range(5):
+        handler.handle(_record("message %s", n, sampled=False))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_ring_buffer_keeps_last_entries_and_filters_by_level():
+    """Tests that the ring buffer keeps only the newest records and filters them by level and limit."""
+    ring = RingBufferHandler(capacity=3)
+    for n, level in enumerate([logging.INFO, logging.WARNING, logging.INFO, logging.ERROR]):
+        ring.handle(_record("entry %s", n, sampled=False, level=level))
+
+    assert [entry["message"] for entry in ring.get_entries()] == ["entry 1", "entry 2", "entry 3"]
+    assert [entry["message"] for entry in ring.get_entries(min_level=logging.WARNING)] == ["entry 1", "entry 3"]
+    assert [entry["message"] for entry in ring.get_entries(limit=1)] == ["entry 3"]
+    assert ring.get_entries(limit=0) == []
+
+
+def test_configure_logging_writes_through_background_listener(tmp_path):
+    """Tests that records reach the rotating file and the ring buffer from the listener thread, not the caller."""
+    root = logging.getLogger()
+    log_pipeline.get_log_ring_buffer().clear()
+    with patch.object(root, "handlers", []), patch.object(root, "level", root.level):
+        try:
+            _log_through_pipeline(root, tmp_path / "resolve.log")
+        finally:
+            log_pipeline.shutdown_logging()
+    log_pipeline.get_log_ring_buffer().clear()
+
+
+def _log_through_pipeline(root, log_path):
+    log_pipeline.configure_logging(file_path=str(log_path))
+    log_pipeline.configure_logging(file_path=str(log_path))
+    assert len(root.handlers) == 1
+
+    emitting_threads = []
+    original_emit = RingBufferHandler.emit
+    with patch.object(RingBufferHandler, "emit", lambda self, record: emitting_threads.append(threading.current_thread()) or original_emit(self, record)):
+        logging.info("使用缓存的 DaVinci Resolve 连接。", extra=SAMPLED)
+        logging.warning("连接检查失败: %s", "down")
+        log_pipeline.shutdown_logging()
+
+    assert emitting_threads and threading.main_thread() not in emitting_threads
+    entries = log_pipeline.get_log_ring_buffer().get_entries()
+    assert [(entry["level"], entry["message"]) for entry in entries] == [
+        ("INFO", "使用缓存的 DaVinci Resolve 连接。"), ("WARNING", "连接检查失败: down")]
+    assert "WARNING - 连接检查失败: down" in log_path.read_text(encoding="utf-8")
+    assert root.handlers == []
@@ -1,3 +1,5 @@
+import logging
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
@@ -88,6 +90,457 @@ class TestMainAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 503)
         self.assertEqual(response.json()['detail']['code'], "resolve_not_running")
 
+    @patch('main.get_resolve_subtitles')
+    def test_get_subtitles_reports_server_timing(self, mock_get_subtitles):
+        """Phase timings from the extraction are exposed as a Server-Timing header."""
+        # Arrange
+        mock_data = [{"id": 1, "startTimecode": "01:00:00:00", "endTimecode": "01:00:01:00", "text": "Hi"}]
+        mock_get_subtitles.return_value = ("success", {
+            "frameRate": 24.0,
+            "data": mock_data,
+            "timings": {"ipc": 12.5, "format": 0.4, "serialize": 0.1},
+        })
+
+        # Act
+        response = self.client.get("/api/v1/subtitles?track_index=2")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "success", "frameRate": 24.0, "data": mock_data})
+        self.assertEqual(response.headers["server-timing"], "ipc;dur=12.5, format;dur=0.4, serialize;dur=0.1")
+        mock_get_subtitles.assert_called_once_with(track_index=2)
+
+    @patch('main.get_resolve_executor')
+    def test_resolve_busy_returns_503(self, mock_get_executor):
+        """Test that a full Resolve job queue is reported as 503 resolve_busy."""
+        # Arrange
+        from resolve_executor import ResolveExecutorBusy
+        mock_get_executor.return_value.run.side_effect = ResolveExecutorBusy("queue full")
+
+        # Act
+        response = self.client.get("/api/v1/subtitles")
+
+        # Assert
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['detail']['code'], "resolve_busy")
+
+    @patch('main.get_resolve_subtitles')
+    def test_get_subtitles_etag_and_not_modified(self, mock_get_subtitles):
+        """Test that subtitle responses carry an ETag and honour If-None-Match."""
+        # Arrange
+        mock_data = [{"id": 1, "startTimecode": "01:00:00:00", "endTimecode": "01:00:01:00", "text": "你好"}]
+        mock_get_subtitles.return_value = ("success", {
+            "frameRate": 24.0,
+            "data": mock_data,
+            "timings": {"ipc": 1.0},
+            "fingerprint": "abc123",
+        })
+
+        # Act
+        first = self.client.get("/api/v1/subtitles?track_index=1")
+        second = self.client.get("/api/v1/subtitles?track_index=1")
+        not_modified = self.client.get("/api/v1/subtitles?track_index=1", headers={"If-None-Match": '"abc123"'})
+        changed = self.client.get("/api/v1/subtitles?track_index=1", headers={"If-None-Match": '"stale"'})
+
+        # Assert
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["etag"], '"abc123"')
+        self.assertEqual(first.json(), {"status": "success", "frameRate": 24.0, "data": mock_data})
+        self.assertIn("encode;dur=", first.headers["server-timing"])
+        self.assertEqual(second.content, first.content)
+        self.assertNotIn("encode;dur=", second.headers["server-timing"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified.headers["etag"], '"abc123"')
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()["data"], mock_data)
+
+    @patch('main.get_resolve_subtitle_changes')
+    def test_get_subtitle_changes_success(self, mock_get_changes):
+        """Test the delta sync endpoint returns only changed cues and a new token."""
+        # Arrange
+        added = [{"key": "48:abcd", "id": 2, "startTimecode": "00:00:02:00", "endTimecode": "00:00:02:12", "text": "B"}]
+        mock_get_changes.return_value = ("success", {
+            "frameRate": 24.0, "token": "v2", "since": "v1", "count": 2,
+            "reset": False, "added": added, "removed": [], "retimed": [],
+            "timings": {"ipc": 1.0, "diff": 0.1},
+        })
+
+        # Act
+        response = self.client.get("/api/v1/subtitles/changes?track_index=1&since=v1")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["token"], "v2")
+        self.assertEqual(body["added"][0]["key"], "48:abcd")
+        self.assertEqual(body["removed"], [])
+        self.assertIn("diff;dur=0.1", response.headers["server-timing"])
+        mock_get_changes.assert_called_once_with(track_index=1, since="v1")
+
+    def test_export_srt_streams_generated_content(self):
+        """Test that the streamed SRT export matches generate_srt_content byte for byte."""
+        # Arrange
+        from resolve_utils import generate_srt_content
+        from schemas import SubtitleExportRequest
+        request_data = {
+            "frameRate": 24.0,
+            "subtitles": [
+                {"id": i, "startTimecode": f"00:00:{i:02d}:00", "endTimecode": f"00:00:{i:02d}:12",
+                 "diffs": [{"type": "normal", "value": f"第 {i} 行"}, {"type": "removed", "value": "x"}]}
+                for i in range(1, 40)
+            ],
+        }
+
+        # Act
+        response = self.client.post("/api/v1/export/srt", json=request_data)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['content-type'], 'text/plain; charset=utf-8')
+        self.assertEqual(response.text, generate_srt_content(SubtitleExportRequest(**request_data)))
+
+    @patch('main.get_resolve_track_snapshot')
+    def test_get_subtitles_ndjson_stream(self, mock_get_snapshot):
+        """Test that format=ndjson streams a header line followed by one line per cue."""
+        # Arrange
+        import json
+        from track_snapshots import TrackSnapshot
+        snapshot = TrackSnapshot(24.0, "fp", [0, 48], [24, 72], ["A", "B"])
+        mock_get_snapshot.return_value = ("success", {"snapshot": snapshot, "timings": {"ipc": 1.0}})
+
+        # Act
+        response = self.client.get("/api/v1/subtitles?track_index=1&format=ndjson")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        self.assertEqual(response.headers["etag"], '"fp"')
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[0], {"status": "success", "frameRate": 24.0, "count": 2})
+        self.assertEqual(lines[2], {"id": 2, "startTimecode": "00:00:02:00", "endTimecode": "00:00:03:00", "text": "B"})
+
+    @patch('main.get_resolve_all_subtitles')
+    def test_get_all_subtitles_with_track_filter(self, mock_get_all):
+        """Test that all tracks are returned in one response and the filter is passed through."""
+        # Arrange
+        tracks = [{"track_index": 2, "track_name": "English", "fingerprint": "fp2", "data": []}]
+        mock_get_all.return_value = ("success", {"frameRate": 25.0, "tracks": tracks, "timings": {"extract": 3.0}})
+
+        # Act
+        response = self.client.get("/api/v1/subtitles/all?track=2")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "success", "frameRate": 25.0, "tracks": tracks})
+        mock_get_all.assert_called_once_with([2])
+
+    @patch('main.get_resolve_all_subtitles')
+    def test_get_all_subtitles_reuses_encoded_body(self, mock_get_all):
+        """Test that an unchanged set of tracks is served from the encoded response cache."""
+        # Arrange
+        import main
+        main._subtitle_responses.clear()
+        tracks = [{"track_index": 1, "track_name": "A", "fingerprint": "fpA", "data": []}]
+        mock_get_all.return_value = ("success", {"frameRate": 24.0, "tracks": tracks, "timings": {"extract": 1.0}})
+
+        # Act
+        first = self.client.get("/api/v1/subtitles/all")
+        second = self.client.get("/api/v1/subtitles/all")
+
+        # Assert
+        self.assertEqual(first.content, second.content)
+        self.assertIn("encode;dur=", first.headers["server-timing"])
+        self.assertNotIn("encode;dur=", second.headers["server-timing"])
+        stats = self.client.get("/api/v1/diagnostics/response-cache").json()["data"]
+        self.assertEqual(stats["hits"], 1)
+
+    @patch('main.read_resolve_track')
+    @patch('main.get_resolve_subtitle_track_plan')
+    def test_get_all_subtitles_streamed_track_by_track(self, mock_plan, mock_read_track):
+        """Test that stream=true sends a header line and then one line per track."""
+        # Arrange
+        import json
+        mock_plan.return_value = ("success", {"timeline": MagicMock(), "frameRate": 24.0, "tracks": [(1, "A"), (2, "B")]})
+        mock_read_track.side_effect = lambda timeline, frame_rate, index, name: (
+            "success", {"track_index": index, "track_name": name, "fingerprint": f"fp{index}", "data": []})
+
+        # Act
+        response = self.client.get("/api/v1/subtitles/all?stream=true")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(lines[0], {"status": "success", "frameRate": 24.0, "trackCount": 2})
+        self.assertEqual([line["track_name"] for line in lines[1:]], ["A", "B"])
+        mock_plan.assert_called_once_with(None)
+
+    def test_export_srt_from_columnar_payload(self):
+        """Test that a columnar payload exports the same SRT as the cue-based request."""
+        # Arrange
+        import json
+        columns = {"frameRate": 24.0, "startFrames": [24], "endFrames": [48], "texts": ["Hello"]}
+
+        # Act
+        response = self.client.post(
+            "/api/v1/export/srt",
+            content=json.dumps(columns),
+            headers={"Content-Type": "application/vnd.subtitle-columns+json"},
+        )
+        invalid = self.client.post(
+            "/api/v1/export/srt",
+            content=json.dumps({**columns, "endFrames": [48, 72]}),
+            headers={"Content-Type": "application/vnd.subtitle-columns+json"},
+        )
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "1\n00:00:01,000 --> 00:00:02,000\nHello")
+        self.assertEqual(invalid.status_code, 422)
+
+    @patch('main.get_resolve_track_snapshot')
+    def test_get_subtitles_columnar(self, mock_get_snapshot):
+        """Test that format=columnar returns parallel frame and text arrays."""
+        # Arrange
+        from track_snapshots import TrackSnapshot
+        snapshot = TrackSnapshot(24.0, "fp-columns", [0, 48], [24, 72], ["A", "B"])
+        mock_get_snapshot.return_value = ("success", {"snapshot": snapshot, "timings": {"ipc": 1.0}, "track_key": ("p", "t", 1)})
+
+        # Act
+        response = self.client.get("/api/v1/subtitles?track_index=1&format=columnar")
+        not_modified = self.client.get("/api/v1/subtitles?track_index=1&format=columnar", headers={"If-None-Match": '"fp-columns"'})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/vnd.subtitle-columns+json")
+        self.assertEqual(response.json()["startFrames"], [0, 48])
+        self.assertEqual(response.json()["texts"], ["A", "B"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_export_vtt_and_unsupported_format(self):
+        """Test that registered formats are exported and unknown formats are rejected."""
+        # Arrange
+        request_data = {
+            "frameRate": 24.0,
+            "subtitles": [{"id": 1, "startTimecode": "00:00:01:00", "endTimecode": "00:00:02:12",
+                           "diffs": [{"type": "normal", "value": "Hello"}]}]
+        }
+
+        # Act
+        response = self.client.post("/api/v1/export/vtt", json=request_data)
+        unsupported = self.client.post("/api/v1/export/docx", json=request_data)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/vtt"))
+        self.assertEqual(response.text, "WEBVTT\n\n00:00:01.000 --> 00:00:02.500\nHello\n")
+        self.assertEqual(unsupported.status_code, 400)
+        self.assertEqual(unsupported.json()["detail"]["code"], "unsupported_export_format")
+
+    def test_export_bundle_contains_requested_formats(self):
+        """Test that the bundle endpoint zips one file per requested format."""
+        # Arrange
+        import io
+        import zipfile
+        request_data = {
+            "frameRate": 24.0,
+            "subtitles": [{"id": 1, "startTimecode": "00:00:01:00", "endTimecode": "00:00:02:00",
+                           "diffs": [{"type": "normal", "value": "Hello"}]}]
+        }
+
+        # Act
+        response = self.client.post("/api/v1/export/bundle?formats=srt&formats=sbv", json=request_data)
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        self.assertEqual(archive.namelist(), ["subtitles.srt", "subtitles.sbv"])
+        self.assertEqual(archive.read("subtitles.srt").decode(), "1\n00:00:01,000 --> 00:00:02,000\nHello")
+
+    @patch('main.export_compiled_to_davinci')
+    def test_import_subtitles_pages_and_exports_upload(self, mock_export):
+        """Test that an uploaded SRT is parsed, paged by upload id and exported without re-uploading."""
+        # Arrange
+        mock_export.return_value = ("success", {"message": "ok"})
+        body = "".join(f"{i}\r\n00:00:{i:02d},000 --> 00:00:{i:02d},500\r\nLine {i}\r\n\r\n" for i in range(1, 4)).encode("utf-8")
+
+        # Act
+        response = self.client.post("/api/v1/import/subtitles?page_size=2", content=body)
+        upload_id = response.json()["uploadId"]
+        second_page = self.client.get(f"/api/v1/import/subtitles/{upload_id}?page=2&page_size=2")
+        exported = self.client.post(f"/api/v1/import/subtitles/{upload_id}/davinci")
+        missing = self.client.get("/api/v1/import/subtitles/unknown")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 3)
+        self.assertEqual(len(response.json()["cues"]), 2)
+        self.assertEqual(second_page.json()["cues"], [
+            {"id": 3, "startTimecode": "00:00:03.000", "endTimecode": "00:00:03.500", "text": "Line 3"}])
+        self.assertEqual(exported.status_code, 200)
+        compiled = mock_export.call_args.args[0](24.0, 86400)
+        self.assertEqual(compiled.start_frames, [24, 48, 72])
+        self.assertEqual(missing.status_code, 404)
+
+    @patch('main.get_resolve_track_snapshot')
+    def test_search_and_replace_endpoints(self, mock_get_snapshot):
+        """Test paged search results and bulk replace diffs over the extracted track."""
+        # Arrange
+        from track_snapshots import TrackSnapshot
+        snapshot = TrackSnapshot(24.0, "fp-search", [0, 48, 96], [24, 72, 120], ["colour one", "two", "Colour three"])
+        mock_get_snapshot.return_value = ("success", {"snapshot": snapshot, "timings": {}, "track_key": ("p", "t", 9)})
+
+        # Act
+        search = self.client.get("/api/v1/search?q=colour&track_index=9&page_size=1")
+        replace = self.client.post("/api/v1/search/replace", json={"track_index": 9, "query": "colour", "replacement": "color"})
+        invalid = self.client.get("/api/v1/search?q=(&regex=true")
+
+        # Assert
+        self.assertEqual(search.status_code, 200)
+        self.assertEqual(search.json()["totalCues"], 2)
+        self.assertEqual(search.json()["results"][0]["matches"], [[0, 6]])
+        self.assertEqual([cue["text"] for cue in replace.json()["cues"]], ["color one", "color three"])
+        self.assertIn({"type": "removed", "value": "u"}, replace.json()["cues"][0]["diffs"])
+        self.assertEqual(invalid.status_code, 400)
+
+    def test_diff_endpoint_and_text_only_export(self):
+        """Test batched diffs and that exports accept final text instead of diffs."""
+        # Act
+        diff = self.client.post("/api/v1/diff", json={"granularity": "word", "items": [
+            {"id": 7, "original": "the quick fox", "edited": "the slow fox"}]})
+        export = self.client.post("/api/v1/export/srt", json={"frameRate": 24.0, "subtitles": [
+            {"id": 1, "startTimecode": "00:00:01:00", "endTimecode": "00:00:02:00", "text": "Final text"}]})
+
+        # Assert
+        self.assertEqual(diff.status_code, 200)
+        self.assertEqual(diff.json()["items"][0]["id"], 7)
+        self.assertEqual(diff.json()["items"][0]["diffs"][1], {"type": "removed", "value": "quick"})
+        self.assertEqual(export.text, "1\n00:00:01,000 --> 00:00:02,000\nFinal text")
+
+    @patch('main.configure_logging')
+    @patch('main.check_resolve_connection')
+    @patch('main.prewarm_resolve_connection')
+    def test_startup_prewarms_resolve_connection(self, mock_prewarm, mock_check, mock_configure_logging):
+        """Test that the lifespan hook configures logging, pre-warms the connection and starts the keeper."""
+        # Arrange
+        import threading
+        prewarmed = threading.Event()
+        checked = threading.Event()
+        mock_prewarm.side_effect = lambda: prewarmed.set() or ("success", {"timings": {"connect": 1.0}})
+        mock_check.side_effect = lambda: checked.set() or ("success", {"rtt_ms": 2.0, "reconnected": False})
+
+        # Act
+        with TestClient(app) as client:
+            self.assertTrue(prewarmed.wait(5))
+            self.assertTrue(checked.wait(5))
+            stats = client.get("/api/v1/diagnostics/resolve-connection").json()["data"]
+
+        # Assert
+        mock_configure_logging.assert_called_once()
+        mock_prewarm.assert_called_once()
+        self.assertTrue(stats["running"])
+        self.assertEqual(stats["state"], "connected")
+
+    @patch('main.get_resolve_project_info')
+    def test_metrics_endpoint_reports_per_endpoint_latency(self, mock_project_info):
+        """Test that /metrics exposes Resolve call and request histograms labelled by endpoint."""
+        # Arrange
+        from resolve_metrics import get_metrics_registry
+
+        def project_info():
+            get_metrics_registry().observe_resolve_call("GetCurrentProject", 0.002)
+            return "success", {"projectName": "P", "timelineName": "T"}
+
+        mock_project_info.side_effect = project_info
+
+        # Act
+        self.client.get("/api/v1/project-info")
+        response = self.client.get("/metrics")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('resolve_api_call_duration_seconds_count{endpoint="/api/v1/project-info",method="GetCurrentProject"}', response.text)
+        self.assertIn('http_request_duration_seconds_count{endpoint="/api/v1/project-info",http_method="GET",status="200"}', response.text)
+
+    @patch('main.get_logging_stats')
+    @patch('main.get_log_ring_buffer')
+    def test_recent_logs_endpoint(self, mock_ring_buffer, mock_logging_stats):
+        """Test that the diagnostics endpoint serves the ring buffer filtered by level and rejects unknown levels."""
+        # Arrange
+        entry = {"time": 1.0, "level": "WARNING", "logger": "root", "message": "连接检查失败"}
+        mock_ring_buffer.return_value.get_entries.return_value = [entry]
+        mock_logging_stats.return_value = {"dropped": 0, "suppressed": 4}
+
+        # Act
+        response = self.client.get("/api/v1/diagnostics/logs?limit=50&level=warning")
+        invalid = self.client.get("/api/v1/diagnostics/logs?level=LOUD")
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], {"entries": [entry], "stats": {"dropped": 0, "suppressed": 4}})
+        mock_ring_buffer.return_value.get_entries.assert_called_once_with(50, logging.WARNING)
+        self.assertEqual(invalid.status_code, 400)
+        self.assertEqual(invalid.json()["detail"]["code"], "invalid_log_level")
+
+    @patch('main.set_resolve_playhead')
+    def test_navigate_reports_jump_latency(self, mock_set_playhead):
+        """Test that the navigation endpoint forwards the target and reports the end-to-end latency."""
+        # Arrange
+        mock_set_playhead.return_value = ("success", {"timecode": "01:00:03:02", "timings": {"resolve": 0.1}})
+
+        # Act
+        response = self.client.post("/api/v1/timeline/navigate", json={"cue_id": 2, "jump_to": "middle"})
+        both = self.client.post("/api/v1/timeline/navigate", json={"cue_id": 2, "frame": 10})
+        mock_set_playhead.return_value = ("error", {"code": "cue_not_found", "message": "missing"})
+        missing = self.client.post("/api/v1/timeline/navigate", json={"cue_id": 99})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "success")
+        self.assertEqual(response.json()["timecode"], "01:00:03:02")
+        self.assertEqual(set(response.json()["latency_ms"]), {"queued", "resolve", "total"})
+        self.assertIn("total;dur=", response.headers["server-timing"])
+        mock_set_playhead.assert_any_call(timecode=None, frame=None, cue_id=2, track_index=1, jump_to="middle")
+        self.assertEqual(both.status_code, 422)
+        self.assertEqual(missing.status_code, 404)
+
+    @patch('main.configure_logging')
+    @patch('main.check_resolve_connection')
+    @patch('main.prewarm_resolve_connection')
+    @patch('main.probe_timeline_state')
+    def test_websocket_pushes_timeline_changes(self, mock_probe, mock_prewarm, mock_check, mock_configure_logging):
+        """Test that /ws clients share one watcher, receive change events from its probes and can ask for a track rescan."""
+        # Arrange
+        import timeline_watcher
+        mock_prewarm.return_value = ("success", {"timings": {"connect": 1.0}})
+        mock_check.return_value = ("success", {"rtt_ms": 1.0, "reconnected": False})
+        mock_probe.return_value = ("success", {
+            "projectId": "p1", "projectName": "Project", "timelineId": "t1", "timelineName": "Timeline",
+            "frameRate": 24.0, "tracks": [{"track_index": 1, "track_name": "Subtitle 1", "signature": [1, 0, 24], "fingerprint": "fp1"}],
+        })
+
+        # Act
+        with patch.object(timeline_watcher, '_timeline_watcher', timeline_watcher.TimelineWatcher(interval=60)):
+            with TestClient(app) as client:
+                with client.websocket_connect("/ws") as first, client.websocket_connect("/ws") as second:
+                    first_events = [first.receive_json() for _ in range(3)]
+                    second_hello = second.receive_json()
+                    first.send_json({"type": "rescan", "track_index": 1})
+                    deadline = time.monotonic() + 5
+                    while mock_probe.call_count < 2 and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                stats = client.get("/api/v1/diagnostics/timeline-watcher").json()["data"]
+
+        # Assert
+        self.assertEqual([event["type"] for event in first_events], ["hello", "project_changed", "tracks_changed"])
+        self.assertEqual(first_events[1]["projectName"], "Project")
+        self.assertEqual(second_hello["type"], "hello")
+        self.assertEqual(mock_probe.call_args_list[0].args, ({}, True, ()))
+        self.assertEqual(mock_probe.call_args_list[1].args, ({1: [1, 0, 24]}, False, (1,)))
+        self.assertEqual(stats["subscribers"], 0)
+
+
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
 
@@ -138,12 +591,12 @@ if __name__ == '__main__':
         self.assertEqual(response.json()['detail']['code'], "no_active_timeline")
         mock_get_tracks.assert_called_once()
 
-    @patch('main.generate_srt_content')
-    def test_export_subtitles_as_srt_success(self, mock_generate_srt_content):
+    @patch('main.iter_srt_content')
+    def test_export_subtitles_as_srt_success(self, mock_iter_srt_content):
         """Test successfully exporting subtitles as SRT."""
         # Arrange
         mock_srt_content = "1\n00:00:01,000 --> 00:00:04,000\nHello, world!"
-        mock_generate_srt_content.return_value = mock_srt_content
+        mock_iter_srt_content.return_value = iter([mock_srt_content])
         
         request_data = {
             "frameRate": 24.0,
@@ -166,7 +619,7 @@ if __name__ == '__main__':
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.text, mock_srt_content)
         self.assertEqual(response.headers['content-type'], 'text/plain; charset=utf-8')
-        mock_generate_srt_content.assert_called_once()
+        mock_iter_srt_content.assert_called_once()
 
     @patch('main.export_to_davinci')
     def test_export_subtitles_to_davinci_success(self, mock_export_to_davinci):
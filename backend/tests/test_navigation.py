@@ -0,0 +1,76 @@
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from navigation import NavigationChannel
+
+
+def _recording_jump(sent, target, delay=0.01, status="success"):
+    async def call():
+        sent.append(target)
+        await asyncio.sleep(delay)
+        return status, {"timecode": target}
+    return call
+
+
+def test_jumps_arriving_while_one_is_in_flight_are_latest_wins():
+    """Tests that only the newest of the jumps queued behind an in-flight jump is sent."""
+    channel = NavigationChannel(debounce=0.0)
+    sent = []
+
+    async def scenario():
+        first = asyncio.ensure_future(channel.jump(_recording_jump(sent, "01:00:00:00")))
+        await asyncio.sleep(0)
+        rest = [asyncio.ensure_future(channel.jump(_recording_jump(sent, f"01:00:0{n}:00"))) for n in range(1, 6)]
+        return await asyncio.gather(first, *rest)
+
+    results = asyncio.run(scenario())
+
+    assert sent == ["01:00:00:00", "01:00:05:00"]
+    assert [status for status, _ in results] == ["success"] + ["superseded"] * 4 + ["success"]
+    assert results[1][1]["code"] == "superseded"
+    assert set(results[-1][1]["latency_ms"]) == {"queued", "resolve", "total"}
+    assert results[-1][1]["latency_ms"]["queued"] >= 5
+    stats = channel.get_stats()
+    assert (stats["submitted"], stats["sent"], stats["superseded"], stats["failed"]) == (6, 2, 4, 0)
+    assert stats["pending"] is False
+
+
+def test_jumps_within_the_debounce_window_settle_on_the_latest():
+    """Tests that jumps following the previous one within the debounce window wait for it and collapse."""
+    channel = NavigationChannel(debounce=0.05)
+    sent = []
+
+    async def scenario():
+        await channel.jump(_recording_jump(sent, "first", delay=0))
+        burst = []
+        for n in range(3):
+            burst.append(asyncio.ensure_future(channel.jump(_recording_jump(sent, f"burst {n}", delay=0))))
+            await asyncio.sleep(0.005)
+        return await asyncio.gather(*burst)
+
+    results = asyncio.run(scenario())
+
+    assert sent == ["first", "burst 2"]
+    assert [status for status, _ in results] == ["superseded", "superseded", "success"]
+
+
+def test_failed_and_raising_jumps_are_reported():
+    """Tests that errors from the jump are returned to its caller and counted."""
+    channel = NavigationChannel(debounce=0.0)
+
+    async def boom():
+        raise RuntimeError("gone")
+
+    async def scenario():
+        failed = await channel.jump(_recording_jump([], "x", delay=0, status="error"))
+        raised = await channel.jump(boom)
+        return failed, raised
+
+    (failed_status, _), (raised_status, raised) = asyncio.run(scenario())
+
+    assert failed_status == raised_status == "error"
+    assert raised["message"] == "gone"
+    assert channel.get_stats()["failed"] == 2
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from resolve_executor import ResolveExecutor, ResolveExecutorBusy
+
+
+@pytest.fixture
+def executor():
+    executor = ResolveExecutor(max_queue_size=2, name="test-resolve-executor")
+    yield executor
+    executor.shutdown()
+
+
+def test_jobs_run_in_order_on_one_thread(executor):
+    """Tests that all jobs run sequentially on the same dedicated thread."""
+    seen = []
+    futures = [executor.submit(lambda i=i: seen.append((i, threading.current_thread().name))) for i in range(2)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert [i for i, _ in seen] == [0, 1]
+    assert {name for _, name in seen} == {"test-resolve-executor"}
+    assert executor.get_stats()["completed"] == 2
+
+
+def test_full_queue_rejects_jobs(executor):
+    """Tests that the bounded queue rejects work instead of growing without limit."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait(5)
+
+    running = executor.submit(blocking_job)
+    started.wait(5)
+    queued = [executor.submit(lambda: None) for _ in range(2)]
+    with pytest.raises(ResolveExecutorBusy):
+        executor.submit(lambda: None)
+
+    release.set()
+    running.result(timeout=5)
+    for future in queued:
+        future.result(timeout=5)
+    assert executor.get_stats()["rejected"] == 1
+
+
+def test_exceptions_propagate_to_caller(executor):
+    """Tests that an exception raised on the Resolve thread reaches the awaiting caller."""
+    def failing_job():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(executor.run(failing_job))
+    assert executor.get_stats()["failed"] == 1
+
+
+def test_call_is_reentrant(executor):
+    """Tests that a job may call back into the executor without deadlocking."""
+    result = executor.call(lambda: executor.call(lambda: 42))
+    assert result == 42
+
+
+def test_jobs_run_in_the_submitters_context(executor):
+    """Tests that context variables set by the caller are visible to the job on the Resolve thread."""
+    import contextvars
+    request_id = contextvars.ContextVar("request_id", default=None)
+    token = request_id.set("req-1")
+    try:
+        assert executor.submit(request_id.get).result(timeout=5) == "req-1"
+    finally:
+        request_id.reset(token)
+    assert executor.submit(request_id.get).result(timeout=5) is None
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from resolve_health import ResolveConnectionKeeper
+
+
+def test_backoff_grows_and_resets_on_success():
+    """Tests exponential backoff after failures, capped, and the normal interval once connected."""
+    keeper = ResolveConnectionKeeper(interval=5.0, initial_backoff=0.5, max_backoff=3.0)
+    error = {"code": "resolve_not_running", "message": "down"}
+    assert [keeper.record_check("error", error) for _ in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    assert keeper.record_check("success", {"rtt_ms": 1.5, "reconnected": True}) == 5.0
+
+    stats = keeper.get_stats()
+    assert (stats["state"], stats["rtt_ms"], stats["consecutive_failures"]) == ("connected", 1.5, 0)
+    assert (stats["checks"], stats["failures"], stats["reconnects"]) == (6, 5, 1)
+
+
+def test_known_down_only_while_running():
+    """Tests that requests only fail fast while the keeper is running and has seen a failure."""
+    keeper = ResolveConnectionKeeper()
+    keeper.record_check("error", {"code": "connection_error", "message": "down"})
+    assert keeper.known_down_error() is None
+
+    keeper._running = True
+    assert keeper.known_down_error()["code"] == "resolve_not_running"
+    keeper.record_check("error", {"code": "dvr_script_not_found", "message": "no module"})
+    assert keeper.known_down_error()["code"] == "dvr_script_not_found"
+    keeper.record_check("success", {"rtt_ms": 1.0})
+    assert keeper.known_down_error() is None
+
+
+def test_run_reconnects_with_backoff_and_wakes_on_reported_failure():
+    """Tests the check loop: failures are retried after the backoff, and a reported failure triggers a check at once."""
+    keeper = ResolveConnectionKeeper(interval=60.0, initial_backoff=0.01, max_backoff=0.02)
+    outcomes = [("error", {"code": "resolve_not_running", "message": "down"})] * 2 + [("success", {"rtt_ms": 1.0, "reconnected": True})] * 10
+    calls = []
+
+    async def check():
+        calls.append(len(calls))
+        return outcomes[len(calls) - 1]
+
+    async def scenario():
+        task = asyncio.create_task(keeper.run(check))
+        while len(calls) < 3:
+            await asyncio.sleep(0.005)
+        assert keeper.get_stats()["state"] == "connected"
+        assert keeper.report_failure(RuntimeError("lost"))["code"] == "resolve_not_running"
+        while len(calls) < 4:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert not keeper.is_running
+    assert keeper.get_stats()["reported_failures"] == 1
+
+
+@patch('resolve_utils.get_connection_keeper')
+def test_requests_fail_fast_when_resolve_is_down(mock_get_keeper):
+    """Tests that requests do not try to connect while the keeper reports Resolve as down."""
+    import resolve_utils
+    keeper = ResolveConnectionKeeper()
+    keeper._running = True
+    keeper.record_check("error", {"code": "resolve_not_running", "message": "down"})
+    mock_get_keeper.return_value = keeper
+
+    with patch('resolve_utils._get_resolve_bmd') as mock_bmd:
+        status, result = resolve_utils.get_resolve_project_info()
+
+    assert (status, result["code"]) == ("error", "resolve_not_running")
+    mock_bmd.assert_not_called()
+
+
+@patch('resolve_utils.get_connection_keeper')
+def test_lost_connection_is_reported_instead_of_reconnecting_inline(mock_get_keeper):
+    """Tests that a failing Resolve call hands reconnecting to the running keeper."""
+    import resolve_utils
+    keeper = ResolveConnectionKeeper()
+    keeper._running = True
+    mock_get_keeper.return_value = keeper
+    resolve = MagicMock()
+    resolve.GetProjectManager.side_effect = RuntimeError("connection lost")
+
+    with patch.object(resolve_utils, '_resolve_connection', resolve), \
+            patch('resolve_utils._get_resolve_bmd') as mock_bmd:
+        status, result = resolve_utils.get_resolve_project_info()
+
+    assert (status, result["code"]) == ("error", "resolve_not_running")
+    assert keeper.get_stats()["state"] == "disconnected"
+    mock_bmd.assert_not_called()
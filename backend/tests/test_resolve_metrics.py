@@ -0,0 +1,65 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from resolve_metrics import InstrumentedProxy, MetricsRegistry, current_endpoint, instrument
+
+
+def test_proxy_times_calls_and_wraps_returned_objects():
+    """Tests that calls on returned objects are recorded and plain values pass through."""
+    registry = MetricsRegistry()
+    item = MagicMock()
+    item.GetStart.return_value = 86400
+    timeline = MagicMock()
+    timeline.GetItemListInTrack.return_value = [item, item]
+    resolve = instrument(timeline, registry)
+
+    items = resolve.GetItemListInTrack("subtitle", 1)
+    assert all(isinstance(wrapped, InstrumentedProxy) for wrapped in items)
+    assert [wrapped.GetStart() for wrapped in items] == [86400, 86400]
+
+    summary = registry.get_resolve_call_summary()
+    assert summary["GetItemListInTrack"]["count"] == 1
+    assert summary["GetStart"]["count"] == 2
+
+
+def test_proxy_unwraps_arguments_and_counts_errors():
+    """Tests that wrapped objects are handed back to Resolve unwrapped and failures are counted."""
+    registry = MetricsRegistry()
+    media_pool = MagicMock()
+    clip = MagicMock()
+    media_pool.ImportMedia.return_value = [clip]
+    media_pool.DeleteClips.side_effect = RuntimeError("boom")
+    pool = instrument(media_pool, registry)
+
+    imported = pool.ImportMedia(["/tmp/a.srt"])
+    pool.AppendToTimeline([{"mediaPoolItem": imported[0]}])
+    media_pool.AppendToTimeline.assert_called_once_with([{"mediaPoolItem": clip}])
+    with pytest.raises(RuntimeError):
+        pool.DeleteClips(imported)
+    media_pool.DeleteClips.assert_called_once_with([clip])
+    assert registry.get_resolve_call_summary()["DeleteClips"]["errors"] == 1
+
+
+def test_prometheus_rendering_labels_calls_by_endpoint():
+    """Tests the text exposition format: cumulative buckets, sum and count per endpoint and method."""
+    registry = MetricsRegistry()
+    token = current_endpoint.set("/api/v1/subtitles")
+    try:
+        registry.observe_resolve_call("GetItemListInTrack", 0.003)
+        registry.observe_resolve_call("GetItemListInTrack", 0.2)
+    finally:
+        current_endpoint.reset(token)
+    registry.observe_request("/api/v1/subtitles", "GET", 200, 0.25)
+
+    text = registry.render_prometheus()
+    labels = 'endpoint="/api/v1/subtitles",method="GetItemListInTrack"'
+    assert "# TYPE resolve_api_call_duration_seconds histogram" in text
+    assert f'resolve_api_call_duration_seconds_bucket{{{labels},le="0.001"}} 0' in text
+    assert f'resolve_api_call_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'resolve_api_call_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"resolve_api_call_duration_seconds_count{{{labels}}} 2" in text
+    assert 'http_request_duration_seconds_count{endpoint="/api/v1/subtitles",http_method="GET",status="200"} 1' in text
@@ -0,0 +1,180 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from resolve_metrics import MetricsRegistry, instrument
+from resolve_session import ResolveSessionCache
+
+
+def _make_timeline(unique_id, frame_rate='24'):
+    timeline = MagicMock()
+    timeline.GetUniqueId.return_value = unique_id
+    timeline.GetSetting.return_value = frame_rate
+    timeline.GetStartTimecode.return_value = "01:00:00:00"
+    return timeline
+
+
+def _make_project(unique_id, timeline):
+    project = MagicMock()
+    project.GetUniqueId.return_value = unique_id
+    project.GetCurrentTimeline.return_value = timeline
+    return project
+
+
+@pytest.fixture
+def resolve_setup():
+    """Provides a mocked Resolve whose current project can be swapped by the test."""
+    timeline = _make_timeline("timeline-a")
+    project = _make_project("project-a", timeline)
+    project_manager = MagicMock()
+    project_manager.GetCurrentProject.return_value = project
+    resolve = MagicMock()
+    resolve.GetProjectManager.return_value = project_manager
+    return resolve, project_manager, project, timeline
+
+
+def test_repeated_lookups_hit_cache(resolve_setup):
+    """Tests that the frame rate and project manager are only fetched once."""
+    resolve, _, _, timeline = resolve_setup
+    cache = ResolveSessionCache()
+
+    for _ in range(3):
+        context, error = cache.get_context(resolve)
+        assert error is None
+        assert context.timeline is timeline
+        assert context.frame_rate == 24.0
+
+    resolve.GetProjectManager.assert_called_once()
+    timeline.GetSetting.assert_called_once_with('timelineFrameRate')
+    stats = cache.get_stats()
+    assert stats["lookups"] == 3
+    assert stats["timeline_misses"] == 1
+    assert stats["timeline_hits"] == 2
+    # Two hits avoid GetProjectManager and the frame rate each; only the first lookup asks for unique IDs.
+    assert stats["resolve_calls_avoided"] == 4
+    assert stats["revalidation_calls"] == 2
+    assert stats["revalidations_skipped"] == 4
+    assert stats["resolve_calls_saved"] == 2
+
+
+def test_revalidation_is_skipped_through_instrumented_proxies(resolve_setup):
+    """Tests that the cached-handle shortcut sees through the new proxy every instrumented call returns."""
+    resolve, _, project, timeline = resolve_setup
+    cache = ResolveSessionCache()
+    instrumented = instrument(resolve, MetricsRegistry())
+
+    for _ in range(3):
+        context, error = cache.get_context(instrumented)
+        assert error is None
+
+    stats = cache.get_stats()
+    assert stats["revalidations_skipped"] == 4
+    assert stats["revalidation_calls"] == 2
+    assert project.GetUniqueId.call_count == 1
+    assert timeline.GetUniqueId.call_count == 1
+    assert stats["resolve_calls_saved_per_lookup"] > 0
+
+
+def test_saved_calls_are_net_of_revalidation(resolve_setup):
+    """Tests that unique-ID calls made when Resolve returns new handles are subtracted from the savings."""
+    resolve, project_manager, _, _ = resolve_setup
+    cache = ResolveSessionCache()
+
+    for _ in range(3):
+        # A fresh handle for the same project and timeline on every lookup, as the scripting bridge may return.
+        project_manager.GetCurrentProject.return_value = _make_project("project-a", _make_timeline("timeline-a"))
+        cache.get_context(resolve)
+
+    stats = cache.get_stats()
+    assert stats["timeline_hits"] == 2
+    assert stats["revalidation_calls"] == 6
+    assert stats["resolve_calls_saved"] == stats["resolve_calls_avoided"] - 6 == -2
+    assert stats["resolve_calls_saved_per_lookup"] == round(-2 / 3, 3)
+
+
+def test_timeline_switch_keeps_project_layer(resolve_setup):
+    """Tests that switching timelines drops only the timeline layer."""
+    resolve, _, project, _ = resolve_setup
+    cache = ResolveSessionCache()
+    context, _ = cache.get_context(resolve)
+    context.get_media_pool()
+
+    other_timeline = _make_timeline("timeline-b", frame_rate='29.97')
+    project.GetCurrentTimeline.return_value = other_timeline
+    context, error = cache.get_context(resolve)
+
+    assert error is None
+    assert context.timeline is other_timeline
+    assert context.frame_rate == 29.97
+    context.get_media_pool()
+    project.GetMediaPool.assert_called_once()
+    assert cache.get_stats()["project_hits"] == 1
+
+
+def test_project_switch_drops_all_layers(resolve_setup):
+    """Tests that switching projects refetches the media pool and timeline settings."""
+    resolve, project_manager, project, timeline = resolve_setup
+    cache = ResolveSessionCache()
+    context, _ = cache.get_context(resolve)
+    context.get_media_pool()
+    context.get_start_timecode()
+
+    other_project = _make_project("project-b", _make_timeline("timeline-a"))
+    project_manager.GetCurrentProject.return_value = other_project
+    context, error = cache.get_context(resolve)
+
+    assert error is None
+    assert context.project is other_project
+    context.get_media_pool()
+    context.get_start_timecode()
+    other_project.GetMediaPool.assert_called_once()
+    context.timeline.GetStartTimecode.assert_called_once()
+    assert cache.get_stats()["project_misses"] == 2
+
+
+def test_lazy_fields_are_cached(resolve_setup):
+    """Tests that the media pool and start timecode are fetched once per layer."""
+    resolve, _, project, timeline = resolve_setup
+    cache = ResolveSessionCache()
+
+    for _ in range(2):
+        context, _ = cache.get_context(resolve)
+        assert context.get_start_timecode() == "01:00:00:00"
+        context.get_media_pool()
+
+    project.GetMediaPool.assert_called_once()
+    timeline.GetStartTimecode.assert_called_once()
+    assert cache.get_stats()["lazy_hits"] == 2
+
+
+def test_no_project_and_no_timeline_errors(resolve_setup):
+    """Tests that missing projects and timelines are reported as errors."""
+    resolve, project_manager, project, _ = resolve_setup
+    cache = ResolveSessionCache()
+
+    project.GetCurrentTimeline.return_value = None
+    context, error = cache.get_context(resolve)
+    assert context is None
+    assert error["code"] == "no_active_timeline"
+
+    project_manager.GetCurrentProject.return_value = None
+    context, error = cache.get_context(resolve)
+    assert context is None
+    assert error["code"] == "no_project_open"
+
+
+def test_new_connection_invalidates_cache(resolve_setup):
+    """Tests that a reconnect (new resolve object) drops every cached handle."""
+    resolve, project_manager, _, timeline = resolve_setup
+    cache = ResolveSessionCache()
+    cache.get_context(resolve)
+
+    new_resolve = MagicMock()
+    new_resolve.GetProjectManager.return_value = project_manager
+    cache.get_context(new_resolve)
+
+    new_resolve.GetProjectManager.assert_called_once()
+    assert timeline.GetSetting.call_count == 2
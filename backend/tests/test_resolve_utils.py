@@ -134,4 +134,232 @@ def test_get_subtitle_tracks_connection_error(mock_get_timeline):
     status, result = get_subtitle_tracks()
     
     assert status == "error"
-    assert result == error_message
\ No newline at end of file
+    assert result == error_message
+
+from resolve_utils import get_resolve_subtitles
+
+def _make_subtitle_item(start, end, name):
+    item = MagicMock()
+    item.GetStart.return_value = start
+    item.GetEnd.return_value = end
+    item.GetName.return_value = name
+    return item
+
+@patch('resolve_utils._get_current_timeline')
+def test_get_resolve_subtitles_batched_extraction(mock_get_timeline, mock_resolve_setup):
+    """Tests that a whole track is read in one pass and converted in one batch."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 1
+    items = [
+        _make_subtitle_item(86400, 86424, "First"),
+        _make_subtitle_item(86448, 86500, "Second"),
+    ]
+    mock_timeline.GetItemListInTrack.return_value = items
+
+    status, result = get_resolve_subtitles(track_index=1)
+
+    assert status == "success"
+    assert result["frameRate"] == 24.0
+    assert result["data"] == [
+        {"id": 1, "startTimecode": "01:00:00:00", "endTimecode": "01:00:01:00", "text": "First"},
+        {"id": 2, "startTimecode": "01:00:02:00", "endTimecode": "01:00:04:04", "text": "Second"},
+    ]
+    assert set(result["timings"]) == {"ipc", "fingerprint", "format", "serialize"}
+    assert len(result["fingerprint"]) == 32
+    for item in items:
+        item.GetStart.assert_called_once()
+        item.GetEnd.assert_called_once()
+        item.GetName.assert_called_once()
+
+@patch('resolve_utils._get_current_timeline')
+def test_get_resolve_subtitles_invalid_track_index(mock_get_timeline, mock_resolve_setup):
+    """Tests that an out-of-range track index is rejected before reading items."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 1
+
+    status, result = get_resolve_subtitles(track_index=3)
+
+    assert status == "error"
+    assert result["code"] == "invalid_track_index"
+    mock_timeline.GetItemListInTrack.assert_not_called()
+
+@patch('resolve_utils._get_current_timeline')
+def test_get_resolve_subtitles_fingerprint_tracks_content(mock_get_timeline, mock_resolve_setup):
+    """Tests that the fingerprint is stable for unchanged tracks and changes with timing or text."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 1
+
+    def fingerprint_of(items):
+        mock_timeline.GetItemListInTrack.return_value = items
+        return get_resolve_subtitles(track_index=1)[1]["fingerprint"]
+
+    original = fingerprint_of([_make_subtitle_item(0, 24, "Hello")])
+    assert fingerprint_of([_make_subtitle_item(0, 24, "Hello")]) == original
+    assert fingerprint_of([_make_subtitle_item(0, 25, "Hello")]) != original
+    assert fingerprint_of([_make_subtitle_item(0, 24, "Hello!")]) != original
+
+from resolve_utils import get_resolve_subtitle_changes
+
+@patch('resolve_utils._get_current_timeline')
+def test_get_resolve_subtitle_changes_since_previous_token(mock_get_timeline, mock_resolve_setup):
+    """Tests that the changes endpoint diffs against the snapshot served earlier."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 1
+    mock_timeline.GetItemListInTrack.return_value = [_make_subtitle_item(0, 24, "A")]
+    _, served = get_resolve_subtitles(track_index=1)
+
+    mock_timeline.GetItemListInTrack.return_value = [_make_subtitle_item(0, 24, "A"), _make_subtitle_item(48, 60, "B")]
+    status, result = get_resolve_subtitle_changes(track_index=1, since=served["fingerprint"])
+
+    assert status == "success"
+    assert result["reset"] is False
+    assert result["count"] == 2
+    assert [cue["text"] for cue in result["added"]] == ["B"]
+    assert result["token"] != served["fingerprint"]
+
+    status, result = get_resolve_subtitle_changes(track_index=1, since=result["token"])
+    assert result["added"] == [] and result["removed"] == [] and result["retimed"] == []
+
+    status, result = get_resolve_subtitle_changes(track_index=1, since="unknown")
+    assert result["reset"] is True
+    assert len(result["added"]) == 2
+
+from resolve_utils import export_to_davinci
+from schemas import SubtitleExportRequest
+
+def _export_request(text="Hello"):
+    return SubtitleExportRequest(frameRate=24.0, subtitles=[
+        {"id": 1, "startTimecode": "01:00:01:00", "endTimecode": "01:00:02:00", "diffs": [{"type": "normal", "value": text}]}
+    ])
+
+@pytest.fixture
+def export_setup(mock_resolve_setup, tmp_path):
+    """Mocks a Resolve project with a media pool and a scratch directory under tmp_path."""
+    mock_resolve, mock_timeline = mock_resolve_setup
+    mock_timeline.GetStartTimecode.return_value = "01:00:00:00"
+    mock_timeline.GetTrackCount.return_value = 1
+    mock_timeline.AddTrack.return_value = True
+    project = mock_resolve.GetProjectManager.return_value.GetCurrentProject.return_value
+    media_pool = project.GetMediaPool.return_value
+    media_pool.ImportMedia.side_effect = lambda paths: [MagicMock(name=f"item:{paths[0]}")]
+    with patch('resolve_utils._connect_to_resolve', return_value=(mock_resolve, None)), \
+         patch('resolve_utils._get_scratch_dir', return_value=str(tmp_path)):
+        yield media_pool, tmp_path
+
+def test_export_to_davinci_reuses_imported_media(export_setup):
+    """Tests that re-exporting identical content reuses the imported media pool item."""
+    media_pool, scratch_dir = export_setup
+
+    assert export_to_davinci(_export_request())[0] == "success"
+    assert export_to_davinci(_export_request())[0] == "success"
+
+    media_pool.ImportMedia.assert_called_once()
+    first_item = media_pool.AppendToTimeline.call_args_list[0].args[0][0]
+    second_item = media_pool.AppendToTimeline.call_args_list[1].args[0][0]
+    assert first_item is second_item
+    srt_files = [name for name in os.listdir(scratch_dir) if name.endswith(".srt")]
+    assert len(srt_files) == 1
+    with open(os.path.join(scratch_dir, srt_files[0]), encoding="utf-8") as srt_file:
+        assert srt_file.read() == "1\n00:00:01,000 --> 00:00:02,000\nHello"
+
+def test_export_to_davinci_imports_changed_content(export_setup):
+    """Tests that different content, or a reused item deleted by the user, is imported again."""
+    media_pool, scratch_dir = export_setup
+
+    export_to_davinci(_export_request("Hello"))
+    export_to_davinci(_export_request("Bonjour"))
+    assert media_pool.ImportMedia.call_count == 2
+
+    deleted_item = media_pool.AppendToTimeline.call_args_list[1].args[0][0]
+    deleted_item.GetName.return_value = None
+    export_to_davinci(_export_request("Bonjour"))
+    assert media_pool.ImportMedia.call_count == 3
+    assert not [name for name in os.listdir(scratch_dir) if name.endswith(".part")]
+
+from resolve_utils import get_resolve_all_subtitles
+
+@patch('resolve_utils._get_current_timeline')
+def test_get_resolve_all_subtitles_resolves_timeline_once(mock_get_timeline, mock_resolve_setup):
+    """Tests that every subtitle track is extracted with a single timeline lookup."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 2
+    mock_timeline.GetTrackName.side_effect = lambda kind, index: f"Lang {index}"
+    mock_timeline.GetItemListInTrack.side_effect = lambda kind, index: [_make_subtitle_item(index * 24, index * 48, f"T{index}")]
+
+    status, result = get_resolve_all_subtitles()
+
+    assert status == "success"
+    mock_get_timeline.assert_called_once()
+    assert [track["track_name"] for track in result["tracks"]] == ["Lang 1", "Lang 2"]
+    assert result["tracks"][1]["data"] == [
+        {"id": 1, "startTimecode": "00:00:02:00", "endTimecode": "00:00:04:00", "text": "T2"}
+    ]
+
+    status, result = get_resolve_all_subtitles([2])
+    assert [track["track_index"] for track in result["tracks"]] == [2]
+
+    status, result = get_resolve_all_subtitles([3])
+    assert status == "error"
+    assert result["code"] == "invalid_track_index"
+
+
+@patch('resolve_utils.importlib.util.spec_from_file_location')
+@patch('resolve_utils.os.path.exists', return_value=True)
+def test_resolve_script_module_loaded_once(mock_exists, mock_spec):
+    """Tests that reconnects reuse the DaVinciResolveScript module loaded for the first connection."""
+    import resolve_utils
+    with patch('resolve_utils.importlib.util.module_from_spec') as mock_module_from_spec, \
+            patch.object(resolve_utils, '_resolve_script_module', None):
+        first = resolve_utils._get_resolve_bmd()
+        second = resolve_utils._get_resolve_bmd()
+
+    assert first is second is mock_module_from_spec.return_value
+    mock_spec.assert_called_once()
+    mock_spec.return_value.loader.exec_module.assert_called_once()
+
+
+def test_check_resolve_connection_pings_and_reconnects():
+    """Tests that the health check pings the cached connection and reconnects when the ping fails."""
+    import resolve_utils
+    alive = MagicMock()
+    alive.GetVersionString.return_value = "19.0.0"
+    with patch.object(resolve_utils, '_resolve_connection', alive):
+        status, result = resolve_utils.check_resolve_connection()
+    assert status == "success" and result["reconnected"] is False
+
+    dead = MagicMock()
+    dead.GetVersionString.side_effect = RuntimeError("gone")
+    with patch.object(resolve_utils, '_resolve_connection', dead), \
+            patch('resolve_utils._connect_to_resolve', return_value=(alive, None)) as mock_connect:
+        status, result = resolve_utils.check_resolve_connection()
+    assert status == "success" and result["reconnected"] is True
+    mock_connect.assert_called_once_with(force_reconnect=True)
+
+
+from resolve_utils import set_resolve_playhead
+
+@patch('resolve_utils._get_current_timeline')
+def test_set_resolve_playhead_by_frame_and_cue_id(mock_get_timeline, mock_resolve_setup):
+    """Tests jumping to a frame, and to a cue by id using the last extracted snapshot of its track."""
+    _, mock_timeline = mock_resolve_setup
+    mock_get_timeline.return_value = (mock_timeline, 24.0, None)
+    mock_timeline.GetTrackCount.return_value = 1
+    mock_timeline.GetItemListInTrack.return_value = [_make_subtitle_item(86400, 86424, "A"), _make_subtitle_item(86448, 86500, "B")]
+    get_resolve_subtitles(track_index=1)
+    mock_timeline.GetItemListInTrack.reset_mock()
+
+    assert set_resolve_playhead(frame=86424)[1]["timecode"] == "01:00:01:00"
+    status, result = set_resolve_playhead(cue_id=2, jump_to="middle")
+    assert status == "success"
+    assert result["timecode"] == "01:00:03:02"
+    assert set(result["timings"]) == {"lookup", "resolve"}
+    mock_timeline.SetCurrentTimecode.assert_called_with("01:00:03:02")
+    mock_timeline.GetItemListInTrack.assert_not_called()
+
+    status, result = set_resolve_playhead(cue_id=3)
+    assert status == "error" and result["code"] == "cue_not_found"
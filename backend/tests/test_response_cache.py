@@ -0,0 +1,43 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from starlette.responses import JSONResponse
+
+from response_cache import EncodedResponseCache, FastJSONResponse, _encode_json_stdlib, encode_json
+
+
+@pytest.mark.parametrize("content", [
+    {"status": "success", "frameRate": 23.976, "data": [{"id": 1, "text": "你好\n\"quoted\"\t\x01", "ok": True, "none": None}]},
+    [1, -2, 0.1, 2 ** 63 - 1, "emoji 😀", {"nested": []}],
+    {1: "int keys become strings"},
+    2 ** 70,
+])
+def test_encode_json_matches_starlette(content):
+    """Tests that the fast encoder produces the same bytes as Starlette's JSONResponse."""
+    assert encode_json(content) == _encode_json_stdlib(content)
+    if not isinstance(content, dict) or all(isinstance(key, str) for key in content):
+        assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+def test_encode_json_exponent_floats_round_trip():
+    """Floats in exponent notation may be spelled differently (`1e21` vs `1e+21`) but decode equal."""
+    import json
+    assert json.loads(encode_json([1e21, 1.5e-7])) == [1e21, 1.5e-7]
+
+
+def test_encoded_response_cache_checks_fingerprint_and_evicts():
+    cache = EncodedResponseCache(max_entries=2)
+    cache.put("a", "v1", b"A1")
+    assert cache.get("a", "v1") == b"A1"
+    assert cache.get("a", "v2") is None
+
+    cache.put("b", "v1", b"B1")
+    cache.get("a", "v1")
+    cache.put("c", "v1", b"C1")
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == b"A1"
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 2, 2)
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    """Tests that identical in-flight calls share one execution and its result."""
+    group = SingleFlight()
+    calls = []
+
+    async def extract(track_index):
+        calls.append(track_index)
+        await asyncio.sleep(0.01)
+        return "success", {"track": track_index}
+
+    async def scenario():
+        return await asyncio.gather(
+            group.do(("subtitles", "p", "t", 1), extract, 1),
+            group.do(("subtitles", "p", "t", 1), extract, 1),
+            group.do(("subtitles", "p", "t", 1), extract, 1),
+            group.do(("subtitles", "p", "t", 2), extract, 2),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert calls == [1, 2]
+    assert results[:3] == [("success", {"track": 1})] * 3
+    stats = group.get_stats()
+    assert stats["keys"]["subtitles"]["executed"] == 2
+    assert stats["keys"]["subtitles"]["coalesced"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    """Tests that a finished call is not reused by later callers."""
+    group = SingleFlight()
+    calls = []
+
+    async def extract():
+        calls.append(1)
+        return "success", {}
+
+    async def scenario():
+        await group.do(("subtitle_tracks",), extract)
+        await group.do(("subtitle_tracks",), extract)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    """Tests that one disconnecting caller does not abort the work for the others."""
+    group = SingleFlight()
+
+    async def extract():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(group.do(("subtitles", 1), extract))
+        second = asyncio.ensure_future(group.do(("subtitles", 1), extract))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+
+def test_exceptions_are_shared():
+    """Tests that every coalesced caller sees the exception of the shared call."""
+    group = SingleFlight()
+
+    async def extract():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("lost connection")
+
+    async def scenario():
+        return await asyncio.gather(
+            group.do(("subtitles", 1), extract),
+            group.do(("subtitles", 1), extract),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_callers_do_not_join_a_call_that_has_started():
+    """Tests that a caller arriving after the shared call began its read starts a new call instead of joining."""
+    group = SingleFlight()
+    reads = []
+
+    async def extract(started, gate):
+        await asyncio.sleep(0)
+        started.set()
+        read = len(reads)
+        reads.append(read)
+        await gate.wait()
+        return read
+
+    async def scenario():
+        first_started, second_started, gate = threading.Event(), threading.Event(), asyncio.Event()
+        key = ("subtitles", "p", "t", 1)
+        early = [asyncio.ensure_future(group.do(key, extract, first_started, gate, started=first_started)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        late = asyncio.ensure_future(group.do(key, extract, second_started, gate, started=second_started))
+        await asyncio.sleep(0.01)
+        gate.set()
+        return await asyncio.gather(*early, late)
+
+    results = asyncio.run(scenario())
+
+    assert results == [0, 0, 1]
+    counts = group.get_stats()["keys"]["subtitles"]
+    assert (counts["executed"], counts["coalesced"], counts["started_misses"]) == (2, 1, 1)
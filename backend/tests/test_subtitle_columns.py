@@ -0,0 +1,87 @@
+import pytest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import ValidationError
+
+from schemas import SubtitleColumns
+from subtitle_columns import (
+    COLUMNS_JSON_MEDIA_TYPE,
+    COLUMNS_MSGPACK_MEDIA_TYPE,
+    compile_columns,
+    decode_columns,
+    is_columns_media_type,
+    snapshot_columns,
+)
+from subtitle_export import iter_srt
+from track_snapshots import TrackSnapshot
+
+
+def _columns(**overrides):
+    payload = {"frameRate": 24.0, "startFrames": [24, 72], "endFrames": [48, 96], "texts": ["Hello", "World"]}
+    payload.update(overrides)
+    return payload
+
+
+def test_media_type_detection():
+    assert is_columns_media_type(COLUMNS_JSON_MEDIA_TYPE)
+    assert is_columns_media_type("application/vnd.subtitle-columns+json; charset=utf-8")
+    assert is_columns_media_type("application/msgpack")
+    assert not is_columns_media_type("application/json")
+    assert not is_columns_media_type(None)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"endFrames": [48]},
+    {"texts": ["only one"]},
+    {"startFrames": [-1, 72]},
+    {"endFrames": [48, 50]},
+    {"frameRate": 0},
+    {"diffOffsets": [0, 1]},
+    {"diffOffsets": [0, 1, 2], "diffTypes": ["normal"], "diffValues": ["Hello"]},
+    {"texts": None},
+])
+def test_invalid_columns_are_rejected(overrides):
+    """Tests column length, ordering and diff column checks."""
+    with pytest.raises(ValidationError):
+        decode_columns(json.dumps(_columns(**overrides)).encode(), COLUMNS_JSON_MEDIA_TYPE)
+
+
+def test_compile_columns_matches_srt_output():
+    """Tests that columns compile to the same SRT as the cue-based request, relative to a base frame."""
+    columns = SubtitleColumns.model_validate(_columns())
+    srt = "".join(iter_srt(compile_columns(columns)))
+    assert srt == "1\n00:00:01,000 --> 00:00:02,000\nHello\n\n2\n00:00:03,000 --> 00:00:04,000\nWorld"
+
+    compiled = compile_columns(columns, base_frames=48)
+    assert compiled.start_frames == [0, 24]
+    assert compiled.end_frames == [0, 48]
+
+
+def test_compile_columns_rebuilds_texts_from_diffs():
+    """Tests that, without `texts`, each cue's text is its non-removed diff parts, and that `texts` wins when both are sent."""
+    diffs = {"diffOffsets": [0, 3, 4], "diffTypes": [0, 2, 1, 0], "diffValues": ["Hel", "p", "lo", "World"]}
+    columns = SubtitleColumns.model_validate(_columns(texts=None, **diffs))
+    assert compile_columns(columns).texts == ["Hello", "World"]
+
+    columns = SubtitleColumns.model_validate(_columns(texts=["Final", "Text"], **diffs))
+    assert compile_columns(columns).texts == ["Final", "Text"]
+
+
+def test_snapshot_columns():
+    snapshot = TrackSnapshot(25.0, "abc", [0, 50], [25, 75], ["a", "b"])
+    content = snapshot_columns(snapshot)
+    assert SubtitleColumns.model_validate(content).texts == ["a", "b"]
+    assert content["fingerprint"] == "abc"
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.packb(_columns(), use_bin_type=True)
+    columns = decode_columns(body, COLUMNS_MSGPACK_MEDIA_TYPE)
+    assert columns.endFrames == [48, 96]
+    with pytest.raises(ValueError):
+        decode_columns(b"\xc1", COLUMNS_MSGPACK_MEDIA_TYPE)
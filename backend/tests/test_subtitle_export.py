@@ -0,0 +1,96 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from schemas import SubtitleExportRequest
+from subtitle_export import compile_export_request, get_export_format, list_export_formats
+from timecode_utils import frames_to_srt_timecode
+
+
+def _export_request(subtitles, frame_rate=24.0):
+    return SubtitleExportRequest(frameRate=frame_rate, subtitles=subtitles)
+
+
+def _render(name, compiled):
+    return "".join(get_export_format(name).render(compiled))
+
+
+@pytest.fixture
+def compiled():
+    request = _export_request([
+        {"id": 1, "startTimecode": "01:00:01:00", "endTimecode": "01:00:02:12",
+         "diffs": [{"type": "normal", "value": "Hello "}, {"type": "removed", "value": "old"}, {"type": "added", "value": "<world> & co"}]},
+        {"id": 2, "startTimecode": "01:00:03:06", "endTimecode": "01:00:04:00",
+         "diffs": [{"type": "normal", "value": "Line one\nLine {two}"}]},
+    ])
+    return compile_export_request(request, base_frames=86400)
+
+
+def test_compile_export_request_builds_relative_frames_and_clean_text(compiled):
+    """Tests that the request is compiled to relative frames and clean texts."""
+    assert compiled.start_frames == [24, 78]
+    assert compiled.end_frames == [60, 96]
+    assert compiled.texts == ["Hello <world> & co", "Line one\nLine {two}"]
+    assert len(compiled) == 2
+
+
+def test_compile_export_request_clamps_cues_before_base():
+    """Tests that cues before the timeline start are clamped to frame 0."""
+    compiled = compile_export_request(_export_request([
+        {"id": 1, "startTimecode": "00:59:59:00", "endTimecode": "01:00:01:00", "diffs": []},
+    ]), base_frames=86400)
+    assert compiled.start_frames == [0]
+    assert compiled.end_frames == [24]
+
+
+def test_time_parts_match_srt_arithmetic():
+    """Tests that the shared time split agrees with frames_to_srt_timecode."""
+    frames = [0, 1, 23, 1799, 107892, 2589410]
+    compiled = compile_export_request(_export_request([], 29.97))
+    compiled.start_frames = compiled.end_frames = frames
+    starts, _ = compiled.time_parts()
+    assert [f"{h:02d}:{m:02d}:{s:02d},{ms:03d}" for h, m, s, ms in starts] == [frames_to_srt_timecode(f, 29.97) for f in frames]
+
+
+def test_all_formats_are_registered():
+    assert list_export_formats() == ["srt", "vtt", "ass", "ttml", "sbv"]
+
+
+def test_render_srt(compiled):
+    assert _render("srt", compiled) == (
+        "1\n00:00:01,000 --> 00:00:02,500\nHello <world> & co\n\n"
+        "2\n00:00:03,250 --> 00:00:04,000\nLine one\nLine {two}"
+    )
+
+
+def test_render_vtt(compiled):
+    assert _render("vtt", compiled) == (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:02.500\nHello &lt;world&gt; &amp; co\n\n"
+        "00:00:03.250 --> 00:00:04.000\nLine one\nLine {two}\n"
+    )
+
+
+def test_render_ass(compiled):
+    rendered = _render("ass", compiled)
+    assert rendered.startswith("[Script Info]\n")
+    assert rendered.endswith(
+        "Dialogue: 0,0:00:01.00,0:00:02.50,Default,,0,0,0,,Hello <world> & co\n"
+        "Dialogue: 0,0:00:03.25,0:00:04.00,Default,,0,0,0,,Line one\\NLine \\{two\\}\n"
+    )
+
+
+def test_render_ttml(compiled):
+    rendered = _render("ttml", compiled)
+    assert '<p begin="00:00:01.000" end="00:00:02.500">Hello &lt;world&gt; &amp; co</p>' in rendered
+    assert '<p begin="00:00:03.250" end="00:00:04.000">Line one<br/>Line {two}</p>' in rendered
+    assert rendered.rstrip().endswith("</tt>")
+
+
+def test_render_sbv(compiled):
+    assert _render("sbv", compiled) == (
+        "0:00:01.000,0:00:02.500\nHello <world> & co\n\n"
+        "0:00:03.250,0:00:04.000\nLine one\nLine {two}"
+    )
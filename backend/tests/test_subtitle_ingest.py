@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+import codecs
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subtitle_ingest import SubtitleStreamParser, format_ms, parse_upload
+
+
+def _parse(data: bytes, chunk_size: int = 7):
+    parser = SubtitleStreamParser()
+    chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    cues = list(parser.parse(chunks))
+    return parser, cues
+
+
+SRT = "1\n00:00:01,000 --> 00:00:02,500\nHello\nworld\n\n2\n00:00:03,250 --> 00:00:04,000\n你好\n"
+
+
+@pytest.mark.parametrize("data", [
+    SRT.encode("utf-8"),
+    codecs.BOM_UTF8 + SRT.replace("\n", "\r\n").encode("utf-8"),
+    SRT.replace("\n", "\r").encode("utf-8"),
+    codecs.BOM_UTF16_LE + SRT.replace("\n", "\r\n").encode("utf-16-le"),
+])
+def test_parses_boms_and_line_endings(data):
+    """Tests that BOMs and CRLF/CR line endings yield the same cues, whatever the chunking."""
+    for chunk_size in (1, 7, 4096):
+        parser, cues = _parse(data, chunk_size)
+        assert [(c.start_ms, c.end_ms, c.text) for c in cues] == [(1000, 2500, "Hello\nworld"), (3250, 4000, "你好")]
+        assert parser.issues == []
+
+
+def test_mixed_encodings_fall_back_per_line():
+    """Tests that lines that are not UTF-8 are decoded with the fallback encoding."""
+    data = "1\n00:00:01,000 --> 00:00:02,000\n".encode("utf-8") + "字幕".encode("gb18030") + b"\n\n2\n00:00:03,000 --> 00:00:04,000\n" + "字幕".encode("utf-8")
+    result = parse_upload([data])
+    assert [cue.text for cue in result.cues] == ["字幕", "字幕"]
+    assert result.encoding == "utf-8+gb18030"
+
+
+def test_malformed_blocks_are_reported_with_positions():
+    """Tests that malformed blocks are skipped and reported with line and column."""
+    data = (
+        "1\n00:00:01,000 --> 00:00:02,000\nok\n\n"
+        "2\n00:00:03,000 -> 00:00:04,000\nbroken arrow\n\n"
+        "3\n00:00:05,000 --> 00:0x:06,000\nbroken end\n\n"
+        "4\n00:00:08,000 --> 00:00:07,000\nbackwards\n\n"
+        "5\nno timing here\n\n"
+        "6\n00:00:09,000 --> 00:00:10,000\nlast\n"
+    ).encode("utf-8")
+    parser, cues = _parse(data)
+    assert [cue.text for cue in cues] == ["ok", "last"]
+    assert [(issue.line, issue.column) for issue in parser.issues] == [(6, 1), (10, 18), (14, 18), (18, 1)]
+    assert parser.line_count == 22
+
+
+def test_missing_blank_line_between_cues():
+    """Tests that a cue number followed by a timing line starts a new cue."""
+    data = b"1\n00:00:01,000 --> 00:00:02,000\nfirst\n2\n00:00:03,000 --> 00:00:04,000\nsecond\n"
+    _, cues = _parse(data)
+    assert [(cue.start_ms, cue.text) for cue in cues] == [(1000, "first"), (3000, "second")]
+
+
+def test_webvtt():
+    """Tests WebVTT headers, NOTE blocks, identifiers, short timestamps and cue settings."""
+    data = (
+        "WEBVTT - title\nKind: captions\n\n"
+        "NOTE a comment\nspanning lines\n\n"
+        "intro\n00:01.500 --> 00:02.000 align:start\n<i>Hi</i>\n\n"
+        "01:00:00.000 --> 01:00:01.000\nAn hour in\n"
+    ).encode("utf-8")
+    parser, cues = _parse(data)
+    assert parser.format == "vtt"
+    assert [(cue.start_ms, cue.end_ms, cue.text) for cue in cues] == [(1500, 2000, "<i>Hi</i>"), (3600000, 3601000, "An hour in")]
+    assert parser.issues == []
+
+
+def test_ingest_result_pages_and_compile():
+    """Tests paging in the importer's format and conversion to frames."""
+    data = "".join(f"{i}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\nLine {i}\n\n" for i in range(1, 6)).encode("utf-8")
+    result = parse_upload([data])
+    page = result.page(2, 2)
+    assert page["total"] == 5
+    assert page["cues"] == [
+        {"id": 3, "startTimecode": "00:00:03.000", "endTimecode": "00:00:03.500", "text": "Line 3"},
+        {"id": 4, "startTimecode": "00:00:04.000", "endTimecode": "00:00:04.500", "text": "Line 4"},
+    ]
+    compiled = result.compile(24.0)
+    assert compiled.start_frames[:2] == [24, 48]
+    assert compiled.end_frames[:2] == [36, 60]
+    assert format_ms(3723004) == "01:02:03.004"
@@ -0,0 +1,106 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from subtitle_search import (
+    InvalidSearchPattern,
+    SearchIndexStore,
+    TrackSearchIndex,
+    compile_search_pattern,
+    render_search_page,
+)
+from text_diff import diff_chars
+from track_snapshots import TrackSnapshot
+
+
+def _snapshot(texts, fingerprint="v1"):
+    return TrackSnapshot(24.0, fingerprint, [i * 48 for i in range(len(texts))], [i * 48 + 24 for i in range(len(texts))], texts)
+
+
+TEXTS = [
+    "Hello world, this is a test.",
+    "Another TEST subtitle.",
+    "And a third one for testing.",
+    "The word test should be found.",
+]
+
+
+def _search(index, query, **options):
+    pattern = compile_search_pattern(query, options.get("regex", False), options.get("match_case", False), options.get("whole_word", False))
+    return index.search(pattern, None if options.get("regex") else query)
+
+
+def test_search_options():
+    """Tests literal, case, whole-word and regex searches."""
+    index = TrackSearchIndex()
+    index.update(_snapshot(TEXTS))
+
+    assert [position for position, _ in _search(index, "test")] == [0, 1, 2, 3]
+    assert [position for position, _ in _search(index, "test", match_case=True)] == [0, 2, 3]
+    assert [position for position, _ in _search(index, "test", whole_word=True)] == [0, 1, 3]
+    assert _search(index, r"t\w+ing", regex=True) == [(2, [(20, 27)])]
+    assert _search(index, "world") == [(0, [(6, 11)])]
+    assert _search(index, "nowhere") == []
+
+
+def test_invalid_regex_raises():
+    with pytest.raises(InvalidSearchPattern):
+        compile_search_pattern("(unclosed", True, False, False)
+
+
+def test_index_updates_incrementally():
+    """Tests that only added and removed cues are re-indexed when the track changes."""
+    index = TrackSearchIndex()
+    assert index.update(_snapshot(TEXTS)) == {"added": 4, "removed": 0}
+    assert index.update(_snapshot(TEXTS)) == {"added": 0, "removed": 0}
+
+    changed = TEXTS[:3] + ["Nothing to see here."]
+    assert index.update(_snapshot(changed, "v2")) == {"added": 1, "removed": 1}
+    assert [position for position, _ in _search(index, "test")] == [0, 1, 2]
+    assert [position for position, _ in _search(index, "nothing")] == [3]
+
+
+def test_store_counts_builds_and_updates():
+    store = SearchIndexStore()
+    store.get_index(("p", "t", 1), _snapshot(TEXTS))
+    store.get_index(("p", "t", 1), _snapshot(TEXTS))
+    store.get_index(("p", "t", 1), _snapshot(TEXTS[:2], "v2"))
+    stats = store.get_stats()
+    assert (stats["builds"], stats["up_to_date"], stats["incremental_updates"]) == (1, 1, 1)
+    assert stats["cues_dropped"] == 2
+
+
+def test_replace_produces_diffs_and_uses_client_edits():
+    """Tests bulk replace with JavaScript replacement patterns and client-side edits."""
+    index = TrackSearchIndex()
+    index.update(_snapshot(TEXTS))
+
+    pattern = compile_search_pattern(r"(t)est", True, True, False)
+    cues = index.replace(pattern, "[$1oast$$]", edits={2: "Another test subtitle."})
+    assert [cue["id"] for cue in cues] == [1, 2, 3, 4]
+    assert cues[0]["text"] == "Hello world, this is a [toast$]."
+    assert cues[1]["text"] == "Another [toast$] subtitle."
+    assert "".join(part["value"] for part in cues[1]["diffs"] if part["type"] != "removed") == cues[1]["text"]
+    assert "".join(part["value"] for part in cues[1]["diffs"] if part["type"] != "added") == TEXTS[1]
+
+
+def test_render_search_page_uses_javascript_offsets():
+    """Tests paging and that offsets count astral characters as two code units."""
+    index = TrackSearchIndex()
+    index.update(_snapshot(["😀 test", "plain test", "test again"]))
+    results = _search(index, "test")
+    page = render_search_page(index, results, 1, 2)
+    assert page["totalCues"] == 3
+    assert page["totalMatches"] == 3
+    assert [item["matches"] for item in page["results"]] == [[[3, 7]], [[6, 10]]]
+    assert page["results"][1]["startTimecode"] == "00:00:02:00"
+
+
+def test_diff_chars():
+    assert diff_chars("colour", "color") == [
+        {"type": "normal", "value": "colo"},
+        {"type": "removed", "value": "u"},
+        {"type": "normal", "value": "r"},
+    ]
@@ -0,0 +1,74 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from response_cache import encode_json
+from resolve_utils import generate_srt_content, iter_srt_content
+from schemas import SubtitleExportRequest
+from subtitle_streams import buffered_bytes, iter_snapshot_cues, iter_subtitles_json, iter_subtitles_ndjson
+from timecode_utils import timecode_to_frames, frames_to_srt_timecode
+from track_snapshots import TrackSnapshot
+
+
+def _reference_srt(request, base_frames=0):
+    """The list-and-join SRT generator the streaming writer replaced."""
+    blocks = []
+    for index, subtitle in enumerate(request.subtitles, start=1):
+        text = "".join([part.value for part in subtitle.diffs if part.type != 'removed'])
+        start = timecode_to_frames(subtitle.startTimecode, request.frameRate) - base_frames
+        end = timecode_to_frames(subtitle.endTimecode, request.frameRate) - base_frames
+        blocks.append(f"{index}\n{frames_to_srt_timecode(max(0, start), request.frameRate)} --> "
+                      f"{frames_to_srt_timecode(max(0, end), request.frameRate)}\n{text}")
+    return "\n\n".join(blocks)
+
+
+def _export_request(count):
+    return SubtitleExportRequest(frameRate=29.97, subtitles=[
+        {"id": i, "startTimecode": f"01:00:{i // 30 % 60:02d};{i % 30:02d}", "endTimecode": f"01:01:{i // 30 % 60:02d};{i % 30:02d}",
+         "diffs": [{"type": "normal", "value": "Line "}, {"type": "added", "value": str(i)}, {"type": "removed", "value": "old"}]}
+        for i in range(count)
+    ])
+
+
+@pytest.mark.parametrize("count", [0, 1, 500])
+def test_streamed_srt_is_identical_to_joined_srt(count):
+    """Tests that the SRT generator produces exactly the previous output."""
+    request = _export_request(count)
+    base_frames = timecode_to_frames("01:00:00;00", 29.97)
+
+    assert generate_srt_content(request, base_frames) == _reference_srt(request, base_frames)
+    streamed = b"".join(buffered_bytes(iter_srt_content(request, base_frames), buffer_size=256))
+    assert streamed == _reference_srt(request, base_frames).encode("utf-8")
+
+
+def test_buffered_bytes_bounds_block_size():
+    """Tests that chunks are grouped into blocks of about the buffer size."""
+    blocks = list(buffered_bytes(("x" * 10 for _ in range(100)), buffer_size=100))
+    assert len(blocks) == 10
+    assert all(len(block) == 100 for block in blocks)
+
+
+def _snapshot(count):
+    return TrackSnapshot(24.0, "fp", [i * 48 for i in range(count)], [i * 48 + 24 for i in range(count)],
+                         [f"字幕 {i}" for i in range(count)])
+
+
+def test_streamed_json_matches_buffered_json():
+    """Tests that the streamed JSON body equals the buffered SuccessResponse body."""
+    snapshot = _snapshot(2500)
+    payload = {"status": "success", "frameRate": 24.0, "data": list(iter_snapshot_cues(snapshot, batch_size=1000))}
+
+    assert b"".join(buffered_bytes(iter_subtitles_json(snapshot))) == encode_json(payload)
+    assert payload["data"][1000] == {"id": 1001, "startTimecode": "00:33:20:00", "endTimecode": "00:33:21:00", "text": "字幕 1000"}
+
+
+def test_streamed_json_for_empty_track():
+    assert "".join(iter_subtitles_json(_snapshot(0))) == '{"status":"success","frameRate":24.0,"data":[]}'
+
+
+def test_ndjson_has_header_and_one_line_per_cue():
+    lines = "".join(iter_subtitles_ndjson(_snapshot(3))).splitlines()
+    assert len(lines) == 4
+    assert lines[0] == '{"status":"success","frameRate":24.0,"count":3}'
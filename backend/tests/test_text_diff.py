@@ -0,0 +1,70 @@
+import pytest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from text_diff import compute_diff, diff_batch, diff_chars, get_diff_cache
+
+
+def _sides(parts):
+    original = "".join(value for kind, value in parts if kind != "added")
+    edited = "".join(value for kind, value in parts if kind != "removed")
+    return original, edited
+
+
+@pytest.mark.parametrize("granularity", ["char", "word"])
+def test_diff_reconstructs_both_texts(granularity):
+    """Tests on random inputs that the parts rebuild the original and the edited text."""
+    rng = random.Random(7)
+    for _ in range(500):
+        original = "".join(rng.choice("ab c,字") for _ in range(rng.randint(0, 15)))
+        edited = "".join(rng.choice("ab c,字") for _ in range(rng.randint(0, 15)))
+        assert _sides(compute_diff(original, edited, granularity)) == (original, edited)
+
+
+def test_char_diff_is_minimal_and_removed_first():
+    assert compute_diff("colour", "color") == (("normal", "colo"), ("removed", "u"), ("normal", "r"))
+    assert compute_diff("kitten", "sitting") == (
+        ("removed", "k"), ("added", "s"), ("normal", "itt"), ("removed", "e"), ("added", "i"), ("normal", "n"), ("added", "g"))
+    assert compute_diff("", "new") == (("added", "new"),)
+    assert compute_diff("same", "same") == (("normal", "same"),)
+
+
+def test_word_diff_splits_words_and_cjk_characters():
+    assert compute_diff("the quick fox", "the slow fox", "word") == (
+        ("normal", "the "), ("removed", "quick"), ("added", "slow"), ("normal", " fox"))
+    assert compute_diff("我喜欢苹果", "我讨厌苹果", "word") == (
+        ("normal", "我"), ("removed", "喜欢"), ("added", "讨厌"), ("normal", "苹果"))
+
+
+def test_diff_batch_caches_by_content():
+    """Tests that identical pairs are computed once and served from the cache afterwards."""
+    cache = get_diff_cache()
+    cache.clear()
+    before = cache.get_stats()
+
+    pairs = [("hello there", "hello world"), ("abc", "abd"), ("hello there", "hello world")]
+    first = diff_batch(pairs)
+    second = diff_batch(pairs)
+
+    assert first == second
+    assert first[0] == diff_chars("hello there", "hello world")
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] - before["hits"] >= 3
+
+
+def test_diff_batch_parallel_matches_inline():
+    """Tests that the process pool path gives the same results as computing inline."""
+    get_diff_cache().clear()
+    pairs = [(f"line {i} original", f"line {i} edited text") for i in range(1200)]
+    parallel = diff_batch(pairs, parallel=True)
+    get_diff_cache().clear()
+    assert parallel == diff_batch(pairs, parallel=False)
+
+
+def test_diff_batch_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        diff_batch([("a", "b")], "sentence")
@@ -32,3 +32,80 @@ def test_format_timecode_normal():
 
     # A larger frame number
     assert format_timecode(172800, 24) == "02:00:00:00"
+
+
+# --- Equivalence with the `timecode` library ---
+
+from timecode import Timecode
+from backend.timecode_utils import (
+    timecode_to_frames,
+    frames_to_timecode,
+    format_timecodes,
+    timecodes_to_frames,
+    get_frame_rate_spec,
+)
+
+FRAME_RATES = [23.976, 24, 24.0, 25.0, 29.97, 30.0, 47.952, 48.0, 50.0, 59.94, 60.0, 119.88]
+
+# Frames around second, minute, ten-minute and 24h boundaries, where drop-frame
+# counting and rollover are most likely to diverge.
+SAMPLE_FRAMES = sorted(set(
+    list(range(0, 130))
+    + [base + delta
+       for base in (1798, 1800, 3596, 3600, 17982, 18000, 35964, 36000, 107892, 172800, 215784,
+                    2073600, 2589407, 2589408, 5178816, 10357632, 10368000)
+       for delta in range(-3, 4)]
+))
+
+
+def _reference_format(frame, frame_rate):
+    if frame_rate == 0 or frame == 0:
+        return "00:00:00:00"
+    return str(Timecode(frame_rate, frames=int(frame) + 1))
+
+
+@pytest.mark.parametrize("frame_rate", FRAME_RATES)
+def test_format_timecode_matches_library(frame_rate):
+    for frame in SAMPLE_FRAMES:
+        assert format_timecode(frame, frame_rate) == _reference_format(frame, frame_rate), frame
+
+
+@pytest.mark.parametrize("frame_rate", FRAME_RATES)
+def test_timecode_to_frames_matches_library(frame_rate):
+    for frame in SAMPLE_FRAMES[1:]:
+        tc_str = _reference_format(frame, frame_rate)
+        assert timecode_to_frames(tc_str, frame_rate) == Timecode(frame_rate, tc_str).frames - 1, tc_str
+
+
+@pytest.mark.parametrize("tc_str", ["01:00:00:00", "00:10:00;00", "00:01:00;02", "00:00:01.500", "00:00:00:00"])
+@pytest.mark.parametrize("frame_rate", [24.0, 29.97, 59.94])
+def test_timecode_to_frames_separators_match_library(tc_str, frame_rate):
+    assert timecode_to_frames(tc_str, frame_rate) == Timecode(frame_rate, tc_str).frames - 1
+
+
+def test_drop_frame_skips_frame_numbers():
+    # 29.97 DF drops frames ;00 and ;01 at every minute except each tenth minute.
+    assert frames_to_timecode(1799, 29.97) == "00:00:59;29"
+    assert frames_to_timecode(1800, 29.97) == "00:01:00;02"
+    assert frames_to_timecode(17982, 29.97) == "00:10:00;00"
+    assert frames_to_timecode(3600, 59.94) == "00:01:00;04"
+
+
+def test_timecode_round_trip():
+    for frame_rate in FRAME_RATES:
+        frames_per_day = get_frame_rate_spec(frame_rate).frames_per_24_hours
+        frames = [frame for frame in SAMPLE_FRAMES[1:] if frame < frames_per_day]
+        assert timecodes_to_frames(format_timecodes(frames, frame_rate), frame_rate) == frames
+
+
+def test_batch_apis_match_scalar_apis():
+    frames = [0, 1, 1799, 1800, 17982, 86400]
+    assert format_timecodes(frames, 29.97) == [format_timecode(f, 29.97) for f in frames]
+    assert format_timecodes(frames, 0) == ["00:00:00:00"] * len(frames)
+    timecodes = ["01:00:00:00", "01:00:00:00", "00:00:10:12"]
+    assert timecodes_to_frames(timecodes, 24.0) == [timecode_to_frames(tc, 24.0) for tc in timecodes]
+
+
+def test_format_timecode_negative_frame_raises():
+    with pytest.raises(ValueError):
+        format_timecode(-5, 24)
@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from timeline_watcher import TimelineWatcher
+
+
+def _state(project="p1", timeline="t1", tracks=(("Subtitle 1", [2, 0, 48], "fp1"),)):
+    return {
+        "projectId": project, "projectName": f"Project {project}",
+        "timelineId": timeline, "timelineName": f"Timeline {timeline}", "frameRate": 24.0,
+        "tracks": [{"track_index": index, "track_name": name, "signature": signature, "fingerprint": fingerprint}
+                   for index, (name, signature, fingerprint) in enumerate(tracks, start=1)],
+    }
+
+
+def _types(events):
+    return [event["type"] for event in events]
+
+
+def test_apply_probe_emits_compact_change_events():
+    """Tests the events produced for the first probe, unchanged probes, cue, track, timeline and project changes."""
+    watcher = TimelineWatcher()
+    assert _types(watcher.apply_probe("success", _state())) == ["project_changed", "tracks_changed"]
+    # A track that was not read in full keeps its known fingerprint.
+    assert watcher.apply_probe("success", _state(tracks=(("Subtitle 1", [2, 0, 48], None),))) == []
+
+    events = watcher.apply_probe("success", _state(tracks=(("Subtitle 1", [3, 0, 72], "fp2"),)))
+    assert events == [{"type": "subtitles_changed", "track_index": 1, "count": 3, "fingerprint": "fp2"}]
+
+    events = watcher.apply_probe("success", _state(tracks=(("Subtitle 1", [3, 0, 72], None), ("Subtitle 2", [0, None, None], "empty"))))
+    assert events == [{"type": "tracks_changed", "tracks": [
+        {"track_index": 1, "track_name": "Subtitle 1"}, {"track_index": 2, "track_name": "Subtitle 2"}]}]
+
+    assert _types(watcher.apply_probe("success", _state(timeline="t2"))) == ["timeline_changed", "tracks_changed"]
+    assert _types(watcher.apply_probe("success", _state(project="p2", timeline="t2"))) == ["project_changed", "tracks_changed"]
+
+
+def test_apply_probe_reports_unavailable_once():
+    """Tests that a failing probe is reported once per error and resets the state."""
+    watcher = TimelineWatcher()
+    watcher.apply_probe("success", _state())
+    error = {"code": "no_active_timeline", "message": "no timeline"}
+    assert _types(watcher.apply_probe("error", error)) == ["resolve_unavailable"]
+    assert watcher.apply_probe("error", error) == []
+    assert _types(watcher.apply_probe("success", _state())) == ["project_changed", "tracks_changed"]
+
+
+def test_slow_subscriber_gets_resync_instead_of_backlog():
+    """Tests that a subscriber whose queue is full is reset to a single resync event."""
+    async def scenario():
+        watcher = TimelineWatcher(max_queue=2)
+        queue = watcher.subscribe()
+        watcher.publish([{"type": "subtitles_changed", "n": n} for n in range(3)])
+        return [queue.get_nowait() for _ in range(queue.qsize())], watcher.get_stats()
+
+    events, stats = asyncio.run(scenario())
+
+    assert _types(events) == ["resync", "subtitles_changed"]
+    assert stats["resyncs"] == 1
+
+
+def test_run_probes_only_while_subscribed():
+    """Tests that the watcher idles without subscribers and pushes events to every subscriber once one connects."""
+    probes = []
+
+    async def probe(known_signatures, full_scan, rescan_tracks):
+        probes.append((known_signatures, full_scan, rescan_tracks))
+        return "success", _state()
+
+    async def scenario():
+        watcher = TimelineWatcher(interval=0.01)
+        task = asyncio.ensure_future(watcher.run(probe))
+        await asyncio.sleep(0.03)
+        idle_probes = len(probes)
+        first, second = watcher.subscribe(), watcher.subscribe()
+        received = [await first.get(), await first.get(), await first.get()]
+        await asyncio.sleep(0.03)
+        task.cancel()
+        return idle_probes, received, second.qsize()
+
+    idle_probes, received, second_queued = asyncio.run(scenario())
+
+    assert idle_probes == 0
+    assert _types(received) == ["hello", "project_changed", "tracks_changed"]
+    assert received[0]["state"] is None
+    assert second_queued == 3
+    assert probes[0] == ({}, True, ())
+    # Without a full scan interval only the first probe reads every track.
+    assert all(later == ({1: [2, 0, 48]}, False, ()) for later in probes[1:])
+
+
+def test_invalidated_tracks_are_rescanned_once():
+    """Tests that invalidate wakes the watcher and has only the invalidated track read in full on the next probe."""
+    probes = []
+
+    async def probe(known_signatures, full_scan, rescan_tracks):
+        probes.append((full_scan, rescan_tracks))
+        return "success", _state()
+
+    async def scenario():
+        watcher = TimelineWatcher(interval=60)
+        task = asyncio.ensure_future(watcher.run(probe))
+        watcher.subscribe()
+        await asyncio.sleep(0.01)
+        await asyncio.get_running_loop().run_in_executor(None, watcher.invalidate, 1)
+        await asyncio.sleep(0.01)
+        task.cancel()
+        return watcher.get_stats()
+
+    stats = asyncio.run(scenario())
+
+    assert probes == [(True, ()), (False, (1,))]
+    assert stats["rescanned_tracks"] == 1
+
+
+def test_periodic_full_scan_is_deferred_while_resolve_is_busy():
+    """Tests that a due periodic full scan waits until no other Resolve calls are queued."""
+    probes = []
+    busy = [True]
+
+    async def probe(known_signatures, full_scan, rescan_tracks):
+        probes.append(full_scan)
+        return "success", _state()
+
+    async def scenario():
+        watcher = TimelineWatcher(interval=0.01, full_scan_interval=0.02)
+        task = asyncio.ensure_future(watcher.run(probe, is_busy=lambda: busy[0]))
+        watcher.subscribe()
+        await asyncio.sleep(0.08)
+        busy_probes = list(probes)
+        busy[0] = False
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return busy_probes, watcher.get_stats()
+
+    busy_probes, stats = asyncio.run(scenario())
+
+    assert busy_probes[0] is True and not any(busy_probes[1:])
+    assert stats["deferred_full_scans"] > 0
+    assert any(probes[len(busy_probes):])
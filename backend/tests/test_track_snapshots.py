@@ -0,0 +1,76 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from track_snapshots import TrackSnapshot, SnapshotStore, compute_changes
+
+
+def _snapshot(fingerprint, cues, frame_rate=24.0):
+    return TrackSnapshot(
+        frame_rate,
+        fingerprint,
+        [start for start, _, _ in cues],
+        [end for _, end, _ in cues],
+        [text for _, _, text in cues],
+    )
+
+
+def test_compute_changes_without_previous_snapshot_resets():
+    """Tests that an unknown base version returns the whole track as added."""
+    new = _snapshot("v2", [(0, 24, "A"), (48, 72, "B")])
+
+    changes = compute_changes(None, new)
+
+    assert changes["reset"] is True
+    assert [cue["text"] for cue in changes["added"]] == ["A", "B"]
+    assert changes["added"][1]["startTimecode"] == "00:00:02:00"
+    assert changes["removed"] == [] and changes["retimed"] == []
+
+
+def test_compute_changes_reports_added_removed_and_retimed():
+    """Tests that only the changed cues are returned."""
+    old = _snapshot("v1", [(0, 24, "A"), (48, 72, "B"), (96, 120, "C"), (144, 168, "D")])
+    new = _snapshot("v2", [(0, 24, "A"), (48, 80, "B"), (100, 124, "C"), (200, 220, "E")])
+
+    changes = compute_changes(old, new)
+    old_keys = old.index()
+
+    assert changes["reset"] is False
+    assert [cue["text"] for cue in changes["added"]] == ["E"]
+    assert changes["added"][0]["id"] == 4
+    assert changes["removed"] == [key for key in old_keys if key.startswith("144:")]
+    retimed = {cue["text"]: cue for cue in changes["retimed"]}
+    assert set(retimed) == {"B", "C"}
+    assert retimed["B"]["previousKey"] == retimed["B"]["key"]
+    assert retimed["B"]["endTimecode"] == "00:00:03:08"
+    assert retimed["C"]["previousKey"].startswith("96:")
+    assert retimed["C"]["key"].startswith("100:")
+
+
+def test_compute_changes_for_identical_snapshots_is_empty():
+    """Tests that unchanged tracks produce no changes."""
+    cues = [(0, 24, "A"), (48, 72, "B")]
+    changes = compute_changes(_snapshot("v1", cues), _snapshot("v1", cues))
+    assert changes == {"reset": False, "added": [], "removed": [], "retimed": []}
+
+
+def test_snapshot_store_is_bounded_per_track():
+    """Tests that old versions are evicted once the per-track limit is reached."""
+    store = SnapshotStore(max_snapshots_per_track=2)
+    for version in ("v1", "v2", "v3"):
+        store.put(("p", "t", 1), _snapshot(version, []))
+
+    assert store.get(("p", "t", 1), "v1") is None
+    assert store.get(("p", "t", 1), "v3") is not None
+    assert store.get(("p", "t", 2), "v3") is None
+
+
+def test_snapshot_store_latest_returns_most_recent_version():
+    """Tests that `latest` returns the snapshot stored last for the track."""
+    store = SnapshotStore()
+    assert store.latest(("p", "t", 1)) is None
+    for version in ("v1", "v2", "v1"):
+        store.put(("p", "t", 1), _snapshot(version, []))
+    assert store.latest(("p", "t", 1)).fingerprint == "v1"
@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from track_state import TrackStateError, TrackStateManager, isolated_track
+
+
+def _timeline(states, refused=()):
+    """
+    A mock timeline whose subtitle tracks have the given enabled states (index 1 first);
+    `SetTrackEnable` returns False for the (index, enabled) pairs in `refused`.
+    """
+    current = dict(enumerate(states, start=1))
+
+    def set_track_enable(track_type, index, enabled):
+        if (index, enabled) in refused:
+            return False
+        current[index] = enabled
+        return True
+
+    timeline = MagicMock()
+    timeline.GetTrackCount.side_effect = lambda track_type: len(current)
+    timeline.GetIsTrackEnabled.side_effect = lambda track_type, index: current[index]
+    timeline.SetTrackEnable.side_effect = set_track_enable
+    return timeline, current
+
+
+def test_isolate_only_toggles_tracks_that_differ():
+    """Tests that isolation reads each state once and writes only the tracks whose state changes."""
+    timeline, current = _timeline([True, False, True, False, True])
+    manager = TrackStateManager(timeline)
+    manager.snapshot()
+    manager.isolate(5)
+
+    assert current == {1: False, 2: False, 3: False, 4: False, 5: True}
+    assert timeline.GetIsTrackEnabled.call_count == 5
+    assert [call.args[1:] for call in timeline.SetTrackEnable.call_args_list] == [(1, False), (3, False)]
+    assert manager.writes == 2
+
+
+def test_restore_writes_back_only_the_changed_tracks():
+    """Tests that restore undoes exactly the changes made since the snapshot, skipping kept tracks."""
+    timeline, current = _timeline([True, False, True, False])
+    manager = TrackStateManager(timeline)
+    manager.snapshot()
+    manager.isolate(4)
+    timeline.SetTrackEnable.reset_mock()
+
+    manager.restore(keep=(4,))
+
+    assert current == {1: True, 2: False, 3: True, 4: True}
+    assert [call.args[1:] for call in timeline.SetTrackEnable.call_args_list] == [(1, True), (3, True)]
+    assert timeline.GetIsTrackEnabled.call_count == 4
+
+
+def test_isolated_track_restores_on_error():
+    """Tests that the context manager restores the other tracks even when the body raises."""
+    timeline, current = _timeline([True, True, False])
+    with pytest.raises(RuntimeError):
+        with isolated_track(timeline, 3, keep_target=False, track_count=3):
+            assert current == {1: False, 2: False, 3: True}
+            raise RuntimeError("append failed")
+
+    assert current == {1: True, 2: True, 3: False}
+    timeline.GetTrackCount.assert_not_called()
+
+
+def test_refused_disable_fails_isolation_and_restores():
+    """Tests that a track Resolve refuses to disable aborts isolation and undoes the tracks already changed."""
+    timeline, current = _timeline([True, True, True, False], refused={(2, False)})
+    with pytest.raises(TrackStateError) as error:
+        with isolated_track(timeline, 4):
+            pytest.fail("the body must not run when isolation fails")
+
+    assert error.value.failed_tracks == [2]
+    assert current == {1: True, 2: True, 3: True, 4: False}
+
+
+def test_refused_restore_is_reported():
+    """Tests that tracks that cannot be re-enabled are logged and listed in `restore_failed`."""
+    timeline, current = _timeline([True, True, False], refused={(1, True)})
+    with isolated_track(timeline, 3) as manager:
+        pass
+
+    assert manager.restore_failed == [1]
+    assert current == {1: False, 2: True, 3: True}
@@ -0,0 +1,290 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+# Scripts without spaces between words are diffed one character per token at word granularity.
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_WORD_TOKEN = re.compile(rf"[{_CJK}]|[^\W{_CJK}]+|\s+|[^\w\s]")
+
+GRANULARITIES = ("char", "word")
+
+# Batches with at least this many uncached pairs are diffed across the process pool.
+PARALLEL_THRESHOLD = 2000
+_PARALLEL_CHUNK_SIZE = 500
+
+
+def _tokenize(text: str, granularity: str) -> Sequence[str]:
+    if granularity == "word":
+        return _WORD_TOKEN.findall(text)
+    return text
+
+
+def _myers_edit_script(a: Sequence, b: Sequence) -> List[Tuple[str, int]]:
+    """
+    Myers' O(ND) shortest edit script from `a` to `b`, as ("=", i), ("-", i) and
+    ("+", j) operations in order, where i indexes `a` and j indexes `b`.
+    """
+    n, m = len(a), len(b)
+    max_d = n + m
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        # The diagonals read at step d are -d-1..d+1; keep just that window for the backtrack.
+        trace.append(v[offset - d - 1:offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return []
+
+
+def _backtrack(trace, n: int, m: int) -> List[Tuple[str, int]]:
+    ops = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        window = trace[d]
+        k = x - y
+        if k == -d or (k != d and window[k - 1 + d + 1] < window[k + 1 + d + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = window[prev_k + d + 1]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            ops.append(("=", x))
+        if x == prev_x:
+            ops.append(("+", prev_y))
+        else:
+            ops.append(("-", prev_x))
+        x, y = prev_x, prev_y
+    while x > 0:
+        x -= 1
+        ops.append(("=", x))
+    ops.reverse()
+    return ops
+
+
+def compute_diff(original: str, edited: str, granularity: str = "char") -> Tuple[Tuple[str, str], ...]:
+    """
+    Diffs `original` against `edited` and returns (type, value) parts, where type is
+    `normal`, `removed` or `added`. Within each changed region the removed text comes
+    before the added text, as in the frontend's `calculateDiff`.
+    """
+    if original == edited:
+        return (("normal", original),) if original else ()
+
+    a = _tokenize(original, granularity)
+    b = _tokenize(edited, granularity)
+
+    # Trim the common prefix and suffix before running Myers on the middle.
+    prefix = 0
+    limit = min(len(a), len(b))
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[len(a) - 1 - suffix] == b[len(b) - 1 - suffix]:
+        suffix += 1
+    middle_a = a[prefix:len(a) - suffix]
+    middle_b = b[prefix:len(b) - suffix]
+
+    parts = []
+    if prefix:
+        parts.append(("normal", "".join(a[:prefix])))
+
+    removed = []
+    added = []
+    normal = []
+
+    def flush_changes():
+        if removed:
+            parts.append(("removed", "".join(removed)))
+            removed.clear()
+        if added:
+            parts.append(("added", "".join(added)))
+            added.clear()
+
+    for op, index in _myers_edit_script(middle_a, middle_b):
+        if op == "=":
+            if removed or added:
+                flush_changes()
+            normal.append(middle_a[index])
+            continue
+        if normal:
+            parts.append(("normal", "".join(normal)))
+            normal.clear()
+        if op == "-":
+            removed.append(middle_a[index])
+        else:
+            added.append(middle_b[index])
+    if normal:
+        parts.append(("normal", "".join(normal)))
+    flush_changes()
+
+    if suffix:
+        tail = "".join(a[len(a) - suffix:])
+        if parts and parts[-1][0] == "normal":
+            parts[-1] = ("normal", parts[-1][1] + tail)
+        else:
+            parts.append(("normal", tail))
+    return tuple(parts)
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class DiffCache:
+    """LRU of computed diffs keyed by (granularity, original hash, edited hash)."""
+
+    def __init__(self, max_entries: int = 50000):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "parallel_batches": 0}
+
+    @staticmethod
+    def key(original: str, edited: str, granularity: str):
+        return granularity, _digest(original), _digest(edited)
+
+    def get(self, key):
+        with self._lock:
+            parts = self._entries.get(key)
+            if parts is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return parts
+
+    def put(self, key, parts):
+        with self._lock:
+            self._entries[key] = parts
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def count_parallel_batch(self):
+        with self._lock:
+            self._stats["parallel_batches"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_diff_cache = DiffCache()
+
+
+def get_diff_cache() -> DiffCache:
+    """Returns the process-wide diff cache."""
+    return _diff_cache
+
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool():
+    """Returns the shared diff process pool, or None on single-core machines."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            workers = min(4, (os.cpu_count() or 1) - 1)
+            if workers < 1:
+                return None
+            # multiprocessing is only imported once a batch is large enough to need it
+            from concurrent.futures import ProcessPoolExecutor
+            _process_pool = ProcessPoolExecutor(max_workers=workers)
+        return _process_pool
+
+
+def _diff_chunk(pairs: List[Tuple[str, str]], granularity: str):
+    return [compute_diff(original, edited, granularity) for original, edited in pairs]
+
+
+def _diff_in_pool(pairs: List[Tuple[str, str]], granularity: str):
+    pool = _get_process_pool()
+    if pool is None:
+        return None
+    chunks = [pairs[i:i + _PARALLEL_CHUNK_SIZE] for i in range(0, len(pairs), _PARALLEL_CHUNK_SIZE)]
+    try:
+        results = []
+        for chunk_result in pool.map(_diff_chunk, chunks, [granularity] * len(chunks)):
+            results.extend(chunk_result)
+        return results
+    except Exception as e:
+        global _process_pool
+        logging.warning(f"并行计算差异失败，改为在当前进程中计算: {e}")
+        with _process_pool_lock:
+            if _process_pool is pool:
+                _process_pool = None
+        pool.shutdown(wait=False)
+        return None
+
+
+def diff_batch(pairs: Sequence[Tuple[str, str]], granularity: str = "char", parallel: Optional[bool] = None) -> List[List[dict]]:
+    """
+    Diffs every (original, edited) pair and returns `DiffPartModel` dicts per pair.
+
+    Results are cached by content hash. The uncached pairs are spread over a process
+    pool when `parallel` is true, or, by default, when there are at least
+    `PARALLEL_THRESHOLD` of them.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown diff granularity: {granularity}")
+
+    cache = get_diff_cache()
+    results = [None] * len(pairs)
+    missing_keys = {}
+    for position, (original, edited) in enumerate(pairs):
+        key = cache.key(original, edited, granularity)
+        parts = cache.get(key)
+        if parts is not None:
+            results[position] = parts
+        else:
+            missing_keys.setdefault(key, []).append(position)
+
+    if missing_keys:
+        todo = [pairs[positions[0]] for positions in missing_keys.values()]
+        if parallel is None:
+            parallel = len(todo) >= PARALLEL_THRESHOLD
+        computed = _diff_in_pool(todo, granularity) if parallel else None
+        if computed is None:
+            computed = _diff_chunk(todo, granularity)
+        else:
+            cache.count_parallel_batch()
+        for (key, positions), parts in zip(missing_keys.items(), computed):
+            cache.put(key, parts)
+            for position in positions:
+                results[position] = parts
+
+    return [[{"type": kind, "value": value} for kind, value in parts] for parts in results]
+
+
+def diff_chars(original: str, edited: str) -> List[dict]:
+    """
+    Character-level diff of `original` against `edited` as `DiffPartModel` dicts
+    (`normal`/`removed`/`added`), in the same shape as `calculateDiff` in the frontend.
+    """
+    return diff_batch([(original, edited)], "char", parallel=False)[0]
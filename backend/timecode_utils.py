@@ -1,36 +1,192 @@
-from timecode import Timecode
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple
+
+
+class FrameRateSpec(NamedTuple):
+    """Integer constants derived once per frame rate; all per-frame work is integer math."""
+    int_fps: int
+    parse_fps: float
+    drop_frames: int
+    frames_per_minute: int
+    frames_per_10_minutes: int
+    frames_per_24_hours: int
+    delimiter: str
+    ms_frame: bool
+
+
+def _is_ntsc_rate(fps: float):
+    """Mirrors the NTSC detection of the `timecode` library (x * 1000/1001 rates)."""
+    int_fps = round(fps * 1001 / 1000)
+    return abs(fps - int_fps * 1000 / 1001) < 0.005, int_fps
+
+
+@lru_cache(maxsize=None, typed=True)
+def get_frame_rate_spec(frame_rate) -> FrameRateSpec:
+    """
+    Derives the timecode constants for a frame rate. 29.97/59.94 (and other
+    multiples of 30000/1001) use drop-frame counting, exactly like `timecode.Timecode`.
+    """
+    rate_str = str(frame_rate)
+    if "/" in rate_str:
+        numerator, denominator = rate_str.split("/")
+        rational = round(float(numerator) / float(denominator), 2)
+        rate_str = str(int(rational) if rational.is_integer() else rational)
+    drop_frame = False
+    ms_frame = rate_str in ("ms", "1000")
+    if ms_frame:
+        int_fps = 1000
+        fps = 1000.0
+    else:
+        fps = float(rate_str)
+        ntsc, int_fps = _is_ntsc_rate(fps)
+        if ntsc:
+            drop_frame = int_fps % 30 == 0
+        else:
+            int_fps = int(fps)
+
+    # Frame count used when rendering: the exact rate for drop-frame, the integer rate otherwise.
+    render_fps = fps if drop_frame else float(int_fps)
+    drop_frames = round(fps * 0.066666) if drop_frame else 0
+
+    if drop_frame:
+        delimiter = ";"
+    elif ms_frame:
+        delimiter = "."
+    else:
+        delimiter = ":"
+
+    return FrameRateSpec(
+        int_fps=int_fps,
+        parse_fps=fps,
+        drop_frames=drop_frames,
+        frames_per_minute=int(round(render_fps) * 60) - drop_frames,
+        frames_per_10_minutes=round(render_fps * 60 * 10),
+        frames_per_24_hours=round(render_fps * 60 * 60 * 24),
+        delimiter=delimiter,
+        ms_frame=ms_frame,
+    )
+
+
+# Pre-rendered zero-padded fields; frames at >99 fps and ms timecodes fall back to formatting.
+_TWO_DIGITS = [f"{i:02d}" for i in range(100)]
+
+
+def _render_frame(frame: int, spec: FrameRateSpec) -> str:
+    """Renders a non-negative 0-based frame number as HH:MM:SS:FF."""
+    frame_number = frame % spec.frames_per_24_hours
+
+    drop_frames = spec.drop_frames
+    if drop_frames:
+        d, m = divmod(frame_number, spec.frames_per_10_minutes)
+        if m > drop_frames:
+            frame_number += (drop_frames * 9 * d) + drop_frames * ((m - drop_frames) // spec.frames_per_minute)
+        else:
+            frame_number += drop_frames * 9 * d
+
+    total_seconds, frs = divmod(frame_number, spec.int_fps)
+    total_minutes, secs = divmod(total_seconds, 60)
+    hrs, mins = divmod(total_minutes, 60)
+
+    if spec.ms_frame:
+        ff = f"{frs:03d}"
+    elif frs < 100:
+        ff = _TWO_DIGITS[frs]
+    else:
+        ff = str(frs)
+    return f"{_TWO_DIGITS[hrs]}:{_TWO_DIGITS[mins]}:{_TWO_DIGITS[secs]}{spec.delimiter}{ff}"
+
 
 def format_timecode(frame, frame_rate):
     """将帧数转换为 HH:MM:SS:FF 格式的时间码"""
     if frame_rate == 0:
         return "00:00:00:00"
-    
-    # The Timecode library is 1-based. Frame 0 is a special case.
+
+    # Frame 0 is always rendered with ':' separators, even for drop-frame rates.
     if frame == 0:
         return "00:00:00:00"
 
-    # Add 1 to the frame to match the 1-based indexing of the library
-    tc = Timecode(frame_rate, frames=int(frame) + 1)
-    return str(tc)
+    frame = int(frame)
+    if frame < 0:
+        raise ValueError(f"frame should be a non-negative integer, not {frame}")
+    return _render_frame(frame, get_frame_rate_spec(frame_rate))
+
+
+@lru_cache(maxsize=65536, typed=True)
+def _parse_timecode(tc_str: str, frame_rate) -> int:
+    """Memoized HH:MM:SS:FF / HH:MM:SS;FF / HH:MM:SS.fff parser returning 0-based frames."""
+    if not tc_str:
+        return 0
+
+    spec = get_frame_rate_spec(frame_rate)
+    if len(tc_str) == 11 and tc_str[8] in ":;" and tc_str[2] == tc_str[5] == ":":
+        # Fast path for the canonical HH:MM:SS:FF / HH:MM:SS;FF layout.
+        hours, minutes, seconds, frames = int(tc_str[0:2]), int(tc_str[3:5]), int(tc_str[6:8]), int(tc_str[9:11])
+    else:
+        parts = tc_str.replace(";", ":").replace(".", ":").split(":")
+        hours, minutes, seconds, frames = int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3])
+
+        # A '.' separator denotes fractional seconds for every rate but milliseconds.
+        if not spec.ms_frame and len(tc_str.split(".")) == 2:
+            frames = round(float("." + tc_str.rsplit(".", 1)[1]) * spec.parse_fps)
+
+    ifps = spec.int_fps
+    total_minutes = 60 * hours + minutes
+    frame_number = (
+        (ifps * 3600 * hours)
+        + (ifps * 60 * minutes)
+        + (ifps * seconds)
+        + frames
+    ) - (spec.drop_frames * (total_minutes - (total_minutes // 10)))
+
+    if frame_number < 0:
+        raise ValueError(f"timecode {tc_str!r} resolves to a negative frame number at {frame_rate} fps")
+    return frame_number
+
 
 def timecode_to_frames(tc_str: str, frame_rate: float) -> int:
     """Converts a timecode string (e.g., '01:00:00:00') to total frames."""
-    tc = Timecode(frame_rate, tc_str)
-    return tc.frames - 1
+    return _parse_timecode(tc_str, frame_rate)
 
 def frames_to_timecode(frames: int, frame_rate: float) -> str:
     """Converts frame count to HH:MM:SS:FF."""
     return format_timecode(frames, frame_rate)
 
+
+def format_timecodes(frames: Iterable[int], frame_rate: float) -> List[str]:
+    """Batch version of `format_timecode`: converts a sequence of frame numbers to timecodes."""
+    if frame_rate == 0:
+        return ["00:00:00:00" for _ in frames]
+
+    spec = get_frame_rate_spec(frame_rate)
+    render = _render_frame
+    result = []
+    append = result.append
+    for frame in frames:
+        if frame == 0:
+            append("00:00:00:00")
+            continue
+        frame = int(frame)
+        if frame < 0:
+            raise ValueError(f"frame should be a non-negative integer, not {frame}")
+        append(render(frame, spec))
+    return result
+
+
+def timecodes_to_frames(tc_strs: Iterable[str], frame_rate: float) -> List[int]:
+    """Batch version of `timecode_to_frames`: converts a sequence of timecode strings to frames."""
+    parse = _parse_timecode
+    return [parse(tc_str, frame_rate) for tc_str in tc_strs]
+
+
 def frames_to_srt_timecode(frames: int, frame_rate: float) -> str:
     """Converts frame count to HH:MM:SS,ms SRT timecode format."""
     if frame_rate == 0:
         return "00:00:00,000"
-    
+
     total_seconds = frames / frame_rate
     hours = int(total_seconds / 3600)
     minutes = int((total_seconds % 3600) / 60)
     seconds = int(total_seconds % 60)
     milliseconds = int((total_seconds - int(total_seconds)) * 1000)
-    
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
\ No newline at end of file
+
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
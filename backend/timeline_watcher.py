@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+
+class TimelineWatcher:
+    """
+    One server-side watcher that probes Resolve every `interval` seconds while at least
+    one client is subscribed, and pushes compact change events to every subscriber:
+
+    - `project_changed` / `timeline_changed`: a different project or timeline is current
+      (followed by `tracks_changed`; clients reload their subtitles).
+    - `tracks_changed`: subtitle tracks were added, removed or renamed.
+    - `subtitles_changed`: the cues of one track changed; carries the new fingerprint,
+      so clients can fetch `/api/v1/subtitles/changes?since=<their fingerprint>`.
+    - `resolve_unavailable`: Resolve, the project or the timeline went away.
+
+    Each probe compares a cheap per-track signature; a track is read in full only when its
+    signature changed or it was `invalidate`d. Text-only edits leave the signature unchanged,
+    so they are caught by invalidation (the server's own writes, or a client's `rescan`
+    message for the track it shows) rather than by re-reading every track. A periodic full
+    scan of every track is opt-in (`full_scan_interval` seconds, 0 = off) and is postponed
+    while other Resolve calls are waiting, since it holds the Resolve thread for a while
+    on long timelines.
+
+    Subscribers are bounded queues. A client that falls `max_queue` events behind has its
+    backlog replaced by a single `resync` event instead of slowing down everyone else.
+    All methods run on the event loop, except `invalidate`, which may be called from any thread.
+    """
+
+    def __init__(self, interval: float = 1.0, full_scan_interval: float = 0.0, max_queue: int = 64):
+        self.interval = interval
+        self.full_scan_interval = full_scan_interval
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._state: Optional[dict] = None
+        self._error_code = None
+        self._last_full_scan = None
+        self._invalid_tracks = set()
+        self._invalid_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stats = {"probes": 0, "full_scans": 0, "deferred_full_scans": 0, "rescanned_tracks": 0,
+                       "events": 0, "resyncs": 0}
+
+    def subscribe(self) -> asyncio.Queue:
+        """Registers a client; the returned queue starts with a `hello` event carrying the known state."""
+        queue = asyncio.Queue(self.max_queue)
+        queue.put_nowait({"type": "hello", "state": self._public_state()})
+        self._subscribers.add(queue)
+        if len(self._subscribers) == 1 and self._wake is not None:
+            self._wake.set()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers:
+            # Nobody is watching: forget the state so the next client starts from a fresh probe.
+            self._state = None
+            self._error_code = None
+            self._last_full_scan = None
+
+    def invalidate(self, track_index: Optional[int] = None):
+        """
+        Marks a track (or every known track, when `track_index` is None) to be read in full
+        on the next probe, and wakes the watcher. Thread-safe: export jobs call it from the
+        Resolve thread after writing to the timeline.
+        """
+        with self._invalid_lock:
+            if track_index is None:
+                self._invalid_tracks.update(self.known_signatures())
+            else:
+                self._invalid_tracks.add(track_index)
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # The loop has closed; the watcher is gone.
+
+    def _take_invalid_tracks(self) -> tuple:
+        with self._invalid_lock:
+            tracks, self._invalid_tracks = tuple(sorted(self._invalid_tracks)), set()
+        return tracks
+
+    def publish(self, events: List[dict]):
+        for event in events:
+            self._stats["events"] += 1
+            for queue in list(self._subscribers):
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._stats["resyncs"] += 1
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({"type": "resync"})
+
+    def _public_state(self) -> Optional[dict]:
+        if self._state is None:
+            return None
+        return dict(self._state, tracks=[
+            {"track_index": index, "track_name": track["track_name"], "count": track["signature"][0],
+             "fingerprint": track["fingerprint"]}
+            for index, track in sorted(self._state["tracks"].items())
+        ])
+
+    def known_signatures(self) -> dict:
+        if self._state is None:
+            return {}
+        return {index: track["signature"] for index, track in self._state["tracks"].items()}
+
+    def apply_probe(self, status: str, data: dict) -> List[dict]:
+        """Updates the state from one probe result and returns the change events it implies."""
+        if status != "success":
+            events = []
+            if self._state is not None or self._error_code != data.get("code"):
+                events.append({"type": "resolve_unavailable", "code": data.get("code"), "message": data.get("message")})
+            self._state = None
+            self._error_code = data.get("code")
+            return events
+
+        old = self._state
+        identity_changed = old is None or (old["projectId"], old["timelineId"]) != (data["projectId"], data["timelineId"])
+        old_tracks = {} if identity_changed else old["tracks"]
+        tracks = {}
+        for track in data["tracks"]:
+            index = track["track_index"]
+            fingerprint = track["fingerprint"]
+            if fingerprint is None and index in old_tracks:
+                fingerprint = old_tracks[index]["fingerprint"]
+            tracks[index] = {"track_name": track["track_name"], "signature": track["signature"], "fingerprint": fingerprint}
+
+        self._state = {
+            "projectId": data["projectId"],
+            "projectName": data["projectName"],
+            "timelineId": data["timelineId"],
+            "timelineName": data["timelineName"],
+            "frameRate": data["frameRate"],
+            "tracks": tracks,
+        }
+        self._error_code = None
+
+        events = []
+        if old is None or old["projectId"] != data["projectId"]:
+            events.append({"type": "project_changed", **{key: self._state[key] for key in (
+                "projectId", "projectName", "timelineId", "timelineName", "frameRate")}})
+        elif old["timelineId"] != data["timelineId"]:
+            events.append({"type": "timeline_changed", **{key: self._state[key] for key in (
+                "timelineId", "timelineName", "frameRate")}})
+        if [(index, track["track_name"]) for index, track in sorted(old_tracks.items())] != \
+                [(index, track["track_name"]) for index, track in sorted(tracks.items())]:
+            events.append({"type": "tracks_changed", "tracks": [
+                {"track_index": index, "track_name": track["track_name"]} for index, track in sorted(tracks.items())]})
+        if not identity_changed:
+            for index, track in sorted(tracks.items()):
+                if index in old_tracks and track["fingerprint"] != old_tracks[index]["fingerprint"]:
+                    events.append({"type": "subtitles_changed", "track_index": index,
+                                   "count": track["signature"][0], "fingerprint": track["fingerprint"]})
+        return events
+
+    def _full_scan_due(self, is_busy) -> bool:
+        if self._state is None:
+            # Nothing is known yet: the first probe fingerprints every track anyway.
+            return True
+        if self.full_scan_interval <= 0 or time.monotonic() - self._last_full_scan < self.full_scan_interval:
+            return False
+        if is_busy is not None and is_busy():
+            self._stats["deferred_full_scans"] += 1
+            return False
+        return True
+
+    async def run(self, probe, is_busy=None):
+        """
+        Runs the watch loop until cancelled. `probe` is an async callable taking
+        (known_signatures, full_scan, rescan_tracks) and returning a (status, data) tuple;
+        `is_busy`, when given, returns True while other Resolve calls are waiting, which
+        postpones a due periodic full scan.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                if not self._subscribers:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+                # Cleared before probing, so an `invalidate` that arrives mid-probe wakes the next one.
+                self._wake.clear()
+                full_scan = self._full_scan_due(is_busy)
+                rescan_tracks = self._take_invalid_tracks()
+                if full_scan:
+                    rescan_tracks = ()  # Every track is read anyway.
+                try:
+                    status, data = await probe(self.known_signatures(), full_scan, rescan_tracks)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error(f"时间线监视探测失败: {e}", exc_info=True)
+                    status, data = "error", {"code": "unknown_error", "message": str(e)}
+                # A full Resolve queue says nothing about the timeline; try again next time.
+                if status == "success" or data.get("code") != "resolve_busy":
+                    self._stats["probes"] += 1
+                    self._stats["full_scans"] += full_scan
+                    self._stats["rescanned_tracks"] += len(rescan_tracks)
+                    if full_scan:
+                        self._last_full_scan = time.monotonic()
+                    self.publish(self.apply_probe(status, data))
+                elif rescan_tracks:
+                    with self._invalid_lock:
+                        self._invalid_tracks.update(rescan_tracks)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wake = None
+            self._loop = None
+
+    def get_stats(self) -> dict:
+        return dict(self._stats, subscribers=len(self._subscribers), interval_s=self.interval,
+                    full_scan_interval_s=self.full_scan_interval, state=self._public_state())
+
+
+# The periodic full scan is off unless TIMELINE_WATCHER_FULL_SCAN_S sets an interval (e.g. 300).
+_timeline_watcher = TimelineWatcher(full_scan_interval=float(os.environ.get("TIMELINE_WATCHER_FULL_SCAN_S", "0")))
+
+
+def get_timeline_watcher() -> TimelineWatcher:
+    """Returns the process-wide timeline watcher."""
+    return _timeline_watcher
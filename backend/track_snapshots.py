@@ -0,0 +1,151 @@
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from typing import List, Optional
+
+from timecode_utils import format_timecodes
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+class TrackSnapshot:
+    """
+    The raw content of a subtitle track at one point in time: parallel lists of start
+    frames, end frames and texts, plus the content fingerprint used as its version token.
+    """
+
+    def __init__(self, frame_rate: float, fingerprint: str, start_frames: List[int], end_frames: List[int], texts: List[str]):
+        self.frame_rate = frame_rate
+        self.fingerprint = fingerprint
+        self.start_frames = start_frames
+        self.end_frames = end_frames
+        self.texts = texts
+        self._index = None
+
+    def __len__(self):
+        return len(self.start_frames)
+
+    def index(self) -> dict:
+        """Maps each cue key (`<start frame>:<text hash>`) to its position on the track."""
+        if self._index is None:
+            self._index = {
+                f"{start}:{_text_hash(text)}": position
+                for position, (start, text) in enumerate(zip(self.start_frames, self.texts))
+            }
+        return self._index
+
+
+def _render_cues(snapshot: TrackSnapshot, keyed_positions) -> List[dict]:
+    """Renders the cues at the given (key, position) pairs, formatting all timecodes in one batch."""
+    positions = [position for _, position in keyed_positions]
+    starts = format_timecodes([snapshot.start_frames[p] for p in positions], snapshot.frame_rate)
+    ends = format_timecodes([snapshot.end_frames[p] for p in positions], snapshot.frame_rate)
+    return [
+        {
+            "key": key,
+            "id": position + 1,
+            "startTimecode": start,
+            "endTimecode": end,
+            "text": snapshot.texts[position],
+        }
+        for (key, position), start, end in zip(keyed_positions, starts, ends)
+    ]
+
+
+def compute_changes(old: Optional[TrackSnapshot], new: TrackSnapshot) -> dict:
+    """
+    Computes the cues added, removed and retimed between two snapshots of a track.
+
+    Cues are matched by key (start frame plus text hash). A cue whose key survives but
+    whose end frame moved, or a removed/added pair with the same text, is reported as
+    retimed. Without an old snapshot every cue is reported as added and `reset` is set.
+    """
+    new_index = new.index()
+    if old is None:
+        return {"reset": True, "added": _render_cues(new, list(new_index.items())), "removed": [], "retimed": []}
+
+    old_index = old.index()
+    added = []
+    retimed = []
+    for key, position in new_index.items():
+        old_position = old_index.get(key)
+        if old_position is None:
+            added.append((key, position))
+        elif old.end_frames[old_position] != new.end_frames[position]:
+            retimed.append((key, key, position))
+    removed = [key for key in old_index if key not in new_index]
+
+    # A removed cue and an added cue with the same text are the same cue moved in time.
+    removed_by_text = defaultdict(list)
+    for key in removed:
+        removed_by_text[key.split(":", 1)[1]].append(key)
+    still_added = []
+    for key, position in added:
+        candidates = removed_by_text.get(key.split(":", 1)[1])
+        if candidates:
+            retimed.append((candidates.pop(0), key, position))
+        else:
+            still_added.append((key, position))
+    moved = {old_key for old_key, _, _ in retimed}
+    removed = [key for key in removed if key not in moved]
+
+    retimed_cues = _render_cues(new, [(key, position) for _, key, position in retimed])
+    for (old_key, _, _), cue in zip(retimed, retimed_cues):
+        cue["previousKey"] = old_key
+
+    return {"reset": False, "added": _render_cues(new, still_added), "removed": removed, "retimed": retimed_cues}
+
+
+class SnapshotStore:
+    """
+    Remembers recent snapshots per track (keyed by project, timeline and track index)
+    so clients can ask for the changes since the version they last saw.
+    """
+
+    def __init__(self, max_snapshots_per_track: int = 4, max_tracks: int = 16):
+        self._max_snapshots_per_track = max_snapshots_per_track
+        self._max_tracks = max_tracks
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, track_key, snapshot: TrackSnapshot):
+        with self._lock:
+            snapshots = self._tracks.get(track_key)
+            if snapshots is None:
+                snapshots = self._tracks[track_key] = OrderedDict()
+            self._tracks.move_to_end(track_key)
+            snapshots[snapshot.fingerprint] = snapshot
+            snapshots.move_to_end(snapshot.fingerprint)
+            while len(snapshots) > self._max_snapshots_per_track:
+                snapshots.popitem(last=False)
+            while len(self._tracks) > self._max_tracks:
+                self._tracks.popitem(last=False)
+
+    def get(self, track_key, fingerprint: str) -> Optional[TrackSnapshot]:
+        with self._lock:
+            snapshots = self._tracks.get(track_key)
+            if not snapshots:
+                return None
+            return snapshots.get(fingerprint)
+
+    def latest(self, track_key) -> Optional[TrackSnapshot]:
+        """Returns the most recently stored snapshot of a track, if any."""
+        with self._lock:
+            snapshots = self._tracks.get(track_key)
+            if not snapshots:
+                return None
+            return next(reversed(snapshots.values()))
+
+    def clear(self):
+        with self._lock:
+            self._tracks.clear()
+
+
+_snapshot_store = SnapshotStore()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Returns the process-wide snapshot store."""
+    return _snapshot_store
@@ -0,0 +1,109 @@
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+
+class TrackStateError(Exception):
+    """Raised when Resolve refuses to change the enabled state of tracks needed for isolation."""
+
+    def __init__(self, message: str, failed_tracks: List[int]):
+        super().__init__(message)
+        self.failed_tracks = failed_tracks
+
+
+class TrackStateManager:
+    """
+    Snapshot/restore of the enabled state of every track of one type on a timeline.
+
+    `snapshot` reads each track's state once; `apply` and `restore` then only call
+    `SetTrackEnable` for tracks whose state actually differs, so isolating one track
+    on a timeline where the others are already disabled costs no writes at all.
+    The manager tracks the state it has set, so it never re-reads Resolve; a track whose
+    `SetTrackEnable` returns false keeps its last known state.
+    """
+
+    def __init__(self, timeline, track_type: str = "subtitle"):
+        self.timeline = timeline
+        self.track_type = track_type
+        self._original: Optional[Dict[int, bool]] = None
+        self._current: Dict[int, bool] = {}
+        self.writes = 0
+        # Tracks the last `restore` could not put back.
+        self.restore_failed: List[int] = []
+
+    def snapshot(self, track_count: Optional[int] = None) -> Dict[int, bool]:
+        """
+        Reads and remembers the enabled state of every track ({track index: enabled}).
+        Pass `track_count` when it is already known to save the `GetTrackCount` call.
+        """
+        count = self.timeline.GetTrackCount(self.track_type) if track_count is None else track_count
+        self._original = {
+            index: bool(self.timeline.GetIsTrackEnabled(self.track_type, index)) for index in range(1, count + 1)
+        }
+        self._current = dict(self._original)
+        return dict(self._original)
+
+    def apply(self, states: Dict[int, bool]) -> List[int]:
+        """
+        Sets the given tracks to the given states, skipping tracks already in that state.
+        Returns the indices of the tracks Resolve refused to change.
+        """
+        if self._original is None:
+            self.snapshot()
+        failed = []
+        for index, enabled in sorted(states.items()):
+            if self._current.get(index) == enabled:
+                continue
+            self.writes += 1
+            if not self.timeline.SetTrackEnable(self.track_type, index, enabled):
+                failed.append(index)
+                continue
+            self._current[index] = enabled
+        return failed
+
+    def isolate(self, target_index: int):
+        """
+        Enables `target_index` and disables every other track. If Resolve refuses any of these
+        changes, the tracks already changed are restored and `TrackStateError` is raised.
+        """
+        if self._original is None:
+            self.snapshot()
+        failed = self.apply({index: index == target_index for index in self._current})
+        if failed:
+            self.restore()
+            raise TrackStateError(f"无法隔离 {self.track_type} 轨道 {target_index}：Resolve 拒绝切换轨道 {failed} 的启用状态。", failed)
+
+    def restore(self, keep: Iterable[int] = ()) -> List[int]:
+        """
+        Puts every track changed since the snapshot back to its original state, except those in `keep`.
+        Returns the indices of the tracks that could not be restored (and logs them).
+        """
+        if self._original is None:
+            return []
+        keep = set(keep)
+        failed = self.apply({index: enabled for index, enabled in self._original.items() if index not in keep})
+        if failed:
+            logging.warning(f"无法恢复 {self.track_type} 轨道 {failed} 的启用状态。")
+        self.restore_failed = failed
+        return failed
+
+
+@contextmanager
+def isolated_track(timeline, target_index: int, track_type: str = "subtitle", keep_target: bool = True,
+                   track_count: Optional[int] = None):
+    """
+    Temporarily isolates one track: on entry only `target_index` is enabled, and on exit
+    every other track gets its original state back (the target too, unless `keep_target`).
+    Yields the `TrackStateManager`; after the block, its `restore_failed` lists the tracks
+    that could not be restored. Raises `TrackStateError` on entry if isolation fails.
+    """
+    manager = TrackStateManager(timeline, track_type)
+    manager.snapshot(track_count)
+    manager.isolate(target_index)
+    try:
+        yield manager
+    finally:
+        try:
+            manager.restore(keep=(target_index,) if keep_target else ())
+        except Exception as e:
+            logging.error(f"恢复 {track_type} 轨道状态时出错: {e}", exc_info=True)